@@ -67,7 +67,7 @@ INSTALLED_APPS = [
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'tournaments.authentication.CachedTokenAuthentication',
         'rest_framework.authentication.SessionAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
@@ -144,6 +144,65 @@ else:
         },
     }
 
+# Cache (leaderboard snapshots etc.)
+# Local memory is per-process; with several Daphne workers use the shared Redis cache
+# so every worker sees the same leaderboard versions.
+if os.environ.get('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ.get('REDIS_URL'),
+            'KEY_PREFIX': 'daily_tourneys',
+        },
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        },
+    }
+
+# Cache alias used for serialized leaderboards
+LEADERBOARD_CACHE = os.environ.get('LEADERBOARD_CACHE', 'default')
+LEADERBOARD_CACHE_TIMEOUT = 60 * 60
+
+# Seconds to coalesce score writes before pushing standings to WebSocket viewers (0 = push immediately)
+LEADERBOARD_BROADCAST_DELAY = float(os.environ.get('LEADERBOARD_BROADCAST_DELAY', '0.5'))
+
+# Serve leaderboard / tournament detail / match list / featured GETs from the async
+# views (async ORM) instead of the sync DRF viewsets
+ASYNC_READ_VIEWS = os.environ.get('ASYNC_READ_VIEWS', 'true').lower() != 'false'
+
+# Seconds an authenticated token (and its user) is reused per process without a query
+# (0 = query every request), and how many tokens each process keeps
+AUTH_TOKEN_CACHE_TTL = float(os.environ.get('AUTH_TOKEN_CACHE_TTL', 60))
+AUTH_TOKEN_CACHE_MAX_ENTRIES = int(os.environ.get('AUTH_TOKEN_CACHE_MAX_ENTRIES', 10000))
+
+# Leaderboard image rendering
+# Decoded theme images, fonts and resized logos kept in memory per process
+RENDER_ASSET_CACHE_BYTES = int(os.environ.get('RENDER_ASSET_CACHE_BYTES', 256 * 1024 * 1024))
+# Processes used by render jobs to draw zip pages in parallel (1 = inline, 0 = available
+# cores). Every process that runs jobs starts its own pool, so N web processes with
+# RENDER_JOB_WORKERS > 0 use N x RENDER_WORKERS cores; raise it for `manage.py render_worker`
+# (with RENDER_JOB_WORKERS=0 on the web processes) rather than for the web server.
+# Zip downloads served straight from a request always render inline.
+RENDER_WORKERS = int(os.environ.get('RENDER_WORKERS', 1))
+# Background render jobs (jobs.py): local worker threads per web process (0 = only
+# `manage.py render_worker`), jobs running at once per organiser, jobs one organiser
+# may have queued or running, seconds after which a RUNNING job is marked failed, and
+# seconds finished jobs (and their result files) are kept
+RENDER_JOB_WORKERS = int(os.environ.get('RENDER_JOB_WORKERS', 2))
+RENDER_JOB_CONCURRENCY_PER_USER = int(os.environ.get('RENDER_JOB_CONCURRENCY_PER_USER', 1))
+RENDER_JOB_MAX_QUEUED_PER_USER = int(os.environ.get('RENDER_JOB_MAX_QUEUED_PER_USER', 5))
+RENDER_JOB_TIMEOUT = int(os.environ.get('RENDER_JOB_TIMEOUT', 600))
+RENDER_JOB_RETENTION = int(os.environ.get('RENDER_JOB_RETENTION', 24 * 60 * 60))
+
+# Pre-sized team logo variants generated at upload (px); theme logo_size values are added per tournament
+TEAM_LOGO_SIZES = (40, 96, 128)
+# Rendered leaderboard pages, reused until the standings or the theme change
+RENDER_CACHE_DIR = os.environ.get('RENDER_CACHE_DIR', os.path.join(BASE_DIR, 'render_cache'))
+RENDER_CACHE_MAX_BYTES = int(os.environ.get('RENDER_CACHE_MAX_BYTES', 512 * 1024 * 1024))
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -1,8 +1,10 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
-from .models import User, Tournament, Team, Match, Score, FeaturedContent, TournamentTheme
+from .models import User, Tournament, Team, Match, Score, FeaturedContent, TournamentTheme, TeamStanding, RenderJob
 import json
 from django.http import HttpResponse
+from .broadcast import leaderboard_changed
+from .scoring import rescore_tournament
 
 # Register custom User model
 class CustomUserAdmin(UserAdmin):
@@ -40,8 +42,44 @@ class TournamentAdmin(admin.ModelAdmin):
     list_filter = ('status', 'creator')
     search_fields = ('name', 'creator__username')
 
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        if change and 'points_config' in form.changed_data:
+            rescore_tournament(obj)
+            leaderboard_changed(obj.id)
+
+class LeaderboardAdminMixin:
+    """Admin writes invalidate like the API: new cache version / ETags and a push to viewers."""
+
+    def leaderboard_tournament_id(self, obj):
+        return obj.tournament_id
+
+    def get_readonly_fields(self, request, obj=None):
+        fields = tuple(super().get_readonly_fields(request, obj))
+        # Standings stay with the tournament the row was created in
+        if obj is not None and 'tournament' in {f.name for f in self.model._meta.fields}:
+            fields += ('tournament',)
+        return fields
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        leaderboard_changed(self.leaderboard_tournament_id(obj))
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        leaderboard_changed(self.leaderboard_tournament_id(obj))
+
+    def delete_queryset(self, request, queryset):
+        # One by one, so the model's delete keeps the standings in step
+        tournament_ids = set()
+        for obj in queryset:
+            obj.delete()
+            tournament_ids.add(self.leaderboard_tournament_id(obj))
+        for tournament_id in tournament_ids:
+            leaderboard_changed(tournament_id)
+
 @admin.register(Team)
-class TeamAdmin(admin.ModelAdmin):
+class TeamAdmin(LeaderboardAdminMixin, admin.ModelAdmin):
     list_display = ('name', 'tournament', 'member_count')
     list_filter = ('tournament',)
     search_fields = ('name',)
@@ -50,19 +88,39 @@ class TeamAdmin(admin.ModelAdmin):
         return obj.members.count()
 
 @admin.register(Match)
-class MatchAdmin(admin.ModelAdmin):
+class MatchAdmin(LeaderboardAdminMixin, admin.ModelAdmin):
     list_display = ('tournament', 'match_number', 'map_name', 'created_at')
     list_filter = ('tournament', 'map_name')
 
 @admin.register(Score)
-class ScoreAdmin(admin.ModelAdmin):
+class ScoreAdmin(LeaderboardAdminMixin, admin.ModelAdmin):
     list_display = ('match', 'team', 'kills', 'placement', 'total_points')
     list_filter = ('match__tournament', 'match')
     readonly_fields = ('total_points',)
 
+    def leaderboard_tournament_id(self, obj):
+        return obj.match.tournament_id
+
+    def delete_queryset(self, request, queryset):
+        super().delete_queryset(request, queryset.select_related('match'))
+
+@admin.register(TeamStanding)
+class TeamStandingAdmin(admin.ModelAdmin):
+    list_display = ('tournament', 'rank', 'team', 'total_points', 'total_wwcd', 'total_kills', 'matches_played')
+    list_filter = ('tournament',)
+    ordering = ('tournament', 'rank')
+    # Maintained from scores; use `manage.py rebuild_standings` to repair
+    readonly_fields = ('team', 'tournament', 'total_points', 'total_kills', 'total_wwcd', 'matches_played', 'total_position_points', 'rank')
+
 @admin.register(FeaturedContent)
 class FeaturedContentAdmin(admin.ModelAdmin):
     list_display = ('title', 'content_type', 'priority', 'active')
     list_filter = ('content_type', 'active') # fixed typo list_list -> list_filter
     search_fields = ('title',)
     ordering = ('-priority',)
+
+@admin.register(RenderJob)
+class RenderJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'tournament', 'kind', 'status', 'requested_by', 'created_at', 'wait_ms', 'run_ms')
+    list_filter = ('status', 'kind')
+    readonly_fields = ('started_at', 'finished_at')
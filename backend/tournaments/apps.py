@@ -3,3 +3,7 @@ from django.apps import AppConfig
 
 class TournamentsConfig(AppConfig):
     name = 'tournaments'
+
+    def ready(self):
+        from .authentication import connect_signals
+        connect_signals()
@@ -0,0 +1,99 @@
+"""Async versions of the hot read endpoints, served natively under Daphne.
+
+GETs use the async ORM and cache API; every other method (and every GET when
+ASYNC_READ_VIEWS is off) is handed to the existing DRF viewset through
+sync_to_async, so URLs, permissions and payloads stay the same.
+"""
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import HttpResponse, JsonResponse
+from django.utils.http import parse_etags
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.exceptions import ValidationError
+from rest_framework.request import Request
+
+from .leaderboard import acached_leaderboard, leaderboard_etag
+from .models import Tournament
+from .pagination import InvalidPage, MatchPagination, apaginate
+from .serializers import TournamentSerializer, MatchSerializer, FeaturedContentSerializer
+from .views import TournamentViewSet, MatchViewSet, FeaturedContentViewSet, id_param, match_queryset
+
+_tournament_detail = TournamentViewSet.as_view(
+    {'get': 'retrieve', 'put': 'update', 'patch': 'partial_update', 'delete': 'destroy'}, detail=True,
+)
+_tournament_leaderboard = TournamentViewSet.as_view({'get': 'leaderboard'}, detail=True)
+_match_list = MatchViewSet.as_view({'get': 'list', 'post': 'create'}, detail=False)
+_featured_list = FeaturedContentViewSet.as_view({'get': 'list', 'post': 'create'}, detail=False)
+
+
+def _is_async_read(request):
+    return settings.ASYNC_READ_VIEWS and request.method in ('GET', 'HEAD')
+
+
+def _json(data, status=200, headers=None):
+    return JsonResponse(data, status=status, headers=headers, safe=False,
+                        json_dumps_params={'ensure_ascii': False})
+
+
+def _not_found(model):
+    return _json({"detail": f"No {model.__name__} matches the given query."}, status=404)
+
+
+@csrf_exempt
+async def tournament_leaderboard(request, pk):
+    if not _is_async_read(request):
+        return await sync_to_async(_tournament_leaderboard)(request, pk=pk)
+
+    tournament = await Tournament.objects.filter(pk=pk).afirst()
+    if tournament is None:
+        return _not_found(Tournament)
+    match_id = request.GET.get('match_id')
+
+    # Unchanged polls only cost the tournament lookup
+    etag = leaderboard_etag(tournament, match_id)
+    headers = {'ETag': etag, 'Cache-Control': 'no-cache'}
+    if_none_match = parse_etags(request.headers.get('If-None-Match', ''))
+    if etag in if_none_match or '*' in if_none_match:
+        return HttpResponse(status=304, headers=headers)
+
+    return _json(await acached_leaderboard(tournament, match_id), headers=headers)
+
+
+@csrf_exempt
+async def tournament_detail(request, pk):
+    if not _is_async_read(request):
+        return await sync_to_async(_tournament_detail)(request, pk=pk)
+
+    tournament = await (
+        Tournament.objects.select_related('creator').prefetch_related('themes').filter(pk=pk).afirst()
+    )
+    if tournament is None:
+        return _not_found(Tournament)
+    return _json(TournamentSerializer(tournament, context={'request': request}).data)
+
+
+@csrf_exempt
+async def match_list(request):
+    if not _is_async_read(request):
+        return await sync_to_async(_match_list)(request)
+
+    drf_request = Request(request)
+    try:
+        queryset = match_queryset(id_param(drf_request, 'tournament'))
+    except ValidationError as e:
+        return _json(e.detail, status=400)
+    try:
+        matches, page = await apaginate(MatchPagination(), drf_request, queryset)
+    except InvalidPage:
+        return _json({"detail": "Invalid page."}, status=404)
+    page["results"] = MatchSerializer(matches, many=True, context={'request': drf_request}).data
+    return _json(page)
+
+
+@csrf_exempt
+async def featured_list(request):
+    if not _is_async_read(request):
+        return await sync_to_async(_featured_list)(request)
+
+    featured = [item async for item in FeaturedContentViewSet.queryset.all()]
+    return _json(FeaturedContentSerializer(featured, many=True, context={'request': request}).data)
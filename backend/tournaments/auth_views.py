@@ -3,6 +3,7 @@ from rest_framework.response import Response
 from rest_framework.authtoken.models import Token
 from rest_framework.authtoken.views import ObtainAuthToken
 from django.contrib.auth import authenticate
+from .authentication import token_cache
 from .models import User
 from .serializers import UserSerializer
 
@@ -39,6 +40,14 @@ class CustomAuthToken(ObtainAuthToken):
             'is_approved': user.is_approved
         })
 
+class LogoutView(views.APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        # Deleting the token also drops it from the auth cache
+        Token.objects.filter(user=request.user).delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
 class SetProStatusView(views.APIView):
     permission_classes = [permissions.IsAdminUser]
 
@@ -70,3 +79,10 @@ class UserProfileView(views.APIView):
             'is_approved': user.is_approved,
             'is_superuser': user.is_superuser
         })
+
+class AuthCacheStatsView(views.APIView):
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        # This process's counters only
+        return Response(token_cache.stats())
@@ -0,0 +1,109 @@
+import copy
+import threading
+import time
+
+from django.conf import settings
+from rest_framework.authentication import TokenAuthentication
+
+
+class TokenCache:
+    """Process-wide TTL cache of token key -> (user, token).
+
+    Entries are dropped on logout (token deleted) and whenever the user is saved,
+    which covers password, pro status and approval changes. Other processes only
+    see that once their entry expires, so the TTL bounds how long a revoked token
+    keeps working there.
+    """
+
+    def __init__(self, ttl, max_entries):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self.hits += 1
+                return entry[1], entry[2]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+        return None
+
+    def set(self, key, user, token):
+        if self.ttl <= 0:
+            return
+        now = time.monotonic()
+        with self._lock:
+            if len(self._entries) >= self.max_entries:
+                self._entries = {k: entry for k, entry in self._entries.items() if entry[0] > now}
+                if len(self._entries) >= self.max_entries:
+                    # Still full of live tokens: drop the one closest to expiring
+                    del self._entries[min(self._entries, key=lambda k: self._entries[k][0])]
+            self._entries[key] = (now + self.ttl, user, token)
+
+    def invalidate_user(self, user_id):
+        with self._lock:
+            for key in [key for key, entry in self._entries.items() if entry[1].pk == user_id]:
+                del self._entries[key]
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "entries": len(self._entries),
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+token_cache = TokenCache(settings.AUTH_TOKEN_CACHE_TTL, settings.AUTH_TOKEN_CACHE_MAX_ENTRIES)
+
+
+def invalidate_user(user_id):
+    """Forget cached tokens of `user_id`, so the next request re-reads the user."""
+    token_cache.invalidate_user(user_id)
+
+
+def _user_saved(sender, instance, **kwargs):
+    # Any save: password (set_password + save), is_pro, approval, role, is_active
+    invalidate_user(instance.pk)
+
+
+def _token_deleted(sender, instance, **kwargs):
+    invalidate_user(instance.user_id)
+
+
+def connect_signals():
+    from django.contrib.auth import get_user_model
+    from django.db.models.signals import post_delete, post_save
+    from rest_framework.authtoken.models import Token
+
+    post_save.connect(_user_saved, sender=get_user_model(), dispatch_uid='token_cache_user_saved')
+    post_delete.connect(_token_deleted, sender=Token, dispatch_uid='token_cache_token_deleted')
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """TokenAuthentication that skips the token + user query for recently seen tokens."""
+
+    def authenticate_credentials(self, key):
+        cached = token_cache.get(key)
+        if cached is None:
+            user, token = super().authenticate_credentials(key)
+            token_cache.set(key, user, token)
+        else:
+            user, token = cached
+        # Each request gets its own copy, so per-request state set on the user never leaks
+        return copy.copy(user), token
@@ -0,0 +1,129 @@
+import threading
+import traceback
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.core.cache import caches
+from django.db import close_old_connections
+
+from .leaderboard import bump_leaderboard_version, cached_leaderboard
+from .models import Tournament
+
+
+def leaderboard_group(tournament_id):
+    return f"tournament_{tournament_id}_leaderboard"
+
+
+def _ranked(rows):
+    return [{**row, "rank": rank} for rank, row in enumerate(rows, start=1)]
+
+
+def snapshot_payload(tournament):
+    """Full leaderboard for the tournament's current version."""
+    return {
+        "kind": "snapshot",
+        "seq": tournament.leaderboard_version,
+        "rows": _ranked(cached_leaderboard(tournament)),
+    }
+
+
+def _delta(previous_rows, rows):
+    before = {row["team_id"]: row for row in previous_rows}
+    changes = [row for row in rows if before.get(row["team_id"]) != row]
+    moves = [
+        {"team_id": row["team_id"], "from": before[row["team_id"]]["rank"], "to": row["rank"]}
+        for row in changes
+        if row["team_id"] in before and before[row["team_id"]]["rank"] != row["rank"]
+    ]
+    current_ids = {row["team_id"] for row in rows}
+    removed = [team_id for team_id in before if team_id not in current_ids]
+    return changes, moves, removed
+
+
+def update_payload(tournament):
+    """Payload for the latest change: a delta against the last broadcast when that is
+    smaller than the full table, otherwise a snapshot.
+
+    Deltas carry `base_seq`; a client whose last seen seq differs must ask for a snapshot.
+    """
+    cache = caches[settings.LEADERBOARD_CACHE]
+    key = f"leaderboard_broadcast:{tournament.id}"
+    previous = cache.get(key)
+    payload = snapshot_payload(tournament)
+    cache.set(key, payload, settings.LEADERBOARD_CACHE_TIMEOUT)
+
+    if not previous or previous["seq"] >= payload["seq"]:
+        return payload
+
+    changes, moves, removed = _delta(previous["rows"], payload["rows"])
+    if len(changes) + len(removed) > len(payload["rows"]) // 2:
+        return payload
+    return {
+        "kind": "delta",
+        "seq": payload["seq"],
+        "base_seq": previous["seq"],
+        "changes": changes,
+        "moves": moves,
+        "removed": removed,
+    }
+
+
+def broadcast_leaderboard(tournament_id):
+    """Compute the new standings once and push them to every connected viewer."""
+    tournament = Tournament.objects.get(pk=tournament_id)
+    channel_layer = get_channel_layer()
+    async_to_sync(channel_layer.group_send)(
+        leaderboard_group(tournament_id),
+        {
+            "type": "leaderboard_update",
+            "message": "Leaderboard updated",
+            "payload": update_payload(tournament),
+        }
+    )
+
+
+# Tournaments with a broadcast already scheduled, per process
+_pending = {}
+_pending_lock = threading.Lock()
+
+
+def schedule_broadcast(tournament_id):
+    """Broadcast the tournament's standings once the coalescing window has passed.
+
+    A burst of score writes (a whole match entered in a few seconds) schedules a
+    single timer; when it fires the broadcast carries whatever version is current
+    by then. The work runs on the timer thread, off the request path. With
+    LEADERBOARD_BROADCAST_DELAY = 0 the broadcast is sent immediately.
+    """
+    delay = settings.LEADERBOARD_BROADCAST_DELAY
+    if delay <= 0:
+        broadcast_leaderboard(tournament_id)
+        return
+
+    with _pending_lock:
+        if tournament_id in _pending:
+            return
+        timer = threading.Timer(delay, _flush, args=(tournament_id,))
+        timer.daemon = True
+        _pending[tournament_id] = timer
+    timer.start()
+
+
+def _flush(tournament_id):
+    # Writes arriving from here on schedule a new broadcast
+    with _pending_lock:
+        _pending.pop(tournament_id, None)
+    try:
+        broadcast_leaderboard(tournament_id)
+    except Exception:
+        traceback.print_exc()
+    finally:
+        close_old_connections()
+
+
+def leaderboard_changed(tournament_id):
+    """Invalidate cached leaderboards and push the new standings to viewers."""
+    bump_leaderboard_version(tournament_id)
+    # Bursts of writes are coalesced into one broadcast
+    schedule_broadcast(tournament_id)
@@ -1,10 +1,14 @@
 import json
+from channels.db import database_sync_to_async
 from channels.generic.websocket import AsyncWebsocketConsumer
 
+from .broadcast import leaderboard_group, snapshot_payload
+from .models import Tournament
+
 class LeaderboardConsumer(AsyncWebsocketConsumer):
     async def connect(self):
         self.tournament_id = self.scope['url_route']['kwargs']['tournament_id']
-        self.room_group_name = f'tournament_{self.tournament_id}_leaderboard'
+        self.room_group_name = leaderboard_group(self.tournament_id)
 
         # Join room group
         await self.channel_layer.group_add(
@@ -21,6 +25,32 @@ class LeaderboardConsumer(AsyncWebsocketConsumer):
             self.channel_name
         )
 
+    # Receive message from WebSocket
+    async def receive(self, text_data=None, bytes_data=None):
+        try:
+            data = json.loads(text_data or '{}')
+        except json.JSONDecodeError:
+            return
+
+        # Clients that missed a sequence number ask for the full table
+        if data.get('action') == 'snapshot':
+            payload = await self.get_snapshot()
+            if payload is not None:
+                await self.send(text_data=json.dumps({
+                    'type': 'leaderboard_update',
+                    'message': 'Leaderboard snapshot',
+                    **payload
+                }))
+
+    @database_sync_to_async
+    def get_snapshot(self):
+        if not str(self.tournament_id).isdigit():
+            return None
+        tournament = Tournament.objects.filter(pk=self.tournament_id).first()
+        if tournament is None:
+            return None
+        return snapshot_payload(tournament)
+
     # Receive message from room group
     async def leaderboard_update(self, event):
         message = event['message']
@@ -28,5 +58,6 @@ class LeaderboardConsumer(AsyncWebsocketConsumer):
         # Send message to WebSocket
         await self.send(text_data=json.dumps({
             'type': 'leaderboard_update',
-            'message': message
+            'message': message,
+            **event.get('payload', {})
         }))
@@ -0,0 +1,185 @@
+import tempfile
+import threading
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.db import close_old_connections, transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from .models import RenderJob, User
+from .rendering import (
+    ZIP_COMPRESSION, image_extension, leaderboard_page, leaderboard_zip, output_encoding, render_workers,
+)
+
+
+class JobLimitReached(Exception):
+    pass
+
+
+def submit_render_job(user, tournament, kind, theme=None, params=None):
+    """Queue a render for `user` and wake the local workers once the job is committed.
+
+    Raises JobLimitReached when the user already has RENDER_JOB_MAX_QUEUED_PER_USER
+    jobs waiting or running.
+    """
+    active = RenderJob.objects.filter(
+        requested_by=user, status__in=[RenderJob.Status.QUEUED, RenderJob.Status.RUNNING]
+    ).count()
+    if active >= settings.RENDER_JOB_MAX_QUEUED_PER_USER:
+        raise JobLimitReached(f"You already have {active} render jobs in progress.")
+
+    job = RenderJob.objects.create(
+        tournament=tournament, theme=theme, requested_by=user, kind=kind, params=params or {},
+    )
+    transaction.on_commit(start_workers)
+    return job
+
+
+def fail_stale_jobs():
+    # A worker that died mid-render leaves its job RUNNING forever
+    cutoff = timezone.now() - timedelta(seconds=settings.RENDER_JOB_TIMEOUT)
+    RenderJob.objects.filter(status=RenderJob.Status.RUNNING, started_at__lt=cutoff).update(
+        status=RenderJob.Status.FAILED, finished_at=timezone.now(), error="Render timed out.",
+    )
+
+
+def purge_finished_jobs():
+    """Delete DONE / FAILED jobs (and their result files) finished over RENDER_JOB_RETENTION seconds ago."""
+    cutoff = timezone.now() - timedelta(seconds=settings.RENDER_JOB_RETENTION)
+    expired = RenderJob.objects.filter(
+        status__in=[RenderJob.Status.DONE, RenderJob.Status.FAILED], finished_at__lt=cutoff,
+    )
+    for job in expired.only('id', 'result'):
+        if job.result:
+            job.result.delete(save=False)
+        job.delete()
+
+
+def claim_next_job():
+    """Mark the oldest runnable job RUNNING and return it (None if there is nothing to do).
+
+    A job is runnable when its organiser has fewer than RENDER_JOB_CONCURRENCY_PER_USER
+    jobs running, so one organiser's end-of-session exports cannot occupy every worker.
+    Each claim locks the organiser's user row, so the running count it checks cannot
+    change before its conditional UPDATE; a worker finding the row locked moves on to
+    the next organiser instead of waiting.
+    """
+    busy_users = (
+        RenderJob.objects.filter(status=RenderJob.Status.RUNNING)
+        .values('requested_by')
+        .annotate(running=Count('id'))
+        .filter(running__gte=settings.RENDER_JOB_CONCURRENCY_PER_USER)
+        .values('requested_by')
+    )
+    candidates = (
+        RenderJob.objects.filter(status=RenderJob.Status.QUEUED)
+        .exclude(requested_by__in=busy_users)
+        .order_by('created_at', 'id')
+        .values_list('id', 'requested_by_id')[:10]
+    )
+    for job_id, user_id in candidates:
+        with transaction.atomic():
+            if not list(User.objects.select_for_update(skip_locked=True).filter(pk=user_id).values_list('pk', flat=True)):
+                continue  # another worker is claiming for this organiser
+            running = RenderJob.objects.filter(requested_by_id=user_id, status=RenderJob.Status.RUNNING).count()
+            if running >= settings.RENDER_JOB_CONCURRENCY_PER_USER:
+                continue
+            claimed = RenderJob.objects.filter(pk=job_id, status=RenderJob.Status.QUEUED).update(
+                status=RenderJob.Status.RUNNING, started_at=timezone.now(),
+            )
+        if claimed:
+            return RenderJob.objects.select_related('tournament', 'theme').get(pk=job_id)
+    return None
+
+
+def run_job(job):
+    """Render `job` into job.result, recording the outcome and timings."""
+    try:
+        encoding = output_encoding(job.theme, job.params)
+        if job.kind == RenderJob.Kind.IMAGE:
+            page = int(job.params.get('page', 1))
+            teams_per_page = job.theme.teams_per_page if job.theme else 20
+            image = leaderboard_page(job.tournament, job.theme, job.params.get('match_id'), page, teams_per_page, encoding)
+            if image is None:
+                raise ValueError("Page out of range")
+            filename = f"leaderboard_{job.tournament_id}_p{page}_{job.pk}.{image_extension(encoding)}"
+            with image:
+                job.result.save(filename, File(image), save=False)
+        else:
+            compression = ZIP_COMPRESSION[job.params.get('compression', 'stored')]
+            # Spool to disk so a large archive never sits in memory
+            with tempfile.TemporaryFile() as spool:
+                for chunk in leaderboard_zip(job.tournament, job.theme, compression, encoding, render_workers()):
+                    spool.write(chunk)
+                spool.seek(0)
+                job.result.save(f"leaderboard_{job.tournament_id}_all_{job.pk}.zip", File(spool), save=False)
+        job.status = RenderJob.Status.DONE
+    except Exception as e:
+        traceback.print_exc()
+        job.status = RenderJob.Status.FAILED
+        job.error = str(e)
+    job.finished_at = timezone.now()
+    # Only while still RUNNING: fail_stale_jobs may have given up on this job meanwhile
+    finished = RenderJob.objects.filter(pk=job.pk, status=RenderJob.Status.RUNNING).update(
+        status=job.status, result=job.result, error=job.error, finished_at=job.finished_at,
+    )
+    if not finished:
+        if job.result:
+            job.result.delete(save=False)
+        job.refresh_from_db()
+    return job
+
+
+def run_pending_jobs():
+    """Run jobs until none is runnable. Returns how many were run."""
+    fail_stale_jobs()
+    purge_finished_jobs()
+    count = 0
+    while True:
+        job = claim_next_job()
+        if job is None:
+            return count
+        run_job(job)
+        count += 1
+
+
+# Local worker threads currently draining the queue, per process, and a counter of
+# wake-ups so a thread that is about to exit notices jobs committed meanwhile
+_running = 0
+_wakeups = 0
+_running_lock = threading.Lock()
+
+
+def start_workers():
+    """Start local worker threads (up to RENDER_JOB_WORKERS) to drain the queue.
+
+    With RENDER_JOB_WORKERS = 0 jobs are left to `manage.py render_worker`.
+    """
+    global _running, _wakeups
+    with _running_lock:
+        _wakeups += 1
+        wanted = max(settings.RENDER_JOB_WORKERS - _running, 0)
+        _running += wanted
+    for _ in range(wanted):
+        threading.Thread(target=_work, daemon=True).start()
+
+
+def _work():
+    global _running
+    try:
+        while True:
+            with _running_lock:
+                seen = _wakeups
+            try:
+                run_pending_jobs()
+            except Exception:
+                traceback.print_exc()
+            with _running_lock:
+                if _wakeups == seen:
+                    _running -= 1
+                    return
+    finally:
+        close_old_connections()
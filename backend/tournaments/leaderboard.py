@@ -0,0 +1,357 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import Coalesce
+
+from .logos import WEB_LOGO_SIZE, logo_url, variant_paths
+from .models import Score, Team, TeamStanding, Tournament
+
+# Tiebreak order used by every leaderboard (API, image, zip):
+# Total Points, WWCD, Position Points, Kills (all desc), then team name / id so ties are stable.
+STANDINGS_ORDER = ('-total_points', '-total_wwcd', '-total_position_points', '-total_kills', 'name', 'id')
+# Same order expressed on TeamStanding
+TEAM_STANDING_ORDER = ('-total_points', '-total_wwcd', '-total_position_points', '-total_kills', 'team__name', 'team_id')
+
+STANDING_FIELDS = ('total_points', 'total_kills', 'total_wwcd', 'matches_played', 'total_position_points')
+
+
+def standings_queryset(tournament, match_id=None):
+    """Teams of `tournament` annotated with their aggregated scores, in leaderboard order.
+
+    Everything is computed by a single grouped query; `match_id` restricts the
+    aggregation to one match (teams without a score there still appear with zeros).
+    """
+    score_filter = Q(scores__match_id=match_id) if match_id else None
+    wwcd_filter = Q(scores__placement=1)
+    if score_filter is not None:
+        wwcd_filter &= score_filter
+
+    return (
+        tournament.teams
+        .annotate(
+            total_points=Coalesce(Sum('scores__total_points', filter=score_filter), 0),
+            total_kills=Coalesce(Sum('scores__kills', filter=score_filter), 0),
+            total_wwcd=Count('scores', filter=wwcd_filter),
+            matches_played=Count('scores__match', filter=score_filter, distinct=True),
+        )
+        .annotate(total_position_points=F('total_points') - F('total_kills'))
+        .order_by(*STANDINGS_ORDER)
+    )
+
+
+def _row(team, totals):
+    return {
+        "team_id": team.id,
+        "team_name": team.name,
+        "team_logo": team.logo,  # FieldFile, may be empty
+        "team_logo_variants": team.logo_variants,
+        "total_points": totals.total_points,
+        "total_kills": totals.total_kills,
+        "total_wwcd": totals.total_wwcd,
+        "total_position_points": totals.total_position_points,
+        "matches": totals.matches_played,
+    }
+
+
+def compute_leaderboard(tournament, match_id=None):
+    """Return the leaderboard as a list of plain dicts, best team first.
+
+    The overall leaderboard is read from the materialized TeamStanding rows;
+    per-match leaderboards are aggregated from Score on demand.
+    """
+    if match_id:
+        return [_row(team, team) for team in standings_queryset(tournament, match_id)]
+    return [_row(standing.team, standing) for standing in _stored_standings(tournament)]
+
+
+async def acompute_leaderboard(tournament, match_id=None):
+    """compute_leaderboard for the async read views, using the async ORM."""
+    if match_id:
+        return [_row(team, team) async for team in standings_queryset(tournament, match_id)]
+    return [_row(standing.team, standing) async for standing in _stored_standings(tournament)]
+
+
+def _stored_standings(tournament):
+    return (
+        TeamStanding.objects
+        .filter(tournament=tournament)
+        .select_related('team')
+        .order_by('rank', 'team_id')
+    )
+
+
+# --- Materialized standings -------------------------------------------------
+
+def _contribution(values):
+    team_id, points, kills, placement = values
+    return team_id, (points, kills, 1 if placement == 1 else 0, 1, points - kills)
+
+
+def apply_score_change(tournament_id, previous, current):
+    """Update TeamStanding for one score write.
+
+    `previous` / `current` are (team_id, total_points, kills, placement) tuples
+    describing the score before and after the write (None for create / delete).
+    Must run inside the transaction that writes the score.
+    """
+    apply_score_changes(tournament_id, [(previous, current)])
+
+
+def lock_tournament(tournament_id):
+    """Serialise standings writers of one tournament until the end of the transaction.
+
+    Ranks are recomputed from every team's totals, so two writers touching different
+    teams (or matches) must not interleave; row locks on the changed standings alone
+    would let one of them rank against stale totals.
+    """
+    list(Tournament.objects.select_for_update().filter(pk=tournament_id).values_list('pk', flat=True))
+
+
+def apply_score_changes(tournament_id, changes):
+    """Batch form of apply_score_change: one locked read and one bulk write for all teams."""
+    deltas = {}
+    for previous, current in changes:
+        for values, sign in ((previous, -1), (current, 1)):
+            if values is None:
+                continue
+            team_id, contribution = _contribution(values)
+            totals = deltas.setdefault(team_id, [0] * len(STANDING_FIELDS))
+            for i, value in enumerate(contribution):
+                totals[i] += sign * value
+
+    deltas = {team_id: delta for team_id, delta in deltas.items() if any(delta)}
+    if not deltas:
+        return
+
+    lock_tournament(tournament_id)
+    standings = TeamStanding.objects.filter(team_id__in=deltas)
+    updated = []
+    for standing in standings:
+        for field, value in zip(STANDING_FIELDS, deltas.pop(standing.team_id)):
+            setattr(standing, field, getattr(standing, field) + value)
+        updated.append(standing)
+    TeamStanding.objects.bulk_update(updated, STANDING_FIELDS)
+
+    # Teams that predate the standings table (or lost their row): recompute them fully
+    for team_id in deltas:
+        _rebuild_team_standing(team_id)
+
+    refresh_ranks(tournament_id)
+
+
+def _rebuild_team_standing(team_id):
+    team = Team.objects.select_related('tournament').filter(pk=team_id).first()
+    if team is None:
+        return
+    totals = standings_queryset(team.tournament).get(pk=team_id)
+    TeamStanding.objects.update_or_create(
+        team=team,
+        defaults={'tournament': team.tournament, **{f: getattr(totals, f) for f in STANDING_FIELDS}},
+    )
+
+
+def add_team_standing(team):
+    lock_tournament(team.tournament_id)
+    TeamStanding.objects.create(team=team, tournament_id=team.tournament_id)
+    refresh_ranks(team.tournament_id)
+
+
+def refresh_ranks(tournament_id):
+    """Re-number TeamStanding.rank for a tournament, writing only the rows that moved.
+
+    Callers hold lock_tournament for the surrounding transaction.
+    """
+    standings = (
+        TeamStanding.objects
+        .filter(tournament_id=tournament_id)
+        .order_by(*TEAM_STANDING_ORDER)
+        .only('id', 'rank')
+    )
+    moved = []
+    for rank, standing in enumerate(standings, start=1):
+        if standing.rank != rank:
+            standing.rank = rank
+            moved.append(standing)
+    if moved:
+        TeamStanding.objects.bulk_update(moved, ['rank'])
+
+
+def rebuild_standings(tournament):
+    """Recompute every TeamStanding of `tournament` from its scores."""
+    with transaction.atomic():
+        lock_tournament(tournament.id)
+        existing = {s.team_id: s for s in TeamStanding.objects.filter(tournament=tournament)}
+        to_create, to_update = [], []
+        for rank, team in enumerate(standings_queryset(tournament), start=1):
+            standing = existing.pop(team.id, None) or TeamStanding(team=team, tournament=tournament)
+            for field in STANDING_FIELDS:
+                setattr(standing, field, getattr(team, field))
+            standing.rank = rank
+            (to_update if standing.pk else to_create).append(standing)
+
+        TeamStanding.objects.bulk_create(to_create)
+        TeamStanding.objects.bulk_update(to_update, STANDING_FIELDS + ('rank',))
+        if existing:
+            TeamStanding.objects.filter(pk__in=[s.pk for s in existing.values()]).delete()
+
+
+def verify_standings(tournament):
+    """Compare stored standings with a full recompute.
+
+    Returns a list of (team_id, field, stored, expected) tuples; empty when in sync.
+    """
+    stored = {s.team_id: s for s in TeamStanding.objects.filter(tournament=tournament)}
+    mismatches = []
+    for rank, team in enumerate(standings_queryset(tournament), start=1):
+        standing = stored.pop(team.id, None)
+        if standing is None:
+            mismatches.append((team.id, 'standing', None, 'missing'))
+            continue
+        for field in STANDING_FIELDS:
+            if getattr(standing, field) != getattr(team, field):
+                mismatches.append((team.id, field, getattr(standing, field), getattr(team, field)))
+        if standing.rank != rank:
+            mismatches.append((team.id, 'rank', standing.rank, rank))
+    for team_id in stored:
+        mismatches.append((team_id, 'standing', 'orphaned', None))
+    return mismatches
+
+
+def api_row(row):
+    """Shape a leaderboard row for the JSON API."""
+    return {
+        "team_id": row["team_id"],
+        "team_name": row["team_name"],
+        "team_logo": row["team_logo"].url if row["team_logo"] else None,
+        "team_logo_thumb": logo_url(row["team_logo"], row["team_logo_variants"], WEB_LOGO_SIZE),
+        "total_points": row["total_points"],
+        "total_kills": row["total_kills"],
+        "total_wwcd": row["total_wwcd"],
+        "total_position_points": row["total_position_points"],
+    }
+
+
+def image_row(row):
+    """Shape a leaderboard row for create_leaderboard_image."""
+    return {
+        "team_name": row["team_name"],
+        "team_logo": row["team_logo"].path if row["team_logo"] else None,
+        # {"<px>": path}; the renderer picks the one matching the theme's logo_size
+        "team_logo_variants": variant_paths(row["team_logo_variants"]),
+        "wwcd": row["total_wwcd"],
+        "matches": row["matches"],
+        "pos_pts": row["total_position_points"],
+        "fin_pts": row["total_kills"],
+        "total": row["total_points"],
+    }
+
+
+# --- Versioned cache ---------------------------------------------------------
+
+def bump_leaderboard_version(tournament_id):
+    """Invalidate every cached leaderboard of a tournament."""
+    Tournament.objects.filter(pk=tournament_id).update(leaderboard_version=F('leaderboard_version') + 1)
+
+
+def leaderboard_etag(tournament, match_id=None):
+    return f'"lb-{tournament.id}-{match_id or "all"}-{tournament.leaderboard_version}"'
+
+
+def cached_leaderboard(tournament, match_id=None):
+    """API rows for the tournament's current leaderboard version, computed at most once per version."""
+    cache = caches[settings.LEADERBOARD_CACHE]
+    key = _leaderboard_key(tournament, match_id)
+    rows = cache.get(key)
+    if rows is None:
+        rows = [api_row(row) for row in compute_leaderboard(tournament, match_id)]
+        cache.set(key, rows, settings.LEADERBOARD_CACHE_TIMEOUT)
+    return rows
+
+
+async def acached_leaderboard(tournament, match_id=None):
+    """cached_leaderboard for the async read views (same cache entries)."""
+    cache = caches[settings.LEADERBOARD_CACHE]
+    key = _leaderboard_key(tournament, match_id)
+    rows = await cache.aget(key)
+    if rows is None:
+        rows = [api_row(row) for row in await acompute_leaderboard(tournament, match_id)]
+        await cache.aset(key, rows, settings.LEADERBOARD_CACHE_TIMEOUT)
+    return rows
+
+
+def _leaderboard_key(tournament, match_id):
+    return f"leaderboard:{tournament.id}:{match_id or 'all'}:{tournament.leaderboard_version}"
+
+
+# --- Timeline ----------------------------------------------------------------
+
+def compute_timeline(tournament):
+    """Cumulative standings after each match, ordered by match_number.
+
+    Loads the tournament's score matrix once and walks it with running totals,
+    ranking with the same tiebreak as the leaderboard after every match.
+    """
+    matches = list(tournament.matches.order_by('match_number').values('id', 'match_number', 'map_name'))
+    teams = list(tournament.teams.values('id', 'name'))
+    by_match = {}
+    for team_id, match_id, points, kills, placement in (
+        Score.objects.filter(match__tournament=tournament)
+        .values_list('team_id', 'match_id', 'total_points', 'kills', 'placement')
+    ):
+        by_match.setdefault(match_id, []).append((team_id, points, kills, placement))
+
+    # Running [points, wwcd, position points, kills] per team
+    totals = {team['id']: [0, 0, 0, 0] for team in teams}
+    names = {team['id']: team['name'] for team in teams}
+    timelines = {team['id']: [] for team in teams}
+    previous_rank = {}
+
+    for match in matches:
+        match_points = {}
+        for team_id, points, kills, placement in by_match.get(match['id'], ()):
+            running = totals[team_id]
+            running[0] += points
+            running[1] += 1 if placement == 1 else 0
+            running[2] += points - kills
+            running[3] += kills
+            match_points[team_id] = points
+
+        order = sorted(totals, key=lambda t: (-totals[t][0], -totals[t][1], -totals[t][2], -totals[t][3], names[t], t))
+        for rank, team_id in enumerate(order, start=1):
+            before = previous_rank.get(team_id)
+            timelines[team_id].append({
+                "match_id": match['id'],
+                "match_points": match_points.get(team_id, 0),
+                "total_points": totals[team_id][0],
+                "rank": rank,
+                # Positive = moved up since the previous match
+                "rank_change": before - rank if before is not None else 0,
+            })
+            previous_rank[team_id] = rank
+
+    final_order = sorted(teams, key=lambda team: (previous_rank.get(team['id'], 0), team['name'], team['id']))
+    return {
+        "matches": [
+            {"match_id": m['id'], "match_number": m['match_number'], "map_name": m['map_name']}
+            for m in matches
+        ],
+        "teams": [
+            {"team_id": team['id'], "team_name": team['name'], "timeline": timelines[team['id']]}
+            for team in final_order
+        ],
+    }
+
+
+def timeline_etag(tournament):
+    return f'"tl-{tournament.id}-{tournament.leaderboard_version}"'
+
+
+def cached_timeline(tournament):
+    cache = caches[settings.LEADERBOARD_CACHE]
+    key = f"leaderboard_timeline:{tournament.id}:{tournament.leaderboard_version}"
+    timeline = cache.get(key)
+    if timeline is None:
+        timeline = {"version": tournament.leaderboard_version, **compute_timeline(tournament)}
+        cache.set(key, timeline, settings.LEADERBOARD_CACHE_TIMEOUT)
+    return timeline
@@ -0,0 +1,121 @@
+import io
+import os
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image
+
+# Leaderboard rows show logos at 48px; 2x for high-density screens
+WEB_LOGO_SIZE = 96
+
+
+def theme_logo_size(theme):
+    """The theme's logo_size in px (the renderer's default 40), or None if it is not a number."""
+    try:
+        return int((theme.layout_config or {}).get('logo_size', 40))
+    except (ValueError, TypeError):
+        return None
+
+
+def variant_sizes(team):
+    """Sizes the web UI uses plus every logo_size configured on the team's tournament themes."""
+    sizes = set(settings.TEAM_LOGO_SIZES)
+    sizes.update(size for size in map(theme_logo_size, team.tournament.themes.all()) if size is not None)
+    return sorted(size for size in sizes if size > 0)
+
+
+def _variant_name(team, size):
+    stem = os.path.splitext(os.path.basename(team.logo.name))[0]
+    return f"team_logos/variants/{stem}_{size}.png"
+
+
+def generate_logo_variants(team, sizes=None):
+    """Write a square RGBA PNG of the team logo for each size; returns {"<px>": storage name}."""
+    if sizes is None:
+        sizes = variant_sizes(team)
+
+    with team.logo.open('rb') as logo_file:
+        original = Image.open(logo_file).convert("RGBA")
+
+    variants = {}
+    for size in sizes:
+        # Same resize the renderer used to do on every page
+        resized = original.resize((size, size), Image.Resampling.LANCZOS)
+        buffer = io.BytesIO()
+        resized.save(buffer, format="PNG", optimize=True)
+        name = _variant_name(team, size)
+        if default_storage.exists(name):
+            default_storage.delete(name)
+        variants[str(size)] = default_storage.save(name, ContentFile(buffer.getvalue()))
+    return variants
+
+
+def delete_logo_variants(names):
+    for name in names:
+        try:
+            default_storage.delete(name)
+        except OSError:
+            pass
+
+
+def refresh_logo_variants(team, sizes=None):
+    """Regenerate the team's variants from its current logo (or clear them if it has none)."""
+    from .models import Team
+
+    previous = dict(team.logo_variants or {})
+    variants = generate_logo_variants(team, sizes) if team.logo else {}
+    delete_logo_variants(name for name in previous.values() if name not in variants.values())
+
+    Team.objects.filter(pk=team.pk).update(logo_variants=variants)
+    team.logo_variants = variants
+    return variants
+
+
+def add_theme_logo_variants(theme):
+    """Give every team of the theme's tournament a variant at the theme's logo_size; returns how many got one.
+
+    Variants are made at upload for the themes that exist then, so a new theme or a
+    changed logo_size would otherwise resize full logos on every render.
+    """
+    from .models import Team
+
+    size = theme_logo_size(theme)
+    if not size or size <= 0:
+        return 0
+    teams = [
+        team for team in Team.objects.filter(tournament_id=theme.tournament_id).exclude(logo='').exclude(logo__isnull=True)
+        if str(size) not in (team.logo_variants or {})
+    ]
+    updated = []
+    for team in teams:
+        try:
+            team.logo_variants = {**(team.logo_variants or {}), **generate_logo_variants(team, [size])}
+        except Exception as e:
+            print(f"Logo variant error for team {team.id}: {e}")
+            continue
+        updated.append(team)
+    Team.objects.bulk_update(updated, ['logo_variants'], batch_size=500)
+    return len(updated)
+
+
+def logo_for_size(logo, variants, size):
+    """Storage name of the smallest variant of at least `size` px, else the original logo's (None without a logo)."""
+    if not logo:
+        return None
+    sizes = sorted(int(px) for px in (variants or {}) if int(px) >= size)
+    return variants[str(sizes[0])] if sizes else logo.name
+
+
+def logo_url(logo, variants, size):
+    name = logo_for_size(logo, variants, size)
+    return default_storage.url(name) if name else None
+
+
+def variant_paths(variants):
+    """{"<px>": filesystem path} for the renderer, which runs without the models."""
+    return {px: default_storage.path(name) for px, name in (variants or {}).items()}
+
+
+def variant_urls(variants):
+    return {px: default_storage.url(name) for px, name in (variants or {}).items()}
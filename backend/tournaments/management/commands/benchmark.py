@@ -0,0 +1,306 @@
+import json
+import os
+import platform
+import shutil
+import statistics
+import tempfile
+import threading
+import time
+import tracemalloc
+import zipfile
+from contextlib import contextmanager, nullcontext
+from io import BytesIO
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from PIL import Image
+
+from tournaments import rendering
+
+DEFAULT_BASELINE = os.path.join(settings.BASE_DIR, 'benchmarks', 'baseline.json')
+
+LAYOUT = {
+    "start_x": 120, "start_y": 200, "row_height": 40, "font_size": 28, "logo_size": 32,
+    "columns": {"rank": 0, "logo": 60, "team": 110, "wwcd": 900, "matches": 1050,
+                "pos_pts": 1200, "fin_pts": 1350, "total": 1500},
+}
+
+
+def current_rss_kib():
+    """Resident set size of this process in KiB; None where /proc is not available."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') // 1024
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+@contextmanager
+def sample_rss(interval=0.005):
+    """Track the peak RSS growth (KiB) over the block; yields a dict whose 'growth' is set on exit.
+
+    Sampled from a thread, so spikes shorter than `interval` can be missed; memory that
+    earlier cases freed but the allocator kept is reused without showing up.
+    """
+    result = {"growth": None}
+    start = current_rss_kib()
+    if start is None:
+        yield result
+        return
+    peak = start
+    done = threading.Event()
+
+    def sample():
+        nonlocal peak
+        while not done.wait(interval):
+            peak = max(peak, current_rss_kib())
+
+    sampler = threading.Thread(target=sample, daemon=True)
+    sampler.start()
+    try:
+        yield result
+    finally:
+        done.set()
+        sampler.join()
+        result["growth"] = max(peak, current_rss_kib()) - start
+
+
+def measure(func, repeat):
+    """Run `func` once under tracemalloc / query capture, then `repeat` more times untraced.
+
+    Returns wall_ms (fastest untraced run), median_ms, rss_kib (peak resident memory
+    growth during the first untraced run, Pillow's pixel buffers included; None off
+    Linux), py_heap_kib (peak Python allocations during the traced run) and queries.
+    """
+    tracemalloc.start()
+    try:
+        with CaptureQueriesContext(connection) as ctx:
+            func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    timings = []
+    for run in range(max(repeat, 1)):
+        with sample_rss() if run == 0 else nullcontext() as rss:
+            started = time.perf_counter()
+            func()
+            timings.append((time.perf_counter() - started) * 1000)
+        if run == 0:
+            rss_kib = rss["growth"]
+    return {
+        "wall_ms": round(min(timings), 2),
+        "median_ms": round(statistics.median(timings), 2),
+        "rss_kib": rss_kib,
+        "py_heap_kib": round(peak / 1024, 1),
+        "queries": len(ctx.captured_queries),
+    }
+
+
+def make_benchmark_tournament(creator, num_teams, num_matches):
+    """Synthetic tournament with a 1920x1080 theme and a distinct logo (plus variants) per team."""
+    from tournaments.logos import generate_logo_variants
+    from tournaments.models import Team, TournamentTheme
+    from tournaments.synthetic import make_synthetic_tournament
+
+    tournament = make_synthetic_tournament(creator, num_teams, num_matches, name=f"Bench {num_teams}")
+
+    buffer = BytesIO()
+    Image.new("RGB", (1920, 1080), (18, 18, 36)).save(buffer, format="PNG")
+    theme_name = default_storage.save(f"tournament_themes/bench_{tournament.id}.png", ContentFile(buffer.getvalue()))
+    theme = TournamentTheme.objects.create(tournament=tournament, theme_image=theme_name, layout_config=LAYOUT)
+
+    teams = list(tournament.teams.select_related('tournament'))
+    for i, team in enumerate(teams):
+        buffer = BytesIO()
+        Image.new("RGB", (256, 256), ((i * 37) % 256, (i * 91) % 256, 120)).save(buffer, format="PNG")
+        team.logo = default_storage.save(f"team_logos/bench_{team.id}.png", ContentFile(buffer.getvalue()))
+        team.logo_variants = generate_logo_variants(team, sizes=sorted({*settings.TEAM_LOGO_SIZES, LAYOUT["logo_size"]}))
+    Team.objects.bulk_update(teams, ['logo', 'logo_variants'], batch_size=500)
+    return tournament, theme
+
+
+def run_benchmarks(creator, team_counts, page_sizes, num_matches=6, repeat=3, formats=None, stdout=None,
+                   pool_workers=0):
+    """Time aggregation, single-page render, full zip, serial vs pooled page rendering and
+    encoding; returns {case: metrics}.
+
+    Must run against a throwaway database with MEDIA_ROOT pointing at a scratch directory.
+    Renders use a fresh render cache every run, so each one really draws the page(s);
+    decoded assets stay warm in the in-process asset cache, as they are in production.
+    The render/serial and render/pool cases draw every page of the largest tournament
+    inline and on a pool of `pool_workers` processes (0 = available cores); the memory
+    columns of the pool case only cover this process, not the workers.
+    """
+    from tournaments.leaderboard import compute_leaderboard, image_row, rebuild_standings
+
+    formats = formats or list(rendering.IMAGE_FORMATS)
+    results = {}
+
+    def record(case, func):
+        results[case] = measure(func, repeat)
+        if stdout is not None:
+            stdout.write(f"  {case}: {results[case]['wall_ms']} ms")
+
+    def fresh_render_cache(func):
+        def run():
+            cache.clear()
+            with override_settings(RENDER_CACHE_DIR=tempfile.mkdtemp(dir=settings.MEDIA_ROOT)):
+                func()
+        return run
+
+    page_image = None
+    for num_teams in team_counts:
+        tournament, theme = make_benchmark_tournament(creator, num_teams, num_matches)
+
+        record(f"aggregate/rebuild/teams={num_teams}", lambda: rebuild_standings(tournament))
+        record(f"aggregate/read/teams={num_teams}", lambda: compute_leaderboard(tournament))
+
+        for per_page in page_sizes:
+            theme.teams_per_page = per_page
+            suffix = f"teams={num_teams}/per_page={per_page}"
+
+            def page():
+                with rendering.leaderboard_page(tournament, theme, None, 1, per_page):
+                    pass
+
+            def archive():
+                # As a render job builds it, so --workers applies
+                for _ in rendering.leaderboard_zip(tournament, theme, zipfile.ZIP_STORED,
+                                                   workers=rendering.render_workers()):
+                    pass
+
+            fresh_render_cache(page)()  # warm the asset cache
+            record(f"page/{suffix}", fresh_render_cache(page))
+            record(f"zip/{suffix}", fresh_render_cache(archive))
+
+        if num_teams == max(team_counts):
+            spec = rendering.render_spec(tournament, theme, rendering.output_encoding())
+            rows = [image_row(row) for row in compute_leaderboard(tournament)]
+
+            for per_page in page_sizes:
+                pages = [(rows[start:start + per_page], start) for start in range(0, len(rows), per_page)]
+                suffix = f"teams={num_teams}/per_page={per_page}"
+                record(f"render/serial/{suffix}", lambda: [
+                    rendering.render_page_bytes(spec, page_data, start) for page_data, start in pages
+                ])
+                with override_settings(RENDER_WORKERS=pool_workers):
+                    rendering.render_pages(spec, pages)  # start the pool and warm its workers' caches
+                    record(f"render/pool/{suffix}", lambda: rendering.render_pages(spec, pages))
+
+            # Encode the fullest page of the largest tournament
+            page_image = Image.open(rendering.render_page(spec, rows[:max(page_sizes)], 0)).convert("RGBA")
+
+    for image_format in formats:
+        encoding = rendering.output_encoding(params={'image_format': image_format})
+        size = len(rendering.encode_image(page_image, encoding).getvalue())
+        record(f"encode/{image_format}", lambda: rendering.encode_image(page_image, encoding))
+        results[f"encode/{image_format}"]["bytes"] = size
+    return results
+
+
+def compare(results, baseline, threshold):
+    """(case, ratio, reasons) for every case slower than baseline by more than `threshold` or issuing more queries."""
+    regressions = []
+    for case, metrics in results.items():
+        before = baseline.get(case)
+        if not before:
+            continue
+        reasons = []
+        ratio = metrics["wall_ms"] / before["wall_ms"] if before["wall_ms"] else 1.0
+        if ratio > 1 + threshold:
+            reasons.append(f"{ratio:.2f}x slower")
+        if metrics["queries"] > before["queries"]:
+            reasons.append(f"{before['queries']} -> {metrics['queries']} queries")
+        if reasons:
+            regressions.append((case, ratio, reasons))
+    return regressions
+
+
+class Command(BaseCommand):
+    help = ("Benchmark leaderboard aggregation, single-page render, full zip, serial vs pooled page "
+            "rendering and image encoding on synthetic tournaments in a throwaway database, reporting "
+            "wall time, resident memory growth, Python heap peak and query counts, and compare against "
+            "(or save) a stored baseline.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--teams', type=int, nargs='+', default=[20, 100, 500])
+        parser.add_argument('--per-page', type=int, nargs='+', default=[10, 20])
+        parser.add_argument('--matches', type=int, default=6)
+        parser.add_argument('--repeat', type=int, default=3)
+        parser.add_argument('--workers', type=int, default=1,
+                            help="RENDER_WORKERS for the zip runs (1 = render inline, so memory covers the renders).")
+        parser.add_argument('--pool-workers', type=int, default=0,
+                            help="Pool size for the render/pool cases (0 = available cores).")
+        parser.add_argument('--baseline', default=DEFAULT_BASELINE, help="Baseline JSON file.")
+        parser.add_argument('--save-baseline', action='store_true', help="Store this run as the new baseline.")
+        parser.add_argument('--threshold', type=float, default=0.25,
+                            help="Flag cases slower than the baseline by more than this fraction.")
+        parser.add_argument('--fail-on-regression', action='store_true')
+
+    def handle(self, *args, **options):
+        from tournaments.models import User
+
+        media_root = tempfile.mkdtemp()
+        old_name = connection.settings_dict['NAME']
+        # Never touch the real database or media
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            with override_settings(MEDIA_ROOT=media_root, RENDER_CACHE_DIR=os.path.join(media_root, 'render_cache'),
+                                   RENDER_WORKERS=options['workers']):
+                rendering.asset_cache.clear()
+                organiser = User.objects.create_user(username="bench", password="bench", role=User.Role.ORGANISER)
+                results = run_benchmarks(organiser, options['teams'], options['per_page'], options['matches'],
+                                         options['repeat'], stdout=self.stdout, pool_workers=options['pool_workers'])
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            shutil.rmtree(media_root, ignore_errors=True)
+
+        baseline = {}
+        if os.path.exists(options['baseline']):
+            with open(options['baseline']) as f:
+                baseline = json.load(f).get('results', {})
+
+        self.stdout.write(f"\n{'case':<40} {'wall ms':>9} {'median':>9} {'vs base':>8} {'RSS +KiB':>10} "
+                          f"{'py heap KiB':>12} {'queries':>8}")
+        for case, metrics in results.items():
+            before = baseline.get(case)
+            delta = f"{metrics['wall_ms'] / before['wall_ms']:.2f}x" if before and before['wall_ms'] else "-"
+            rss = "-" if metrics['rss_kib'] is None else metrics['rss_kib']
+            self.stdout.write(
+                f"{case:<40} {metrics['wall_ms']:>9.1f} {metrics['median_ms']:>9.1f} {delta:>8} "
+                f"{rss:>10} {metrics['py_heap_kib']:>12.1f} {metrics['queries']:>8}"
+            )
+
+        for case, metrics in results.items():
+            pooled = results.get(case.replace('render/serial/', 'render/pool/', 1))
+            if case.startswith('render/serial/') and pooled and pooled['wall_ms']:
+                self.stdout.write(f"Pool speedup {case[len('render/serial/'):]}: "
+                                  f"{metrics['wall_ms'] / pooled['wall_ms']:.2f}x")
+
+        regressions = compare(results, baseline, options['threshold'])
+        for case, _, reasons in regressions:
+            self.stdout.write(self.style.WARNING(f"Regression: {case}: {', '.join(reasons)}"))
+
+        if options['save_baseline']:
+            os.makedirs(os.path.dirname(os.path.abspath(options['baseline'])), exist_ok=True)
+            with open(options['baseline'], 'w') as f:
+                json.dump({
+                    "created": timezone.now().isoformat(),
+                    "python": platform.python_version(),
+                    "machine": platform.platform(),
+                    "workers": options['workers'],
+                    "matches": options['matches'],
+                    "results": results,
+                }, f, indent=2)
+            self.stdout.write(f"Baseline saved to {options['baseline']}")
+
+        if regressions and options['fail_on_regression']:
+            raise CommandError(f"{len(regressions)} benchmark(s) regressed.")
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+
+from tournaments.logos import refresh_logo_variants, variant_sizes
+from tournaments.models import Team
+
+
+class Command(BaseCommand):
+    help = "Generate pre-sized logo variants for teams uploaded before they existed (or whose themes need new sizes)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tournament', type=int, action='append', dest='tournaments',
+                            help="Only teams of this tournament id (can be repeated).")
+        parser.add_argument('--force', action='store_true',
+                            help="Regenerate every variant, not only missing sizes.")
+
+    def handle(self, *args, **options):
+        teams = (
+            Team.objects.exclude(logo='').exclude(logo__isnull=True)
+            .select_related('tournament').prefetch_related('tournament__themes').order_by('id')
+        )
+        if options['tournaments']:
+            teams = teams.filter(tournament_id__in=options['tournaments'])
+
+        generated = skipped = failed = 0
+        for team in teams.iterator(chunk_size=200):
+            sizes = variant_sizes(team)
+            if not options['force'] and all(str(size) in (team.logo_variants or {}) for size in sizes):
+                skipped += 1
+                continue
+            try:
+                refresh_logo_variants(team, sizes)
+                generated += 1
+            except Exception as e:
+                failed += 1
+                self.stderr.write(f"{team.name} (#{team.id}): {e}")
+
+        self.stdout.write(f"Generated variants for {generated} team(s), {skipped} already up to date, {failed} failed.")
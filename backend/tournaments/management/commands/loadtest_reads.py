@@ -0,0 +1,121 @@
+import asyncio
+import statistics
+import time
+
+from django.conf import settings
+from django.core.asgi import get_asgi_application
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import override_settings
+
+
+async def asgi_get(app, path, query=""):
+    """Send one GET through the ASGI app in-process and return (status, seconds)."""
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "GET", "scheme": "http", "path": path, "raw_path": path.encode(),
+        "query_string": query.encode(), "root_path": "",
+        "headers": [(b"host", settings.ALLOWED_HOSTS[0].encode() if settings.ALLOWED_HOSTS else b"localhost")],
+        "client": ("127.0.0.1", 50000), "server": ("127.0.0.1", 80),
+    }
+    sent_body = False
+    status = None
+
+    async def receive():
+        nonlocal sent_body
+        if not sent_body:
+            sent_body = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        # Django listens for a disconnect until the response is done, then cancels this
+        await asyncio.Event().wait()
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    started = time.perf_counter()
+    await app(scope, receive, send)
+    return status, time.perf_counter() - started
+
+
+async def run_load(app, targets, concurrency, total):
+    """`concurrency` viewers issuing `total` requests round-robin over `targets`."""
+    latencies = []
+    errors = 0
+    counter = iter(range(total))
+
+    async def viewer():
+        nonlocal errors
+        for i in counter:
+            path, query = targets[i % len(targets)]
+            status, seconds = await asgi_get(app, path, query)
+            latencies.append(seconds)
+            if status != 200:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(viewer() for _ in range(concurrency)))
+    return time.perf_counter() - started, latencies, errors
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * pct / 100), len(ordered) - 1)]
+
+
+class Command(BaseCommand):
+    help = ("Load-test the hot read endpoints through the ASGI app in-process, with the sync DRF "
+            "viewsets and with the async views (ASYNC_READ_VIEWS), and compare throughput / p99.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=50, help="Concurrent viewers.")
+        parser.add_argument('--requests', type=int, default=2000, help="Requests per mode.")
+        parser.add_argument('--tournament', type=int,
+                            help="Use this existing tournament instead of a synthetic one in a throwaway test database.")
+        parser.add_argument('--teams', type=int, default=100)
+        parser.add_argument('--matches', type=int, default=12)
+
+    def handle(self, *args, **options):
+        old_name = None
+        try:
+            if options['tournament']:
+                tournament_id = options['tournament']
+            else:
+                # Never touch the real database: build the data in a test database
+                from tournaments.models import User
+                from tournaments.synthetic import make_synthetic_tournament
+
+                old_name = connection.settings_dict['NAME']
+                connection.creation.create_test_db(verbosity=0, autoclobber=True)
+                organiser = User.objects.create_user(username="loadtest", password="loadtest", role=User.Role.ORGANISER)
+                tournament_id = make_synthetic_tournament(organiser, options['teams'], options['matches']).id
+
+            targets = [
+                (f"/api/tournaments/{tournament_id}/leaderboard/", ""),
+                (f"/api/tournaments/{tournament_id}/", ""),
+                ("/api/matches/", f"tournament={tournament_id}"),
+                ("/api/featured/", ""),
+            ]
+            app = get_asgi_application()
+
+            results = {}
+            for label, async_reads in (("sync", False), ("async", True)):
+                with override_settings(ASYNC_READ_VIEWS=async_reads):
+                    cache.clear()
+                    asyncio.run(run_load(app, targets, options['concurrency'], len(targets)))  # warm up
+                    results[label] = asyncio.run(run_load(app, targets, options['concurrency'], options['requests']))
+        finally:
+            if old_name is not None:
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        self.stdout.write(f"{options['requests']} requests per mode, {options['concurrency']} concurrent viewers")
+        self.stdout.write(f"{'mode':<6} {'req/s':>9} {'p50 ms':>9} {'p99 ms':>9} {'errors':>7}")
+        for label, (elapsed, latencies, errors) in results.items():
+            self.stdout.write(
+                f"{label:<6} {len(latencies) / elapsed:>9.1f} {statistics.median(latencies) * 1000:>9.1f} "
+                f"{percentile(latencies, 99) * 1000:>9.1f} {errors:>7}"
+            )
+        if any(errors for _, _, errors in results.values()):
+            raise CommandError("Some requests did not return 200.")
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from tournaments.leaderboard import rebuild_standings, verify_standings
+from tournaments.models import Tournament
+
+
+class Command(BaseCommand):
+    help = "Rebuild the TeamStanding table from scores and verify it against a full recompute."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tournament', type=int, action='append', dest='tournaments',
+                            help="Only this tournament id (can be repeated).")
+        parser.add_argument('--check', action='store_true',
+                            help="Only verify the stored standings, do not rebuild them.")
+
+    def handle(self, *args, **options):
+        tournaments = Tournament.objects.order_by('id')
+        if options['tournaments']:
+            tournaments = tournaments.filter(id__in=options['tournaments'])
+
+        failed = 0
+        for tournament in tournaments:
+            if not options['check']:
+                with transaction.atomic():
+                    rebuild_standings(tournament)
+
+            mismatches = verify_standings(tournament)
+            if mismatches:
+                failed += 1
+                self.stderr.write(f"{tournament.name} (#{tournament.id}): {len(mismatches)} mismatches")
+                for team_id, field, stored, expected in mismatches:
+                    self.stderr.write(f"  team {team_id} {field}: stored={stored} expected={expected}")
+            else:
+                self.stdout.write(f"{tournament.name} (#{tournament.id}): OK")
+
+        if failed:
+            raise CommandError(f"{failed} tournament(s) have standings that differ from a full recompute.")
@@ -0,0 +1,22 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from tournaments.jobs import run_pending_jobs
+
+
+class Command(BaseCommand):
+    help = "Run queued leaderboard render jobs (use with RENDER_JOB_WORKERS=0 to keep renders out of the web process)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Drain the queue once and exit.")
+        parser.add_argument('--interval', type=float, default=1.0, help="Seconds between polls when idle.")
+
+    def handle(self, *args, **options):
+        while True:
+            count = run_pending_jobs()
+            if count:
+                self.stdout.write(f"Ran {count} render job(s).")
+            if options['once']:
+                return
+            time.sleep(options['interval'])
@@ -0,0 +1,61 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import Coalesce
+
+
+def backfill_standings(apps, schema_editor):
+    Team = apps.get_model('tournaments', 'Team')
+    TeamStanding = apps.get_model('tournaments', 'TeamStanding')
+    Tournament = apps.get_model('tournaments', 'Tournament')
+
+    for tournament_id in Tournament.objects.values_list('id', flat=True):
+        teams = (
+            Team.objects.filter(tournament_id=tournament_id)
+            .annotate(
+                points=Coalesce(Sum('scores__total_points'), 0),
+                kills=Coalesce(Sum('scores__kills'), 0),
+                wwcd=Count('scores', filter=Q(scores__placement=1)),
+                played=Count('scores__match', distinct=True),
+            )
+            .annotate(position=F('points') - F('kills'))
+            .order_by('-points', '-wwcd', '-position', '-kills', 'name', 'id')
+        )
+        TeamStanding.objects.bulk_create([
+            TeamStanding(
+                team_id=team.id, tournament_id=tournament_id, rank=rank,
+                total_points=team.points, total_kills=team.kills, total_wwcd=team.wwcd,
+                matches_played=team.played, total_position_points=team.position,
+            )
+            for rank, team in enumerate(teams, start=1)
+        ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tournaments', '0011_alter_featuredcontent_id_alter_match_id_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TeamStanding',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total_points', models.IntegerField(default=0)),
+                ('total_kills', models.IntegerField(default=0)),
+                ('total_wwcd', models.IntegerField(default=0)),
+                ('matches_played', models.IntegerField(default=0)),
+                ('total_position_points', models.IntegerField(default=0)),
+                ('rank', models.PositiveIntegerField(default=0)),
+                ('team', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='standing', to='tournaments.team')),
+                ('tournament', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='standings', to='tournaments.tournament')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['tournament', 'rank'], name='standing_tournament_rank_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_standings, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tournaments', '0012_teamstanding'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tournament',
+            name='leaderboard_version',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:34
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tournaments', '0016_renderjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tournamenttheme',
+            name='output_format',
+            field=models.CharField(choices=[('png', 'PNG'), ('jpeg', 'JPEG'), ('webp', 'WebP'), ('webp_lossless', 'WebP (lossless)')], default='png', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='tournamenttheme',
+            name='output_quality',
+            field=models.PositiveSmallIntegerField(default=85, help_text='JPEG / lossy WebP quality', validators=[django.core.validators.MinValueValidator(1), django.core.validators.MaxValueValidator(100)]),
+        ),
+        migrations.AddField(
+            model_name='tournamenttheme',
+            name='output_scale',
+            field=models.FloatField(default=1.0, help_text='Resize factor for the final image', validators=[django.core.validators.MinValueValidator(0.1), django.core.validators.MaxValueValidator(2.0)]),
+        ),
+        migrations.AddField(
+            model_name='tournamenttheme',
+            name='png_compress_level',
+            field=models.PositiveSmallIntegerField(default=6, help_text='PNG zlib level, 0 (fastest) to 9 (smallest)', validators=[django.core.validators.MaxValueValidator(9)]),
+        ),
+    ]
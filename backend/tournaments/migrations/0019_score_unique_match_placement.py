@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:52
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def check_duplicate_placements(apps, schema_editor):
+    # Fail with something readable rather than an IntegrityError from AddConstraint
+    Score = apps.get_model('tournaments', 'Score')
+    duplicates = list(
+        Score.objects.values('match_id', 'placement').annotate(n=Count('id')).filter(n__gt=1)[:10]
+    )
+    if duplicates:
+        listed = ", ".join(f"match {row['match_id']} placement {row['placement']}" for row in duplicates)
+        raise RuntimeError(f"Fix duplicate placements before migrating: {listed}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tournaments', '0018_tournament_list_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(check_duplicate_placements, migrations.RunPython.noop),
+        migrations.RemoveIndex(
+            model_name='score',
+            name='score_match_placement_idx',
+        ),
+        migrations.AddConstraint(
+            model_name='score',
+            constraint=models.UniqueConstraint(fields=('match', 'placement'), name='score_unique_match_placement'),
+        ),
+    ]
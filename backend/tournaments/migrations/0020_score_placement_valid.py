@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:25
+
+import django.core.validators
+from django.db import migrations, models
+
+
+def check_invalid_placements(apps, schema_editor):
+    # Fail with something readable rather than an IntegrityError from AddConstraint
+    Score = apps.get_model('tournaments', 'Score')
+    invalid = list(Score.objects.filter(placement__lt=1).values('id', 'match_id', 'placement')[:10])
+    if invalid:
+        listed = ", ".join(f"score {row['id']} (match {row['match_id']}) placement {row['placement']}" for row in invalid)
+        raise RuntimeError(f"Fix placements below 1 before migrating: {listed}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tournaments', '0019_score_unique_match_placement'),
+    ]
+
+    operations = [
+        migrations.RunPython(check_invalid_placements, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='score',
+            name='placement',
+            field=models.IntegerField(validators=[django.core.validators.MinValueValidator(1)]),
+        ),
+        migrations.AddConstraint(
+            model_name='score',
+            constraint=models.CheckConstraint(condition=models.Q(('placement__gte', 1)), name='score_placement_valid'),
+        ),
+    ]
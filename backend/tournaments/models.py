@@ -1,4 +1,5 @@
-from django.db import models
+from django.core.validators import MaxValueValidator, MinValueValidator
+from django.db import models, transaction
 from django.contrib.auth.models import AbstractUser
 
 class User(AbstractUser):
@@ -32,18 +33,73 @@ class Tournament(models.Model):
     theme_image = models.ImageField(upload_to='tournament_themes/', blank=True, null=True)
     layout_config = models.JSONField(default=dict, blank=True, help_text="Config for image generation: start_x, start_y, row_height, font_size, etc.")
 
+    # Bumped whenever scores, teams, matches or points_config change; keys leaderboard caches / ETags
+    leaderboard_version = models.PositiveIntegerField(default=0, editable=False)
+
+    class Meta:
+        indexes = [
+            # Cursor-paginated list, newest first, optionally by status
+            models.Index(fields=['-created_at', '-id'], name='tournament_created_idx'),
+            models.Index(fields=['status', '-created_at', '-id'], name='tournament_status_created_idx'),
+        ]
+
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        # leaderboard_version is only ever bumped with an UPDATE ... F() + 1; writing back
+        # the value loaded with this instance would resurrect stale caches and ETags
+        if not self._state.adding and not kwargs.get('force_insert'):
+            update_fields = kwargs.get('update_fields')
+            if update_fields is None:
+                update_fields = [f.name for f in self._meta.concrete_fields if not f.primary_key]
+            kwargs['update_fields'] = [name for name in update_fields if name != 'leaderboard_version']
+        super().save(*args, **kwargs)
+
 class Team(models.Model):
     name = models.CharField(max_length=255)
     tournament = models.ForeignKey(Tournament, on_delete=models.CASCADE, related_name='teams')
     members = models.ManyToManyField(User, related_name='teams', blank=True)
     logo = models.ImageField(upload_to='team_logos/', blank=True, null=True)
+    # Pre-sized RGBA copies of `logo`: {"<px>": "<storage name>"}, see logos.py
+    logo_variants = models.JSONField(default=dict, blank=True, editable=False)
 
     def __str__(self):
         return f"{self.name} ({self.tournament.name})"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if 'logo' in field_names:
+            instance._loaded_logo = instance.logo.name
+        return instance
+
+    def save(self, *args, **kwargs):
+        from .leaderboard import add_team_standing
+        creating = self.pk is None
+        logo_changed = (self.logo.name or None) != (getattr(self, '_loaded_logo', None) or None)
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if creating:
+                add_team_standing(self)
+        self._loaded_logo = self.logo.name
+
+        if logo_changed:
+            from .logos import refresh_logo_variants
+            try:
+                refresh_logo_variants(self)
+            except Exception as e:
+                print(f"Logo variant error for team {self.pk}: {e}")
+
+    def delete(self, *args, **kwargs):
+        from .leaderboard import lock_tournament, refresh_ranks
+        with transaction.atomic():
+            lock_tournament(self.tournament_id)
+            result = super().delete(*args, **kwargs)
+            # The team's standing went with it: close the gap in the ranks below
+            refresh_ranks(self.tournament_id)
+        return result
+
 class Match(models.Model):
     tournament = models.ForeignKey(Tournament, on_delete=models.CASCADE, related_name='matches')
     match_number = models.IntegerField()
@@ -56,17 +112,39 @@ class Match(models.Model):
     def __str__(self):
         return f"{self.tournament.name} - Match {self.match_number} ({self.map_name})"
 
+    def delete(self, *args, **kwargs):
+        from .leaderboard import rebuild_standings
+        with transaction.atomic():
+            result = super().delete(*args, **kwargs)
+            # Cascaded score deletes bypass Score.delete, so rebuild standings in one pass
+            rebuild_standings(self.tournament)
+        return result
+
 class Score(models.Model):
     match = models.ForeignKey(Match, on_delete=models.CASCADE, related_name='scores')
     team = models.ForeignKey(Team, on_delete=models.CASCADE, related_name='scores')
     kills = models.IntegerField(default=0)
-    placement = models.IntegerField()
+    placement = models.IntegerField(validators=[MinValueValidator(1)])
     total_points = models.IntegerField(default=0)
 
     class Meta:
         unique_together = ('match', 'team')
-    
+        constraints = [
+            # One team per placement; its index also serves winner lookups / conflict checks
+            models.UniqueConstraint(fields=['match', 'placement'], name='score_unique_match_placement'),
+            models.CheckConstraint(condition=models.Q(placement__gte=1), name='score_placement_valid'),
+        ]
+        indexes = [
+            # Per-team aggregation, optionally restricted to one match
+            models.Index(fields=['team', 'match'], name='score_team_match_idx'),
+        ]
+
+    def standing_values(self):
+        return (self.team_id, self.total_points, self.kills, self.placement)
+
     def save(self, *args, **kwargs):
+        from .leaderboard import apply_score_change
+        from .scoring import calculate_points, lock_match
         try:
             # Calculate points based on tournament config
             if not self.match or not self.match.tournament:
@@ -75,51 +153,16 @@ class Score(models.Model):
                  return
 
             config = self.match.tournament.points_config or {}
-            # Ensure config is a dict
-            if not isinstance(config, dict):
-                 print(f"Score Save Warning: points_config is not a dict: {type(config)}")
-                 config = {}
-
-            # MVP: assume kills is 'kill' key (default 1), placement is string of rank
-            
-            kill_mult = config.get('kill', 1)
-            # Ensure it's int
-            try:
-                kill_mult = int(kill_mult)
-            except (ValueError, TypeError):
-                kill_mult = 1
-                
-            kill_pts = self.kills * kill_mult
-            
-            # Calculate placement points handling ranges like "7-8"
-            place_pts = 0
-            placement_str = str(self.placement)
-            
-            # Direct lookup first
-            if placement_str in config:
-                place_value = config[placement_str]
-            else:
-                # Check ranges
-                found_range_points = 0
-                for key, value in config.items():
-                    if '-' in key:
-                        try:
-                            start, end = map(int, key.split('-'))
-                            if start <= self.placement <= end:
-                                found_range_points = value
-                                break
-                        except ValueError:
-                            continue # Skip malformed keys
-                place_value = found_range_points
-
-            # Ensure it's int
-            try:
-                place_pts = int(place_value)
-            except (ValueError, TypeError):
-                place_pts = 0
-
-            self.total_points = kill_pts + place_pts
-            super().save(*args, **kwargs)
+            self.total_points = calculate_points(config, self.kills, self.placement)
+            with transaction.atomic():
+                # The delta is taken from the row as it is under the match lock, not as loaded
+                lock_match(self.match_id)
+                previous = None
+                if self.pk is not None:
+                    previous = Score.objects.filter(pk=self.pk).values_list(
+                        'team_id', 'total_points', 'kills', 'placement').first()
+                super().save(*args, **kwargs)
+                apply_score_change(self.match.tournament_id, previous, self.standing_values())
         except Exception as e:
             import traceback
             traceback.print_exc()
@@ -127,6 +170,29 @@ class Score(models.Model):
             # Re-raise to alert DRF
             raise e
 
+    def delete(self, *args, **kwargs):
+        from .scoring import delete_score
+        return delete_score(self)
+
+class TeamStanding(models.Model):
+    """Materialized leaderboard row per team, kept in sync by Score.save / Score.delete."""
+    team = models.OneToOneField(Team, on_delete=models.CASCADE, related_name='standing')
+    tournament = models.ForeignKey(Tournament, on_delete=models.CASCADE, related_name='standings')
+    total_points = models.IntegerField(default=0)
+    total_kills = models.IntegerField(default=0)
+    total_wwcd = models.IntegerField(default=0)
+    matches_played = models.IntegerField(default=0)
+    total_position_points = models.IntegerField(default=0)
+    rank = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['tournament', 'rank'], name='standing_tournament_rank_idx'),
+        ]
+
+    def __str__(self):
+        return f"#{self.rank} {self.team.name} ({self.total_points} pts)"
+
 class FeaturedContent(models.Model):
     class ContentType(models.TextChoices):
         MAIN = 'MAIN', 'Main Hero (Large)'
@@ -145,13 +211,88 @@ class FeaturedContent(models.Model):
         return f"{self.title} ({self.content_type})"
 
 class TournamentTheme(models.Model):
+    class OutputFormat(models.TextChoices):
+        PNG = 'png', 'PNG'
+        JPEG = 'jpeg', 'JPEG'
+        WEBP = 'webp', 'WebP'
+        WEBP_LOSSLESS = 'webp_lossless', 'WebP (lossless)'
+
     tournament = models.ForeignKey(Tournament, on_delete=models.CASCADE, related_name='themes')
     name = models.CharField(max_length=100, default="Default Theme")
     theme_image = models.ImageField(upload_to='tournament_themes/')
     custom_font = models.FileField(upload_to='tournament_fonts/', blank=True, null=True, help_text="Upload .ttf or .otf font file")
     layout_config = models.JSONField(default=dict, blank=True)
     teams_per_page = models.IntegerField(default=20, help_text="Number of teams to show per image page")
+    # Default encoding for generated images; requests can override each of these
+    output_format = models.CharField(max_length=20, choices=OutputFormat.choices, default=OutputFormat.PNG)
+    output_quality = models.PositiveSmallIntegerField(
+        default=85, validators=[MinValueValidator(1), MaxValueValidator(100)], help_text="JPEG / lossy WebP quality"
+    )
+    png_compress_level = models.PositiveSmallIntegerField(
+        default=6, validators=[MaxValueValidator(9)], help_text="PNG zlib level, 0 (fastest) to 9 (smallest)"
+    )
+    output_scale = models.FloatField(
+        default=1.0, validators=[MinValueValidator(0.1), MaxValueValidator(2.0)], help_text="Resize factor for the final image"
+    )
     created_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
         return f"{self.tournament.name} - {self.name}"
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        # Rebuild the pre-composited background now rather than on the next download
+        from .logos import add_theme_logo_variants
+        from .rendering import prepare_theme
+        try:
+            prepare_theme(self)
+        except Exception as e:
+            print(f"Theme prepare error: {e}")
+        # Pre-sized logos at this theme's logo_size for teams that lack one (new theme, logo_size edit)
+        add_theme_logo_variants(self)
+
+class RenderJob(models.Model):
+    """A leaderboard image / zip export rendered off the request path (see jobs.py)."""
+    class Kind(models.TextChoices):
+        IMAGE = 'IMAGE', 'Image'
+        ZIP = 'ZIP', 'Zip'
+
+    class Status(models.TextChoices):
+        QUEUED = 'QUEUED', 'Queued'
+        RUNNING = 'RUNNING', 'Running'
+        DONE = 'DONE', 'Done'
+        FAILED = 'FAILED', 'Failed'
+
+    tournament = models.ForeignKey(Tournament, on_delete=models.CASCADE, related_name='render_jobs')
+    theme = models.ForeignKey(TournamentTheme, on_delete=models.SET_NULL, null=True, blank=True, related_name='render_jobs')
+    requested_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='render_jobs')
+    kind = models.CharField(max_length=10, choices=Kind.choices)
+    # page / match_id for images, compression for zips
+    params = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.QUEUED)
+    result = models.FileField(upload_to='render_jobs/', blank=True, null=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'created_at'], name='renderjob_status_created_idx'),
+            models.Index(fields=['requested_by', 'status'], name='renderjob_user_status_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} #{self.pk} for {self.tournament_id} ({self.status})"
+
+    @property
+    def wait_ms(self):
+        if self.started_at:
+            return int((self.started_at - self.created_at).total_seconds() * 1000)
+        return None
+
+    @property
+    def run_ms(self):
+        if self.started_at and self.finished_at:
+            return int((self.finished_at - self.started_at).total_seconds() * 1000)
+        return None
@@ -0,0 +1,72 @@
+import math
+
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class MatchPagination(PageNumberPagination):
+    # A tournament rarely goes past a few dozen matches; one page usually covers it
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+
+
+class TournamentPagination(CursorPagination):
+    # Newest first; a cursor keeps deep pages as cheap as the first one as daily tournaments pile up
+    ordering = ('-created_at', '-id')
+    page_size = 24
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
+class TeamPagination(CursorPagination):
+    ordering = 'id'
+    page_size = 100
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+
+
+class ScorePagination(CursorPagination):
+    ordering = 'id'
+    page_size = 100
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+
+
+class InvalidPage(Exception):
+    pass
+
+
+async def apaginate(pagination, request, queryset):
+    """PageNumberPagination for async views: (page items, {count, next, previous}) via the async ORM.
+
+    `request` is a DRF Request (for query_params). Raises InvalidPage like DRF's 404.
+    """
+    page_size = pagination.get_page_size(request)
+    count = await queryset.acount()
+    num_pages = max(math.ceil(count / page_size), 1)
+
+    raw = request.query_params.get(pagination.page_query_param) or 1
+    if raw in pagination.last_page_strings:
+        number = num_pages
+    else:
+        try:
+            number = int(raw)
+        except (TypeError, ValueError):
+            raise InvalidPage()
+    if not 1 <= number <= num_pages:
+        raise InvalidPage()
+
+    offset = (number - 1) * page_size
+    items = [obj async for obj in queryset[offset:offset + page_size]]
+
+    url = request.build_absolute_uri()
+    previous = None
+    if number > 1:
+        previous = remove_query_param(url, pagination.page_query_param) if number == 2 else \
+            replace_query_param(url, pagination.page_query_param, number - 1)
+    return items, {
+        "count": count,
+        "next": replace_query_param(url, pagination.page_query_param, number + 1) if number < num_pages else None,
+        "previous": previous,
+    }
@@ -1,4 +1,61 @@
-from rest_framework import permissions
+from rest_framework import exceptions, permissions
+
+from .models import Tournament, Match
+
+
+def is_admin(user):
+    return bool(user and (user.is_superuser or getattr(user, 'role', None) == 'ADMIN'))
+
+
+def _memoized(request, key, load):
+    # Per-request memo, so repeated checks in one write (permission + perform_create) query once
+    owners = request.__dict__.setdefault('_tournament_owners', {})
+    if key not in owners:
+        owners[key] = load()
+    return owners[key]
+
+
+def tournament_owner_id(request, obj):
+    """creator_id of the tournament `obj` (a Tournament, Team, Match, Score or theme) belongs to.
+
+    Reads relations already loaded on `obj` (select_related) and otherwise runs a single
+    values query for the id, never loading the tournament or creator objects.
+    """
+    if isinstance(obj, Tournament):
+        return obj.creator_id
+
+    if hasattr(obj, 'match_id') and not hasattr(obj, 'tournament_id'):
+        # Score: via its match
+        if not type(obj).match.is_cached(obj):
+            return _memoized(request, ('match', obj.match_id), lambda: (
+                Match.objects.filter(pk=obj.match_id).values_list('tournament__creator_id', flat=True).first()
+            ))
+        obj = obj.match
+
+    if hasattr(obj, 'tournament_id'):
+        if type(obj).tournament.is_cached(obj):
+            return obj.tournament.creator_id
+        return _memoized(request, ('tournament', obj.tournament_id), lambda: (
+            Tournament.objects.filter(pk=obj.tournament_id).values_list('creator_id', flat=True).first()
+        ))
+    return None
+
+
+def can_manage(request, obj):
+    """Whether the request's user may change `obj`: admins, and the creator of its tournament."""
+    user = request.user
+    if not (user and user.is_authenticated):
+        return False
+    if is_admin(user):
+        return True
+    owner_id = tournament_owner_id(request, obj)
+    return owner_id is not None and owner_id == user.id
+
+
+def ensure_can_manage(request, obj):
+    if not can_manage(request, obj):
+        raise exceptions.PermissionDenied("You are not the creator of this tournament.")
+
 
 class IsOrganiserOrReadOnly(permissions.BasePermission):
     def has_permission(self, request, view):
@@ -9,24 +66,4 @@ class IsOrganiserOrReadOnly(permissions.BasePermission):
     def has_object_permission(self, request, view, obj):
         if request.method in permissions.SAFE_METHODS:
             return True
-        
-        if not (request.user and request.user.is_authenticated):
-             return False
-        
-        # Check if user is Superuser/Admin (using model method or attribute)
-        if getattr(request.user, 'role', None) == 'ADMIN' or request.user.is_superuser:
-            return True
-
-        # For Tournament
-        if hasattr(obj, 'creator'):
-            return obj.creator == request.user
-        
-        # For Match and Team (both have tournament FK)
-        if hasattr(obj, 'tournament'):
-            return obj.tournament.creator == request.user
-            
-        # For Score
-        if hasattr(obj, 'match'):
-            return obj.match.tournament.creator == request.user
-
-        return False
+        return can_manage(request, obj)
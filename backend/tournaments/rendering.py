@@ -0,0 +1,711 @@
+import hashlib
+import io
+import json
+import math
+import multiprocessing
+import os
+import tempfile
+import threading
+import zipfile
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+from PIL import Image, ImageDraw, ImageFont
+
+
+class AssetCache:
+    """Process-wide LRU cache for decoded render assets, bounded by approximate bytes.
+
+    Keys include the file's mtime, so replacing a theme image, font or logo on
+    disk is picked up without explicit invalidation.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_load(self, key, loader, size_of):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key][0]
+            self.misses += 1
+
+        value = loader()
+        size = size_of(value)
+        with self._lock:
+            if key not in self._entries and size <= self.max_bytes:
+                self._entries[key] = (value, size)
+                self._bytes += size
+                while self._bytes > self.max_bytes:
+                    _, (_, evicted_size) = self._entries.popitem(last=False)
+                    self._bytes -= evicted_size
+        return value
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+            }
+
+    def discard(self, predicate):
+        """Drop every entry whose key matches `predicate`."""
+        with self._lock:
+            for key in [key for key in self._entries if predicate(key)]:
+                _, size = self._entries.pop(key)
+                self._bytes -= size
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self.hits = 0
+            self.misses = 0
+
+
+asset_cache = AssetCache(settings.RENDER_ASSET_CACHE_BYTES)
+
+
+def _mtime(path):
+    # Missing files get a None stamp; the loader then raises and nothing is cached
+    try:
+        return os.stat(path).st_mtime_ns
+    except (OSError, TypeError):
+        return None
+
+
+def _image_bytes(image):
+    return image.width * image.height * len(image.getbands())
+
+
+def load_base_image(image_path):
+    """Decoded RGBA theme image. Shared: callers must copy() before drawing on it."""
+    return asset_cache.get_or_load(
+        ('base', image_path, _mtime(image_path)),
+        lambda: Image.open(image_path).convert("RGBA"),
+        _image_bytes,
+    )
+
+
+def _font_bytes(font_path):
+    try:
+        return os.path.getsize(font_path)
+    except OSError:
+        return 64 * 1024
+
+
+def load_font(font_path, font_size):
+    return asset_cache.get_or_load(
+        ('font', font_path, _mtime(font_path), font_size),
+        lambda: ImageFont.truetype(font_path, font_size),
+        lambda font: _font_bytes(font_path),
+    )
+
+
+def load_fallback_font(font_size):
+    """Arial if the system has it, else Pillow's built-in font (also cached, so the lookup isn't repeated)."""
+    def load():
+        try:
+            return ImageFont.truetype("arial.ttf", font_size)
+        except IOError:
+            return ImageFont.load_default()
+
+    return asset_cache.get_or_load(('font', 'arial.ttf', None, font_size), load, lambda font: 64 * 1024)
+
+
+def load_logo(logo_path, logo_size):
+    """Team logo converted to RGBA and LANCZOS-resized to a square of logo_size."""
+    def load():
+        logo_img = Image.open(logo_path).convert("RGBA")
+        if logo_img.size == (logo_size, logo_size):
+            return logo_img
+        return logo_img.resize((logo_size, logo_size), Image.Resampling.LANCZOS)
+
+    return asset_cache.get_or_load(('logo', logo_path, _mtime(logo_path), logo_size), load, _image_bytes)
+
+
+def logo_source(team, logo_size):
+    """Smallest pre-sized variant (logos.py) that covers logo_size, else the original upload."""
+    variants = team.get('team_logo_variants') or {}
+    sizes = sorted(int(px) for px in variants if int(px) >= logo_size)
+    return variants[str(sizes[0])] if sizes else team['team_logo']
+
+
+# Output formats: name -> (Pillow format, file extension)
+IMAGE_FORMATS = {
+    "png": ("PNG", "png"),
+    "jpeg": ("JPEG", "jpg"),
+    "webp": ("WEBP", "webp"),
+    "webp_lossless": ("WEBP", "webp"),
+}
+
+
+# Request / job param -> output_encoding() key
+ENCODING_PARAMS = {
+    "image_format": "format",
+    "quality": "quality",
+    "compress_level": "compress_level",
+    "scale": "scale",
+}
+
+
+def _bounded(value, cast, low, high, name):
+    try:
+        value = cast(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{name} must be a number.")
+    if not low <= value <= high:
+        raise ValueError(f"{name} must be between {low} and {high}.")
+    return value
+
+
+def output_encoding(theme=None, params=None):
+    """How to encode rendered pages: the theme's defaults, overridden by request params.
+
+    Params: image_format (png / jpeg / webp / webp_lossless), quality (jpeg / lossy webp),
+    compress_level (png, 0-9) and scale (0.1-2, applied to the final image).
+    Raises ValueError for invalid values.
+    """
+    params = params or {}
+    encoding = {
+        "format": theme.output_format if theme else "png",
+        "quality": theme.output_quality if theme else 85,
+        "compress_level": theme.png_compress_level if theme else 6,
+        "scale": theme.output_scale if theme else 1.0,
+    }
+    for param, key in ENCODING_PARAMS.items():
+        if params.get(param) not in (None, ''):
+            encoding[key] = params[param]
+
+    if encoding["format"] not in IMAGE_FORMATS:
+        raise ValueError(f"image_format must be one of: {', '.join(IMAGE_FORMATS)}.")
+    encoding["quality"] = _bounded(encoding["quality"], int, 1, 100, "quality")
+    encoding["compress_level"] = _bounded(encoding["compress_level"], int, 0, 9, "compress_level")
+    encoding["scale"] = _bounded(encoding["scale"], float, 0.1, 2.0, "scale")
+    return encoding
+
+
+def image_extension(encoding):
+    return IMAGE_FORMATS[encoding["format"]][1]
+
+
+def encode_image(image, encoding):
+    """Scale and encode a rendered RGBA page into a BytesIO."""
+    scale = encoding["scale"]
+    if scale != 1:
+        size = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+        image = image.resize(size, Image.Resampling.LANCZOS)
+
+    buffer = io.BytesIO()
+    image_format = encoding["format"]
+    if image_format == "png":
+        image.save(buffer, format="PNG", compress_level=encoding["compress_level"])
+    elif image_format == "jpeg":
+        # No alpha in JPEG: flatten onto black, like a transparent page looks in most viewers
+        flat = Image.new("RGB", image.size, (0, 0, 0))
+        flat.paste(image, mask=image.getchannel("A"))
+        flat.save(buffer, format="JPEG", quality=encoding["quality"], optimize=True, progressive=True)
+    elif image_format == "webp":
+        image.save(buffer, format="WEBP", quality=encoding["quality"], method=4)
+    else:
+        image.save(buffer, format="WEBP", lossless=True, method=4)
+    buffer.seek(0)
+    return buffer
+
+
+def render_spec(tournament, theme, encoding=None):
+    """Everything the renderer needs from the models, as plain (picklable) values.
+
+    `encoding` comes from output_encoding(); defaults to the theme's settings.
+    """
+    # Config Logic (from generate_image)
+    if theme:
+        config = theme.layout_config or {}
+
+        # Handle Image Path
+        image_field = theme.theme_image
+        if image_field:
+            image_path = image_field.path
+        elif tournament.theme_image:
+            image_path = tournament.theme_image.path
+        else:
+            # Fallback
+            from django.contrib.staticfiles import finders
+            image_path = finders.find('default_leaderboard.jpg')
+    else:
+        config = tournament.layout_config or {}
+        if tournament.theme_image:
+            image_path = tournament.theme_image.path
+        else:
+            # Fallback
+            image_path = "default_leaderboard.jpg" # Dummy
+
+    # Custom Font Logic
+    custom_font_path = None
+    if theme and theme.custom_font:
+        custom_font_path = theme.custom_font.path
+
+    return {
+        "theme_id": theme.id if theme else None,
+        "image_path": image_path,
+        "font_path": custom_font_path,
+        "config": config,
+        "encoding": encoding or output_encoding(theme),
+    }
+
+
+def page_font(spec, font_size):
+    """The theme's custom font at font_size, falling back to Arial / Pillow's default."""
+    if spec["font_path"]:
+        try:
+            return load_font(spec["font_path"], font_size)
+        except Exception as e:
+            print(f"Font Load Error: {e}")
+    return load_fallback_font(font_size)
+
+
+def compose_base(spec):
+    """Theme image with the static parts of layout_config drawn on it.
+
+    layout_config may contain:
+      "headers": {"<column>": "TEXT", ...}  drawn one row above the first team, at that column
+      "labels": [{"text", "x", "y", "font_size"?, "font_color"?}, ...]  drawn at absolute positions
+    """
+    config = spec["config"]
+
+    # If image path not found/valid, create blank
+    try:
+        base_image = load_base_image(spec["image_path"]).copy()
+    except Exception:
+        base_image = Image.new('RGBA', (1920, 1080), (0,0,0,0))
+
+    headers = config.get('headers') or {}
+    labels = config.get('labels') or []
+    if not headers and not labels:
+        return base_image
+
+    draw = ImageDraw.Draw(base_image)
+    font_size = int(config.get('font_size', 40))
+    font_color = config.get('font_color', '#FFFFFF')
+    cols = config.get('columns', {})
+
+    if headers:
+        font = page_font(spec, font_size)
+        header_y = int(config.get('start_y', 300)) - int(config.get('row_height', 50))
+        for column, text in headers.items():
+            if column in cols:
+                x = int(config.get('start_x', 100)) + int(cols[column])
+                draw.text((x, header_y), str(text), font=font, fill=font_color)
+
+    for label in labels:
+        try:
+            font = page_font(spec, int(label.get('font_size', font_size)))
+            draw.text((int(label['x']), int(label['y'])), str(label['text']), font=font,
+                      fill=label.get('font_color', font_color))
+        except (KeyError, ValueError, TypeError, AttributeError) as e:
+            print(f"Skipping bad label {label!r}: {e}")
+
+    return base_image
+
+
+def prepared_base(spec):
+    """Composed base for the theme, built once per layout / image / font version.
+
+    Shared: callers must copy() before drawing on it.
+    """
+    return asset_cache.get_or_load(
+        ('prepared', spec.get("theme_id"), theme_fingerprint(spec)),
+        lambda: compose_base(spec),
+        _image_bytes,
+    )
+
+
+def prepare_theme(theme):
+    """Drop the theme's old prepared bases and build the current one (called when a theme is saved)."""
+    asset_cache.discard(lambda key: key[0] == 'prepared' and key[1] == theme.id)
+    prepared_base(render_spec(theme.tournament, theme))
+
+
+def render_page(spec, page_data, start_index):
+    """Draw one leaderboard page and return it encoded (spec["encoding"]) in a BytesIO."""
+    config = spec["config"]
+
+    # Only the team rows are drawn per page, everything static is in the prepared base
+    base_image = prepared_base(spec).copy()
+
+    draw = ImageDraw.Draw(base_image)
+
+    # Defaults
+    start_x = int(config.get('start_x', 100))
+    start_y = int(config.get('start_y', 300))
+    row_height = int(config.get('row_height', 50))
+    font_size = int(config.get('font_size', 40))
+    font_color = config.get('font_color', '#FFFFFF')
+    try:
+        stroke_width = int(config.get('font_weight', 0))
+    except (ValueError, TypeError):
+        stroke_width = 0
+
+    logo_size = int(config.get('logo_size', 40))
+    logo_y_offset = int(config.get('logo_y_offset', 0))
+    cols = config.get('columns', {})
+
+    # Font Loading
+    font = page_font(spec, font_size)
+
+    # Drawing Loop
+    current_y = start_y
+    for index, team in enumerate(page_data):
+        rank = start_index + index + 1
+
+        # Draw Rank
+        if 'rank' in cols or not cols:
+            col_rank = int(cols.get('rank', 0 if not cols else -9999))
+            if col_rank != -9999:
+                draw.text((start_x + col_rank, current_y), str(rank), font=font, fill=font_color, stroke_width=stroke_width, stroke_fill=font_color)
+
+        # Draw Logo
+        if 'logo' in cols:
+            col_logo = int(cols.get('logo'))
+            if team['team_logo']:
+                try:
+                    logo_img = load_logo(logo_source(team, logo_size), logo_size)
+                    base_logo_y = current_y + (row_height - logo_size) // 2
+                    logo_y = base_logo_y + logo_y_offset
+                    base_image.paste(logo_img, (start_x + col_logo, logo_y), logo_img)
+                except Exception as e:
+                    print(f"Error drawing logo for team {team['team_name']}: {e}")
+
+        # Draw Team Name
+        if 'team' in cols or not cols:
+            draw.text((start_x + int(cols.get('team', 100)), current_y), str(team['team_name']), font=font, fill=font_color, stroke_width=stroke_width, stroke_fill=font_color)
+
+        # Draw Stats
+        if 'wwcd' in cols or not cols:
+            draw.text((start_x + int(cols.get('wwcd', 500)), current_y), str(team['wwcd']), font=font, fill=font_color, stroke_width=stroke_width, stroke_fill=font_color)
+
+        if 'matches' in cols or not cols:
+            draw.text((start_x + int(cols.get('matches', 650)), current_y), str(team.get('matches', 0)), font=font, fill=font_color, stroke_width=stroke_width, stroke_fill=font_color)
+
+        if 'pos_pts' in cols or not cols:
+            draw.text((start_x + int(cols.get('pos_pts', 800)), current_y), str(team['pos_pts']), font=font, fill=font_color, stroke_width=stroke_width, stroke_fill=font_color)
+
+        if 'fin_pts' in cols or not cols:
+            draw.text((start_x + int(cols.get('fin_pts', 950)), current_y), str(team['fin_pts']), font=font, fill=font_color, stroke_width=stroke_width, stroke_fill=font_color)
+
+        if 'total' in cols or not cols:
+            draw.text((start_x + int(cols.get('total', 1100)), current_y), str(team['total']), font=font, fill=font_color, stroke_width=stroke_width, stroke_fill=font_color)
+
+        current_y += row_height
+
+    return encode_image(base_image, spec["encoding"])
+
+
+def render_page_bytes(spec, page_data, start_index):
+    # Pool entry point: each worker process keeps its own asset_cache between pages
+    return render_page(spec, page_data, start_index).getvalue()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def render_workers():
+    if settings.RENDER_WORKERS > 0:
+        return settings.RENDER_WORKERS
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def _get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # Not fork: the server is multi-threaded (ASGI, broadcast timers, render-job threads)
+            # and a child forked while another thread holds a lock such as asset_cache's would hang
+            _pool = ProcessPoolExecutor(max_workers=render_workers(), mp_context=multiprocessing.get_context('forkserver'))
+        return _pool
+
+
+def _reset_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def iter_rendered_pages(spec, pages, workers=None):
+    """Yield encoded bytes for each (page_data, start_index) in `pages`, in the same order.
+
+    With `workers` > 1 (default: RENDER_WORKERS) pages are spread over a process pool
+    shared by the whole process; with one worker or one page they render inline. Only
+    a small window of pages is in flight, so each page is yielded as soon as it and the
+    pages before it are done. A page that fails to render comes back as None.
+    """
+    pages = list(pages)
+    if workers is None:
+        workers = render_workers()
+    if workers <= 1 or len(pages) <= 1:
+        for page_data, start_index in pages:
+            yield _render_or_none(spec, page_data, start_index)
+        return
+
+    pool = _get_pool()
+    window = workers * 2
+    in_flight = deque()
+    position = 0  # next page to submit
+    done = 0      # pages already yielded
+    try:
+        while position < len(pages) or in_flight:
+            while position < len(pages) and len(in_flight) < window:
+                page_data, start_index = pages[position]
+                in_flight.append(pool.submit(render_page_bytes, spec, page_data, start_index))
+                position += 1
+
+            future = in_flight.popleft()
+            error = future.exception()
+            if isinstance(error, BrokenProcessPool):
+                raise error
+            if error:
+                print(f"Error rendering leaderboard page: {error}")
+            yield None if error else future.result()
+            done += 1
+    except BrokenProcessPool:
+        # A worker died (OOM, killed); start a fresh pool next time and finish inline
+        print("Render pool broken, rendering serially")
+        _reset_pool()
+        for page_data, start_index in pages[done:]:
+            yield _render_or_none(spec, page_data, start_index)
+    finally:
+        for future in in_flight:
+            future.cancel()
+
+
+def render_pages(spec, pages):
+    """List version of iter_rendered_pages."""
+    return list(iter_rendered_pages(spec, pages))
+
+
+def _render_or_none(spec, page_data, start_index):
+    try:
+        return render_page_bytes(spec, page_data, start_index)
+    except Exception as e:
+        print(f"Error rendering leaderboard page: {e}")
+        return None
+
+
+def create_leaderboard_image(tournament, theme, page_data, start_index):
+    return render_page(render_spec(tournament, theme), page_data, start_index)
+
+
+class RenderCache:
+    """Rendered pages on disk, one file per content key, evicting least recently used over max_bytes."""
+
+    def __init__(self, directory, max_bytes):
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    def _path(self, key):
+        return os.path.join(self.directory, hashlib.sha256(key.encode()).hexdigest() + ".render")
+
+    def open(self, key):
+        """Open file for `key`, or None. The handle stays valid even if the file is evicted meanwhile."""
+        path = self._path(key)
+        try:
+            handle = open(path, "rb")
+        except FileNotFoundError:
+            return None
+        try:
+            os.utime(path)  # mtime doubles as last-used time for eviction
+        except OSError:
+            pass
+        return handle
+
+    def put(self, key, data):
+        os.makedirs(self.directory, exist_ok=True)
+        # Write then rename so concurrent readers never see a partial image
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as tmp:
+            tmp.write(data)
+        os.replace(tmp_path, self._path(key))
+        self.evict()
+
+    def evict(self):
+        entries = []
+        total = 0
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if not entry.name.endswith(".render"):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+                total += stat.st_size
+
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+
+def render_cache():
+    return RenderCache(settings.RENDER_CACHE_DIR, settings.RENDER_CACHE_MAX_BYTES)
+
+
+def theme_fingerprint(spec):
+    """Hash of everything about a theme that affects its pixels: layout, theme image and font files."""
+    payload = json.dumps({
+        "config": spec["config"],
+        "image": [spec["image_path"], _mtime(spec["image_path"])],
+        "font": [spec["font_path"], _mtime(spec["font_path"])],
+    }, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+
+def page_cache_key(tournament, theme, spec, match_id, page, teams_per_page):
+    """Content key of one rendered page; a new leaderboard_version or theme change gives a new key."""
+    return ":".join(str(part) for part in (
+        "leaderboard_page",
+        tournament.id,
+        theme.id if theme else "legacy",
+        theme_fingerprint(spec),
+        tournament.leaderboard_version,
+        match_id or "all",
+        teams_per_page,
+        page,
+        json.dumps(spec["encoding"], sort_keys=True),
+    ))
+
+
+# generate_zip ?compression= values; PNGs barely shrink, so stored is the default
+ZIP_COMPRESSION = {
+    "stored": zipfile.ZIP_STORED,
+    "deflate": zipfile.ZIP_DEFLATED,
+}
+
+
+class _ZipStream(io.RawIOBase):
+    """Write-only, unseekable sink for ZipFile; drain() hands back what was written so far."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self):
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def stream_zip(entries, compression=zipfile.ZIP_STORED):
+    """Yield a zip archive chunk by chunk from (name, bytes) pairs, one entry at a time.
+
+    The output is never seeked, so ZipFile writes data descriptors and the whole archive
+    is never held in memory.
+    """
+    sink = _ZipStream()
+    with zipfile.ZipFile(sink, "w", compression=compression) as zf:
+        for name, data in entries:
+            zf.writestr(name, data)
+            yield sink.drain()
+    # Central directory, written on close
+    yield sink.drain()
+
+
+def zip_page_entries(tournament, theme, spec, leaderboard_data, teams_per_page, workers=1):
+    """(filename, image bytes) for every leaderboard page in order, rendering only pages not in the render cache."""
+    pages = render_cache()
+    total_pages = max(math.ceil(len(leaderboard_data) / teams_per_page), 1)
+
+    # Handles keep cached pages readable even if they are evicted while we stream
+    cached = {}
+    for page in range(1, total_pages + 1):
+        handle = pages.open(page_cache_key(tournament, theme, spec, None, page, teams_per_page))
+        if handle:
+            cached[page] = handle
+    missing = [page for page in range(1, total_pages + 1) if page not in cached]
+
+    rendered = iter_rendered_pages(spec, [
+        (leaderboard_data[(page - 1) * teams_per_page:page * teams_per_page], (page - 1) * teams_per_page)
+        for page in missing
+    ], workers)
+    try:
+        for page in range(1, total_pages + 1):
+            if page in cached:
+                with cached.pop(page) as handle:
+                    image_bytes = handle.read()
+            else:
+                image_bytes = next(rendered)
+                if image_bytes is None:
+                    # Skip the page rather than failing the entire zip
+                    continue
+                pages.put(page_cache_key(tournament, theme, spec, None, page, teams_per_page), image_bytes)
+            yield f"leaderboard_p{page}.{image_extension(spec['encoding'])}", image_bytes
+    finally:
+        rendered.close()
+        for handle in cached.values():
+            handle.close()
+
+
+def leaderboard_page(tournament, theme, match_id, page, teams_per_page, encoding=None):
+    """One leaderboard page as a readable image file object, or None if `page` is out of range.
+
+    Same standings version + theme + page = same picture, so a stored render is
+    returned without querying the standings.
+    """
+    from .leaderboard import compute_leaderboard, image_row
+
+    spec = render_spec(tournament, theme, encoding)
+    cache_key = page_cache_key(tournament, theme, spec, match_id, page, teams_per_page)
+    cached = render_cache().open(cache_key)
+    if cached:
+        return cached
+
+    leaderboard_data = [image_row(row) for row in compute_leaderboard(tournament, match_id)]
+    start_index = (page - 1) * teams_per_page
+    page_data = leaderboard_data[start_index:start_index + teams_per_page]
+    if not page_data and page > 1:
+        return None
+
+    image_buffer = render_page(spec, page_data, start_index)
+    render_cache().put(cache_key, image_buffer.getvalue())
+    return image_buffer
+
+
+def leaderboard_zip(tournament, theme, compression=zipfile.ZIP_STORED, encoding=None, workers=1):
+    """Chunks of a zip with every leaderboard page. The standings are read now, pages render as it is consumed.
+
+    Pages render inline unless `workers` > 1; only render jobs use the process pool.
+    """
+    from .leaderboard import compute_leaderboard, image_row
+
+    leaderboard_data = [image_row(row) for row in compute_leaderboard(tournament)]
+    teams_per_page = (theme.teams_per_page or 20) if theme else 20
+    spec = render_spec(tournament, theme, encoding)
+    return stream_zip(zip_page_entries(tournament, theme, spec, leaderboard_data, teams_per_page, workers), compression)
@@ -0,0 +1,250 @@
+import json
+from functools import lru_cache
+
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Q, Value, When
+
+from .leaderboard import apply_score_changes, rebuild_standings
+from .models import Match, Score
+
+
+# Ranges like "13-100000" are only expanded up to here; nobody fields more teams per lobby
+MAX_PLACEMENT = 1000
+
+
+class PointsTable:
+    """A points_config compiled to a dense placement -> points list plus the kill multiplier."""
+
+    def __init__(self, placement_points, kill_multiplier):
+        self.placement_points = placement_points
+        self.kill_multiplier = kill_multiplier
+
+    def placement_value(self, placement):
+        if 0 <= placement < len(self.placement_points):
+            return self.placement_points[placement]
+        return 0
+
+    def points(self, kills, placement):
+        return kills * self.kill_multiplier + self.placement_value(placement)
+
+
+def _as_int(value, default):
+    try:
+        return int(value)
+    except (ValueError, TypeError):
+        return default
+
+
+@lru_cache(maxsize=256)
+def _compile(config_json):
+    config = json.loads(config_json)
+
+    # MVP: assume kills is 'kill' key (default 1), placements are strings of rank or ranges like "7-8"
+    kill_multiplier = _as_int(config.get('kill', 1), 1)
+
+    direct = {}
+    ranges = []
+    for key, value in config.items():
+        if key.isdigit():
+            direct[int(key)] = value
+        elif '-' in key:
+            try:
+                start, end = map(int, key.split('-'))
+            except ValueError:
+                continue # Skip malformed keys
+            ranges.append((start, min(end, MAX_PLACEMENT), value))
+
+    size = max([p for p in direct if p <= MAX_PLACEMENT] + [end for _, end, _ in ranges] + [0]) + 1
+    placement_points = []
+    for placement in range(size):
+        # Direct lookup wins, otherwise the first range (in config order) that contains it
+        if placement in direct:
+            value = direct[placement]
+        else:
+            value = next((v for start, end, v in ranges if start <= placement <= end), 0)
+        placement_points.append(_as_int(value, 0))
+
+    return PointsTable(tuple(placement_points), kill_multiplier)
+
+
+def compile_points_config(config):
+    """Compiled table for a points_config, cached by the config's content.
+
+    Editing points_config changes the cache key, so stale tables are never used.
+    """
+    # Ensure config is a dict
+    if not isinstance(config, dict):
+        print(f"Score Save Warning: points_config is not a dict: {type(config)}")
+        config = {}
+    # Key order is kept: overlapping ranges resolve to the first one, as before
+    return _compile(json.dumps(config))
+
+
+def calculate_points(config, kills, placement):
+    """Points for one match result under a tournament's points_config."""
+    return compile_points_config(config).points(kills, placement)
+
+
+def rescore_tournament(tournament):
+    """Recompute total_points of every score of `tournament` with one UPDATE, then its standings.
+
+    Used when an organiser edits points_config mid-tournament.
+    """
+    table = compile_points_config(tournament.points_config or {})
+    placement_points = Case(
+        *[When(placement=p, then=Value(points)) for p, points in enumerate(table.placement_points) if points],
+        default=Value(0),
+        output_field=IntegerField(),
+    )
+    with transaction.atomic():
+        updated = Score.objects.filter(match__tournament=tournament).update(
+            total_points=F('kills') * table.kill_multiplier + placement_points
+        )
+        rebuild_standings(tournament)
+    return updated
+
+
+class PlacementConflict(Exception):
+    def __init__(self, scores):
+        self.scores = scores
+        super().__init__(f"{len(scores)} placement(s) already taken in this match")
+
+
+def lock_match(match_id):
+    """Queue writers of one match, so the rows they read are still current when they write."""
+    list(Match.objects.select_for_update().filter(pk=match_id).values_list('pk', flat=True))
+
+
+def save_score(match, team_id, kills, placement, force_update=False, score=None):
+    """Write one team's result for `match` in one transaction; returns (score, created).
+
+    New results are a single INSERT ... ON CONFLICT (match, team) DO UPDATE, so entering
+    a team's result again replaces it; `score` is the row being edited instead (PUT /
+    PATCH). Another team already holding `placement` raises PlacementConflict, or has
+    its score removed when `force_update` is set. Standings get one combined delta.
+    """
+    table = compile_points_config(match.tournament.points_config or {})
+    points = table.points(kills, placement)
+
+    with transaction.atomic():
+        lock_match(match.id)
+        own = Q(pk=score.pk) if score is not None else Q(match=match, team_id=team_id)
+        rows = list(Score.objects.filter(own | Q(match=match, placement=placement)).select_related('team'))
+        if score is not None:
+            current = next((row for row in rows if row.pk == score.pk), None)
+            if current is None:
+                raise Score.DoesNotExist()
+        else:
+            current = next((row for row in rows if row.match_id == match.id and row.team_id == team_id), None)
+
+        conflicts = [row for row in rows if row is not current and row.placement == placement and row.match_id == match.id]
+        if conflicts and not force_update:
+            raise PlacementConflict(conflicts)
+
+        changes = [(row.standing_values(), None) for row in conflicts]
+        if conflicts:
+            Score.objects.filter(pk__in=[row.pk for row in conflicts]).delete()
+
+        if score is None:
+            written = Score(match=match, team_id=team_id, kills=kills, placement=placement, total_points=points)
+            Score.objects.bulk_create(
+                [written], update_conflicts=True, unique_fields=['match', 'team'],
+                update_fields=['kills', 'placement', 'total_points'],
+            )
+            if current is not None:
+                written.pk = current.pk
+        else:
+            written = score
+            written.match, written.team_id = match, team_id
+            written.kills, written.placement, written.total_points = kills, placement, points
+            Score.objects.filter(pk=score.pk).update(
+                match=match, team_id=team_id, kills=kills, placement=placement, total_points=points,
+            )
+
+        changes.append((current.standing_values() if current else None, written.standing_values()))
+        apply_score_changes(match.tournament_id, changes)
+
+    return written, current is None
+
+
+def delete_score(score):
+    """Delete `score` and take its contribution out of the standings; returns Model.delete's result.
+
+    The row is re-read under the match lock, so what gets subtracted is the row as
+    stored, even when another write changed it after `score` was loaded.
+    """
+    with transaction.atomic():
+        lock_match(score.match_id)
+        previous = (
+            Score.objects.filter(pk=score.pk)
+            .values_list('team_id', 'total_points', 'kills', 'placement', 'match__tournament_id')
+            .first()
+        )
+        if previous is None:
+            return 0, {}
+        result = Score.objects.filter(pk=score.pk).delete()
+        apply_score_changes(previous[4], [(previous[:4], None)])
+    return result
+
+
+def submit_match_results(match, results, force_update=False):
+    """Upsert a whole match's results in one transaction.
+
+    `results` is a list of {'team', 'kills', 'placement'} dicts (team ids), already
+    validated for unique teams / placements. Scores of teams not in `results` that
+    hold one of the submitted placements are removed when `force_update` is set,
+    otherwise PlacementConflict is raised. Standings are updated once for the batch.
+    """
+    table = compile_points_config(match.tournament.points_config or {})
+    placements = {row['placement'] for row in results}
+    submitted_teams = {row['team'] for row in results}
+
+    with transaction.atomic():
+        lock_match(match.id)
+        existing = {score.team_id: score for score in Score.objects.filter(match=match)}
+
+        conflicts = [
+            score for team_id, score in existing.items()
+            if team_id not in submitted_teams and score.placement in placements
+        ]
+        if conflicts and not force_update:
+            raise PlacementConflict(conflicts)
+
+        changes = [(score.standing_values(), None) for score in conflicts]
+        to_create, to_update, moved = [], [], set()
+        for row in results:
+            points = table.points(row['kills'], row['placement'])
+            score = existing.get(row['team'])
+            if score is None:
+                score = Score(match=match, team_id=row['team'], kills=row['kills'],
+                              placement=row['placement'], total_points=points)
+                to_create.append(score)
+                changes.append((None, score.standing_values()))
+            else:
+                previous = score.standing_values()
+                score.kills, score.placement, score.total_points = row['kills'], row['placement'], points
+                if score.standing_values() != previous:
+                    to_update.append(score)
+                    changes.append((previous, score.standing_values()))
+                    if score.placement != previous[3]:
+                        moved.add(score.pk)
+
+        if conflicts:
+            Score.objects.filter(pk__in=[score.pk for score in conflicts]).delete()
+        if moved:
+            # Teams may swap placements: rows changing placement are deleted and inserted again
+            # (same ids) so the unique (match, placement) constraint holds after every statement
+            Score.objects.filter(pk__in=moved).delete()
+        in_place = [score for score in to_update if score.pk not in moved]
+        if in_place:
+            Score.objects.bulk_update(in_place, ['kills', 'placement', 'total_points'])
+        reinserted = [score for score in to_update if score.pk in moved]
+        if to_create or reinserted:
+            Score.objects.bulk_create(to_create + reinserted)
+        apply_score_changes(match.tournament_id, changes)
+
+    return {
+        "created": len(to_create),
+        "updated": len(to_update),
+        "removed": len(conflicts),
+    }
@@ -1,5 +1,9 @@
+from collections import Counter
+
 from rest_framework import serializers
-from .models import User, Tournament, Team, Match, Score, FeaturedContent, TournamentTheme
+from .logos import logo_url, variant_urls
+from .models import User, Tournament, Team, Match, Score, FeaturedContent, TournamentTheme, RenderJob
+from .rendering import IMAGE_FORMATS, ZIP_COMPRESSION
 
 class FeaturedContentSerializer(serializers.ModelSerializer):
     class Meta:
@@ -9,7 +13,8 @@ class FeaturedContentSerializer(serializers.ModelSerializer):
 class TournamentThemeSerializer(serializers.ModelSerializer):
     class Meta:
         model = TournamentTheme
-        fields = ['id', 'name', 'theme_image', 'custom_font', 'layout_config', 'teams_per_page', 'tournament', 'created_at']
+        fields = ['id', 'name', 'theme_image', 'custom_font', 'layout_config', 'teams_per_page',
+                  'output_format', 'output_quality', 'png_compress_level', 'output_scale', 'tournament', 'created_at']
         read_only_fields = ['created_at']
 
     def to_internal_value(self, data):
@@ -59,10 +64,38 @@ class TournamentSerializer(serializers.ModelSerializer):
         except Exception:
              return "Unknown"
 
+class TournamentListSerializer(serializers.ModelSerializer):
+    # Just what the tournament cards need; the detail endpoint has everything else
+    creator_username = serializers.CharField(source='creator.username', read_only=True)
+
+    class Meta:
+        model = Tournament
+        fields = ['id', 'name', 'creator', 'creator_username', 'created_at', 'status', 'logo', 'cover_image']
+        read_only_fields = fields
+
+def fixed_tournament(instance, tournament):
+    # Scores and standings stay with the tournament a team / match was created in
+    if instance is not None and tournament.pk != instance.tournament_id:
+        raise serializers.ValidationError("Cannot be moved to another tournament.")
+    return tournament
+
 class TeamSerializer(serializers.ModelSerializer):
+    logo_variants = serializers.SerializerMethodField()
+
     class Meta:
         model = Team
-        fields = ['id', 'name', 'tournament', 'members', 'logo']
+        fields = ['id', 'name', 'tournament', 'members', 'logo', 'logo_variants']
+
+    def validate_tournament(self, tournament):
+        return fixed_tournament(self.instance, tournament)
+
+    def get_logo_variants(self, obj):
+        # {"<px>": url} of the pre-sized copies generated at upload, absolute like `logo`
+        request = self.context.get('request')
+        urls = variant_urls(obj.logo_variants)
+        if request is not None:
+            urls = {px: request.build_absolute_uri(url) for px, url in urls.items()}
+        return urls
 
 class MatchSerializer(serializers.ModelSerializer):
     tournament_name = serializers.ReadOnlyField(source='tournament.name')
@@ -72,19 +105,56 @@ class MatchSerializer(serializers.ModelSerializer):
         model = Match
         fields = ['id', 'tournament', 'tournament_name', 'match_number', 'map_name', 'created_at', 'winner']
 
+    def validate_tournament(self, tournament):
+        return fixed_tournament(self.instance, tournament)
+
     def get_winner(self, obj):
-        # Find score with placement 1
-        winning_score = obj.scores.filter(placement=1).first()
+        # Find score with placement 1 (prefetched by MatchViewSet as `winning_scores`)
+        if hasattr(obj, 'winning_scores'):
+            winning_score = obj.winning_scores[0] if obj.winning_scores else None
+        else:
+            winning_score = obj.scores.filter(placement=1).select_related('team').first()
         if winning_score:
             return {
                 "team_name": winning_score.team.name,
                 "team_logo": winning_score.team.logo.url if winning_score.team.logo else None,
+                # Winner cards show the logo at 64px
+                "team_logo_thumb": logo_url(winning_score.team.logo, winning_score.team.logo_variants, 128),
                 "kills": winning_score.kills,
                 "total_points": winning_score.total_points
             }
         return None
 
+class MatchResultRowSerializer(serializers.Serializer):
+    team = serializers.IntegerField()
+    kills = serializers.IntegerField(min_value=0)
+    placement = serializers.IntegerField(min_value=1)
+
+class MatchResultsSerializer(serializers.Serializer):
+    """A whole match's results, validated in memory (plus one query for team ownership)."""
+    results = MatchResultRowSerializer(many=True, allow_empty=False)
+    force_update = serializers.BooleanField(required=False, default=False)
+
+    def validate_results(self, results):
+        teams = [row['team'] for row in results]
+        if len(set(teams)) != len(teams):
+            raise serializers.ValidationError("Each team can only appear once per match.")
+
+        placements = Counter(row['placement'] for row in results)
+        duplicates = sorted(p for p, count in placements.items() if count > 1)
+        if duplicates:
+            raise serializers.ValidationError(f"Placement {duplicates[0]} is used more than once.")
+
+        match = self.context['match']
+        known = set(Team.objects.filter(tournament_id=match.tournament_id, id__in=teams).values_list('id', flat=True))
+        unknown = [team for team in teams if team not in known]
+        if unknown:
+            raise serializers.ValidationError(f"Team {unknown[0]} is not part of this tournament.")
+        return results
+
 class ScoreSerializer(serializers.ModelSerializer):
+    # With its tournament: the ownership check and points config need it anyway
+    match = serializers.PrimaryKeyRelatedField(queryset=Match.objects.select_related('tournament'))
     team_name = serializers.ReadOnlyField(source='team.name')
     
     force_update = serializers.BooleanField(write_only=True, required=False, default=False)
@@ -93,36 +163,42 @@ class ScoreSerializer(serializers.ModelSerializer):
         model = Score
         fields = ['id', 'match', 'team', 'team_name', 'kills', 'placement', 'total_points', 'force_update']
         read_only_fields = ['total_points'] # calculated on save
+        # (match, team) is an upsert and (match, placement) conflicts may be replaced,
+        # both inside scoring.save_score; the database constraints back them up
+        validators = []
 
     def validate(self, data):
-        # 2) make sure no match can have two same positions
-        match = data.get('match')
-        placement = data.get('placement')
-        force_update = data.get('force_update', False)
-        
-        # If this is an update, we need to handle instance
-        instance = self.instance
-
-        if match and placement:
-            # Check if any OTHER score in this match has the same placement
-            qs = Score.objects.filter(match=match, placement=placement)
-            if instance:
-                qs = qs.exclude(pk=instance.pk)
-            
-            conflicting_score = qs.first()
-            if conflicting_score:
-                if force_update:
-                    # Perform Delete
-                    conflicting_score.delete()
-                else:
-                    raise serializers.ValidationError({
-                        "placement": f"Placement {placement} is already taken by {conflicting_score.team.name}.",
-                        "code": "placement_conflict"
-                    })
-        
+        match = data.get('match') or getattr(self.instance, 'match', None)
+        team = data.get('team') or getattr(self.instance, 'team', None)
+        if match and team and team.tournament_id != match.tournament_id:
+            raise serializers.ValidationError({"team": "Team is not part of this match's tournament."})
         return data
 
-    def create(self, validated_data):
-        # Remove 'force_update' from validated_data because it's not a model field
-        validated_data.pop('force_update', None)
-        return super().create(validated_data)
+class RenderJobRequestSerializer(serializers.Serializer):
+    kind = serializers.ChoiceField(choices=RenderJob.Kind.choices)
+    theme_id = serializers.IntegerField(required=False, allow_null=True)
+    page = serializers.IntegerField(min_value=1, default=1)
+    match_id = serializers.IntegerField(required=False, allow_null=True)
+    compression = serializers.ChoiceField(choices=list(ZIP_COMPRESSION), default='stored')
+    # Override the theme's output encoding
+    image_format = serializers.ChoiceField(choices=list(IMAGE_FORMATS), required=False)
+    quality = serializers.IntegerField(min_value=1, max_value=100, required=False)
+    compress_level = serializers.IntegerField(min_value=0, max_value=9, required=False)
+    scale = serializers.FloatField(min_value=0.1, max_value=2.0, required=False)
+
+class RenderJobSerializer(serializers.ModelSerializer):
+    wait_ms = serializers.ReadOnlyField()
+    run_ms = serializers.ReadOnlyField()
+    result_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = RenderJob
+        fields = ['id', 'tournament', 'theme', 'kind', 'params', 'status', 'error',
+                  'created_at', 'started_at', 'finished_at', 'wait_ms', 'run_ms', 'result_url']
+
+    def get_result_url(self, obj):
+        if obj.status != RenderJob.Status.DONE:
+            return None
+        url = f"/api/render_jobs/{obj.id}/result/"
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request is not None else url
@@ -0,0 +1,39 @@
+"""Synthetic tournaments for load tests, benchmarks and the test suite."""
+import random
+
+from .leaderboard import rebuild_standings
+from .models import Tournament, Team, Match, Score
+from .scoring import compile_points_config
+
+
+POINTS_CONFIG = {"1": 10, "2": 6, "3": 5, "4": 4, "5": 3, "6": 2, "7-8": 1, "kill": 1}
+
+
+def make_synthetic_tournament(creator, num_teams, num_matches, name="Synthetic Open", seed=0):
+    """Large tournament built with bulk inserts (Score.save hooks are bypassed, standings rebuilt once).
+
+    Every match has a full lobby: each team gets a distinct placement and 0-8 kills.
+    """
+    rng = random.Random(seed)
+    table = compile_points_config(POINTS_CONFIG)
+    tournament = Tournament.objects.create(name=name, creator=creator, points_config=POINTS_CONFIG)
+    teams = Team.objects.bulk_create([
+        Team(name=f"Squad {i:03d}", tournament=tournament) for i in range(num_teams)
+    ])
+    matches = Match.objects.bulk_create([
+        Match(tournament=tournament, match_number=number, map_name=rng.choice(["Erangel", "Miramar", "Sanhok"]))
+        for number in range(1, num_matches + 1)
+    ])
+
+    scores = []
+    for match in matches:
+        lobby = list(teams)
+        rng.shuffle(lobby)
+        for placement, team in enumerate(lobby, start=1):
+            kills = rng.randint(0, 8)
+            scores.append(Score(match=match, team=team, kills=kills, placement=placement,
+                                total_points=table.points(kills, placement)))
+    Score.objects.bulk_create(scores, batch_size=1000)
+
+    rebuild_standings(tournament)
+    return tournament
@@ -0,0 +1,63 @@
+import os
+from io import BytesIO
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from PIL import Image
+
+from ..models import Tournament, Team, Match, Score
+from ..rendering import output_encoding
+from ..synthetic import POINTS_CONFIG
+
+
+def make_tournament(creator, num_teams, num_matches, name="Daily Scrims"):
+    tournament = Tournament.objects.create(name=name, creator=creator, points_config=POINTS_CONFIG)
+    teams = [Team.objects.create(name=f"Team {i:03d}", tournament=tournament) for i in range(num_teams)]
+    for number in range(1, num_matches + 1):
+        match = Match.objects.create(tournament=tournament, match_number=number)
+        for placement, team in enumerate(teams, start=1):
+            Score.objects.create(match=match, team=team, kills=(placement + number) % 5, placement=placement)
+    return tournament
+
+
+def png_upload(name, size=(600, 400), color=(200, 0, 0)):
+    """A solid-colour PNG upload for logo / theme image fields."""
+    buffer = BytesIO()
+    Image.new('RGB', size, color).save(buffer, format='PNG')
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/png')
+
+
+def theme_image():
+    """A small PNG upload to use as a TournamentTheme.theme_image."""
+    return png_upload('theme.png', (320, 180), (20, 20, 40))
+
+
+def synthetic_assets(directory, num_teams):
+    """(render spec, image rows) for a 1920x1080 theme and one logo per team, written to `directory`."""
+    image_path = os.path.join(directory, "theme.png")
+    Image.new("RGB", (1920, 1080), (18, 18, 36)).save(image_path)
+
+    rows = []
+    for i in range(num_teams):
+        logo_path = os.path.join(directory, f"logo_{i}.png")
+        Image.new("RGB", (256, 256), ((i * 37) % 256, (i * 91) % 256, 120)).save(logo_path)
+        rows.append({
+            "team_name": f"Squad {i:03d}",
+            "team_logo": logo_path,
+            "wwcd": i % 4,
+            "matches": 6,
+            "pos_pts": 60 - i % 60,
+            "fin_pts": 30 - i % 30,
+            "total": 90 - i % 90,
+        })
+
+    spec = {
+        "image_path": image_path,
+        "font_path": None,
+        "config": {
+            "start_x": 120, "start_y": 220, "row_height": 80, "font_size": 40, "logo_size": 60,
+            "columns": {"rank": 0, "logo": 80, "team": 160, "wwcd": 900, "matches": 1050,
+                        "pos_pts": 1200, "fin_pts": 1350, "total": 1500},
+        },
+        "encoding": output_encoding(),
+    }
+    return spec, rows
@@ -0,0 +1,80 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+
+from ..models import User, FeaturedContent, Match
+from .factories import make_tournament
+
+
+class AsyncReadViewTests(APITestCase):
+    """The async GET views must return exactly what the DRF viewsets return."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.organiser = User.objects.create_user(username="org", password="pw", role=User.Role.ORGANISER)
+        cls.tournament = make_tournament(cls.organiser, num_teams=4, num_matches=5)
+        make_tournament(cls.organiser, num_teams=2, num_matches=2, name="Other Cup")
+        FeaturedContent.objects.create(title="Finals", image='featured_images/finals.png', priority=3)
+        FeaturedContent.objects.create(title="Hidden", image='featured_images/hidden.png', active=False)
+
+    def setUp(self):
+        cache.clear()
+
+    def both(self, url, params=None):
+        async_response = self.client.get(url, params or {})
+        with override_settings(ASYNC_READ_VIEWS=False):
+            cache.clear()
+            sync_response = self.client.get(url, params or {})
+        self.assertEqual(async_response.status_code, sync_response.status_code, url)
+        return async_response, sync_response
+
+    def test_same_payloads_as_the_viewsets(self):
+        tid = self.tournament.id
+        for url, params in [
+            (f'/api/tournaments/{tid}/leaderboard/', None),
+            (f'/api/tournaments/{tid}/leaderboard/', {'match_id': self.tournament.matches.first().id}),
+            (f'/api/tournaments/{tid}/', None),
+            ('/api/matches/', {'tournament': tid, 'page_size': 2, 'page': 2}),
+            ('/api/matches/', {'page': 'last'}),
+            ('/api/featured/', None),
+        ]:
+            async_response, sync_response = self.both(url, params)
+            self.assertEqual(async_response.json(), sync_response.json(), url)
+
+    def test_errors_match(self):
+        for url, params in [
+            ('/api/tournaments/999999/leaderboard/', None),
+            ('/api/tournaments/999999/', None),
+            ('/api/matches/', {'page': 99}),
+            ('/api/matches/', {'page': 'x'}),
+        ]:
+            async_response, _ = self.both(url, params)
+            self.assertEqual(async_response.status_code, 404, url)
+
+    def test_leaderboard_etag(self):
+        url = f'/api/tournaments/{self.tournament.id}/leaderboard/'
+        etag = self.client.get(url)['ETag']
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(len(ctx.captured_queries), 1)
+
+    def test_writes_still_go_through_the_viewsets(self):
+        self.client.force_authenticate(self.organiser)
+        response = self.client.patch(f'/api/tournaments/{self.tournament.id}/', {'description': 'Day 2'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['description'], 'Day 2')
+
+        response = self.client.post('/api/matches/', {'tournament': self.tournament.id, 'match_number': 6}, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(Match.objects.filter(tournament=self.tournament, match_number=6).exists())
+
+        # Featured content stays admin-only
+        response = self.client.post('/api/featured/', {'title': 'Nope'}, format='json')
+        self.assertEqual(response.status_code, 403)
+
+        self.client.force_authenticate(None)
+        response = self.client.delete(f'/api/tournaments/{self.tournament.id}/')
+        self.assertEqual(response.status_code, 401)
@@ -0,0 +1,103 @@
+from unittest import mock
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+
+from tournaments.authentication import TokenCache, token_cache
+from tournaments.models import User
+
+
+class CachedTokenAuthenticationTests(APITestCase):
+    def setUp(self):
+        token_cache.clear()
+        self.organiser = User.objects.create_user(username="org", password="pw", role=User.Role.ORGANISER)
+        self.admin = User.objects.create_superuser(username="admin", password="pw", role=User.Role.ADMIN)
+        self.token = Token.objects.create(user=self.organiser)
+        self.admin_token = Token.objects.create(user=self.admin)
+
+    def profile(self, token=None):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {(token or self.token).key}")
+        return self.client.get('/api/user/profile/')
+
+    def test_repeat_requests_skip_the_token_query(self):
+        self.assertEqual(self.profile().status_code, 200)
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.profile()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['username'], "org")
+        self.assertEqual(len(ctx.captured_queries), 0)
+        self.assertEqual(token_cache.stats(), {'hits': 1, 'misses': 1, 'hit_ratio': 0.5, 'entries': 1})
+
+    def test_invalid_token_is_rejected_and_not_cached(self):
+        self.client.credentials(HTTP_AUTHORIZATION="Token nope")
+        self.assertEqual(self.client.get('/api/user/profile/').status_code, 401)
+        self.assertEqual(token_cache.stats()['entries'], 0)
+
+    def test_logout_revokes_the_token(self):
+        self.profile()
+        self.assertEqual(self.client.post('/api/logout/').status_code, 204)
+        self.assertFalse(Token.objects.filter(user=self.organiser).exists())
+        self.assertEqual(self.profile().status_code, 401)
+
+    def test_password_change_drops_cached_user(self):
+        self.profile()
+        self.organiser.set_password("new")
+        self.organiser.save()
+        self.assertEqual(token_cache.stats()['entries'], 0)
+
+    def test_pro_status_and_approval_changes_apply_immediately(self):
+        self.assertFalse(self.profile().data['is_pro'])
+
+        self.profile(self.admin_token)
+        response = self.client.post('/api/set-pro-status/', {'user_id': self.organiser.id, 'is_pro': True}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(self.profile().data['is_pro'])
+
+        user = User.objects.get(pk=self.organiser.pk)
+        user.is_approved = True
+        user.save()
+        self.assertTrue(self.profile().data['is_approved'])
+
+    def test_deactivated_user_is_locked_out(self):
+        self.profile()
+        self.organiser.is_active = False
+        self.organiser.save()
+        self.assertEqual(self.profile().status_code, 401)
+
+    def test_cache_stats_are_admin_only(self):
+        self.assertEqual(self.client.get('/api/auth-cache-stats/').status_code, 401)
+        self.profile(self.admin_token)
+        response = self.client.get('/api/auth-cache-stats/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['hits'], 1)
+
+
+class TokenCacheTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="u", password="pw")
+
+    def test_entries_expire_after_ttl(self):
+        tokens = TokenCache(ttl=30, max_entries=10)
+        with mock.patch('tournaments.authentication.time.monotonic', return_value=100):
+            tokens.set('a', self.user, 'token')
+            self.assertEqual(tokens.get('a'), (self.user, 'token'))
+        with mock.patch('tournaments.authentication.time.monotonic', return_value=131):
+            self.assertIsNone(tokens.get('a'))
+        self.assertEqual(tokens.stats(), {'hits': 1, 'misses': 1, 'hit_ratio': 0.5, 'entries': 0})
+
+    def test_bounded_size(self):
+        tokens = TokenCache(ttl=30, max_entries=2)
+        with mock.patch('tournaments.authentication.time.monotonic', side_effect=[1, 2, 3, 4]):
+            tokens.set('a', self.user, 'a')
+            tokens.set('b', self.user, 'b')
+            tokens.set('c', self.user, 'c')  # evicts 'a', the closest to expiring
+            self.assertIsNone(tokens.get('a'))
+        self.assertEqual(tokens.stats()['entries'], 2)
+
+    def test_zero_ttl_disables_caching(self):
+        tokens = TokenCache(ttl=0, max_entries=10)
+        tokens.set('a', self.user, 'a')
+        self.assertEqual(tokens.stats()['entries'], 0)
@@ -0,0 +1,63 @@
+import shutil
+import tempfile
+
+from django.test import TestCase, override_settings
+from PIL import Image
+
+from ..models import User
+from ..rendering import asset_cache
+from ..management.commands.benchmark import compare, current_rss_kib, run_benchmarks, sample_rss
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, RENDER_CACHE_DIR=f'{MEDIA_ROOT}/render_cache', RENDER_WORKERS=1)
+class BenchmarkTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def test_suite_reports_every_case(self):
+        asset_cache.clear()
+        organiser = User.objects.create_user(username="bench", password="pw", role=User.Role.ORGANISER)
+        results = run_benchmarks(organiser, [3], [2], num_matches=1, repeat=1, formats=['png', 'jpeg'], pool_workers=2)
+
+        self.assertEqual(set(results), {
+            'aggregate/rebuild/teams=3', 'aggregate/read/teams=3',
+            'page/teams=3/per_page=2', 'zip/teams=3/per_page=2',
+            'render/serial/teams=3/per_page=2', 'render/pool/teams=3/per_page=2', 'encode/png', 'encode/jpeg',
+        })
+        for metrics in results.values():
+            self.assertGreater(metrics['wall_ms'], 0)
+            self.assertGreaterEqual(metrics['py_heap_kib'], 0)
+            self.assertTrue(metrics['rss_kib'] is None or metrics['rss_kib'] >= 0)
+        # every run renders from scratch but still reads the standings once
+        self.assertEqual(results['page/teams=3/per_page=2']['queries'], 1)
+        self.assertEqual(results['zip/teams=3/per_page=2']['queries'], 1)
+        self.assertEqual(results['render/pool/teams=3/per_page=2']['queries'], 0)
+        self.assertEqual(results['encode/png']['queries'], 0)
+
+    def test_rss_covers_pixel_buffers(self):
+        if current_rss_kib() is None:
+            self.skipTest("no /proc on this platform")
+        with sample_rss() as rss:
+            image = Image.new("RGBA", (4000, 4000))  # ~62 MiB outside the Python heap
+            image.load()
+            del image
+        self.assertGreater(rss["growth"], 30 * 1024)
+
+    def test_compare_flags_slowdowns_and_extra_queries(self):
+        baseline = {
+            'page': {'wall_ms': 100, 'queries': 1},
+            'zip': {'wall_ms': 100, 'queries': 1},
+            'encode': {'wall_ms': 10, 'queries': 0},
+        }
+        results = {
+            'page': {'wall_ms': 110, 'queries': 1},
+            'zip': {'wall_ms': 90, 'queries': 3},
+            'encode': {'wall_ms': 20, 'queries': 0},
+            'new': {'wall_ms': 5, 'queries': 0},
+        }
+        regressions = {case: reasons for case, _, reasons in compare(results, baseline, threshold=0.25)}
+        self.assertEqual(regressions, {'zip': ['1 -> 3 queries'], 'encode': ['2.00x slower']})
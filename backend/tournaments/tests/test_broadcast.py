@@ -0,0 +1,116 @@
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from django.core.cache import cache
+from django.test import override_settings
+from rest_framework.test import APITestCase
+
+from ..models import User, Match, Score
+from .. import broadcast
+from ..broadcast import leaderboard_group
+from ..routing import websocket_urlpatterns
+from .factories import make_tournament
+
+
+@override_settings(LEADERBOARD_BROADCAST_DELAY=0)
+class LeaderboardBroadcastTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.organiser = User.objects.create_user(username="org", password="pw", role=User.Role.ORGANISER)
+        self.tournament = make_tournament(self.organiser, num_teams=8, num_matches=2)
+        self.layer = get_channel_layer()
+        self.channel = async_to_sync(self.layer.new_channel)()
+        async_to_sync(self.layer.group_add)(leaderboard_group(self.tournament.id), self.channel)
+        self.client.force_authenticate(self.organiser)
+
+    def tearDown(self):
+        async_to_sync(self.layer.flush)()
+
+    def receive(self):
+        return async_to_sync(self.layer.receive)(self.channel)
+
+    def edit_kills(self, placement, kills):
+        score = Score.objects.get(match__tournament=self.tournament, match__match_number=2, placement=placement)
+        self.client.patch(f'/api/scores/{score.id}/', {'kills': kills})
+        return score
+
+    def test_first_update_is_a_snapshot_then_deltas(self):
+        self.edit_kills(placement=8, kills=30)
+        first = self.receive()['payload']
+        self.assertEqual(first['kind'], 'snapshot')
+        self.assertEqual(len(first['rows']), 8)
+        self.assertEqual(first['rows'][0]['rank'], 1)
+
+        score = self.edit_kills(placement=7, kills=1)
+        second = self.receive()['payload']
+        self.assertEqual(second['kind'], 'delta')
+        self.assertEqual(second['base_seq'], first['seq'])
+        self.assertGreater(second['seq'], first['seq'])
+        self.assertIn(score.team_id, [row['team_id'] for row in second['changes']])
+
+    def test_delta_applied_to_snapshot_matches_api(self):
+        self.edit_kills(placement=8, kills=30)
+        rows = {row['team_id']: row for row in self.receive()['payload']['rows']}
+        for placement, kills in ((7, 1), (6, 25)):
+            self.edit_kills(placement=placement, kills=kills)
+            payload = self.receive()['payload']
+            if payload['kind'] == 'snapshot':
+                rows = {row['team_id']: row for row in payload['rows']}
+                continue
+            for row in payload['changes']:
+                rows[row['team_id']] = row
+            for team_id in payload['removed']:
+                rows.pop(team_id)
+
+        expected = self.client.get(f'/api/tournaments/{self.tournament.id}/leaderboard/').json()
+        merged = [{k: v for k, v in row.items() if k != 'rank'} for row in sorted(rows.values(), key=lambda r: r['rank'])]
+        self.assertEqual(merged, list(expected))
+
+    def test_consumer_sends_snapshot_on_request(self):
+        async def scenario():
+            communicator = WebsocketCommunicator(
+                URLRouter(websocket_urlpatterns), f'/ws/leaderboard/{self.tournament.id}/'
+            )
+            connected, _ = await communicator.connect()
+            self.assertTrue(connected)
+            await communicator.send_json_to({'action': 'snapshot'})
+            response = await communicator.receive_json_from()
+            await communicator.disconnect()
+            return response
+
+        response = async_to_sync(scenario)()
+        self.assertEqual(response['kind'], 'snapshot')
+        self.assertEqual(response['seq'], self.tournament.leaderboard_version)
+        self.assertEqual(len(response['rows']), 8)
+
+
+class CoalescedBroadcastTests(APITestCase):
+    @override_settings(LEADERBOARD_BROADCAST_DELAY=0.05)
+    def test_burst_of_writes_yields_one_broadcast(self):
+        with mock.patch.object(broadcast, 'broadcast_leaderboard') as send:
+            for _ in range(25):
+                broadcast.schedule_broadcast(42)
+            timer = broadcast._pending[42]
+            self.assertFalse(send.called)
+            timer.join(2)
+
+        send.assert_called_once_with(42)
+        self.assertNotIn(42, broadcast._pending)
+
+    @override_settings(LEADERBOARD_BROADCAST_DELAY=0.05)
+    def test_score_post_does_not_wait_for_channel_layer(self):
+        organiser = User.objects.create_user(username="org", password="pw", role=User.Role.ORGANISER)
+        tournament = make_tournament(organiser, num_teams=2, num_matches=1)
+        match = Match.objects.create(tournament=tournament, match_number=2)
+        team = tournament.teams.first()
+        self.client.force_authenticate(organiser)
+
+        with mock.patch.object(broadcast, 'broadcast_leaderboard') as send:
+            response = self.client.post('/api/scores/', {'match': match.id, 'team': team.id, 'kills': 3, 'placement': 1})
+            self.assertEqual(response.status_code, 201)
+            self.assertFalse(send.called)
+            broadcast._pending[tournament.id].join(2)
+        send.assert_called_once_with(tournament.id)
@@ -0,0 +1,315 @@
+from io import StringIO
+from unittest import mock
+
+from django.contrib import admin
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+
+from .. import broadcast
+from ..models import User, Tournament, Team, Match, Score, TeamStanding
+from ..leaderboard import compute_leaderboard, lock_tournament, verify_standings
+from .factories import POINTS_CONFIG, make_tournament
+
+
+class LeaderboardAggregationTests(APITestCase):
+    def setUp(self):
+        self.organiser = User.objects.create_user(username="org", password="pw", role=User.Role.ORGANISER)
+
+    def leaderboard_queries(self, tournament, url_suffix=''):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(f'/api/tournaments/{tournament.id}/leaderboard/{url_suffix}')
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries), response.json()
+
+    def test_query_count_is_constant_in_team_count(self):
+        small = make_tournament(self.organiser, num_teams=4, num_matches=2, name="Small")
+        large = make_tournament(self.organiser, num_teams=40, num_matches=2, name="Large")
+
+        small_queries, small_data = self.leaderboard_queries(small)
+        large_queries, large_data = self.leaderboard_queries(large)
+
+        self.assertEqual(len(small_data), 4)
+        self.assertEqual(len(large_data), 40)
+        self.assertEqual(small_queries, large_queries)
+        self.assertLessEqual(large_queries, 2)
+
+    def test_totals_and_tiebreak_order(self):
+        tournament = Tournament.objects.create(name="T", creator=self.organiser, points_config=POINTS_CONFIG)
+        alpha = Team.objects.create(name="Alpha", tournament=tournament)
+        bravo = Team.objects.create(name="Bravo", tournament=tournament)
+        idle = Team.objects.create(name="Idle", tournament=tournament)
+        m1 = Match.objects.create(tournament=tournament, match_number=1)
+        m2 = Match.objects.create(tournament=tournament, match_number=2)
+        # Both teams finish on 16 points; Bravo has the chicken dinner so wins the tiebreak.
+        Score.objects.create(match=m1, team=alpha, kills=10, placement=2)  # 16
+        Score.objects.create(match=m1, team=bravo, kills=0, placement=1)   # 10
+        Score.objects.create(match=m2, team=bravo, kills=0, placement=2)   # 6
+
+        rows = compute_leaderboard(tournament)
+
+        self.assertEqual([r['team_id'] for r in rows], [bravo.id, alpha.id, idle.id])
+        self.assertEqual(rows[0]['total_points'], 16)
+        self.assertEqual(rows[0]['total_wwcd'], 1)
+        self.assertEqual(rows[0]['matches'], 2)
+        self.assertEqual(rows[0]['total_position_points'], 16)
+        self.assertEqual(rows[1]['total_kills'], 10)
+        self.assertEqual(rows[1]['total_position_points'], 6)
+        self.assertEqual(rows[2]['total_points'], 0)
+        self.assertEqual(rows[2]['matches'], 0)
+
+    def test_match_filter(self):
+        tournament = make_tournament(self.organiser, num_teams=3, num_matches=2)
+        match = tournament.matches.get(match_number=2)
+
+        _, data = self.leaderboard_queries(tournament, f'?match_id={match.id}')
+
+        expected = {s.team_id: s.total_points for s in match.scores.all()}
+        self.assertEqual({row['team_id']: row['total_points'] for row in data}, expected)
+
+
+@override_settings(LEADERBOARD_BROADCAST_DELAY=0)
+class TeamStandingTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.organiser = User.objects.create_user(username="org", password="pw", role=User.Role.ORGANISER)
+        self.tournament = make_tournament(self.organiser, num_teams=6, num_matches=3)
+
+    def assertInSync(self):
+        self.assertEqual(verify_standings(self.tournament), [])
+
+    def test_standings_follow_score_writes(self):
+        self.assertInSync()
+
+        score = Score.objects.filter(match__tournament=self.tournament, placement=6).first()
+        score.kills = 20
+        score.placement = 1
+        Score.objects.get(match=score.match, placement=1).delete()
+        self.assertInSync()
+        score.save()
+        self.assertInSync()
+        self.assertEqual(compute_leaderboard(self.tournament)[0]['team_id'], score.team_id)
+
+        score.delete()
+        self.assertInSync()
+
+    def test_standings_follow_api_writes(self):
+        self.client.force_authenticate(self.organiser)
+        match = self.tournament.matches.get(match_number=3)
+        score = match.scores.get(placement=6)
+
+        response = self.client.patch(f'/api/scores/{score.id}/', {'kills': 9})
+        self.assertEqual(response.status_code, 200)
+        self.assertInSync()
+
+        response = self.client.delete(f'/api/scores/{score.id}/')
+        self.assertEqual(response.status_code, 204)
+        self.assertInSync()
+
+        response = self.client.delete(f'/api/matches/{match.id}/')
+        self.assertEqual(response.status_code, 204)
+        self.assertInSync()
+
+    def test_new_team_gets_a_standing(self):
+        Team.objects.create(name="Late Entry", tournament=self.tournament)
+        self.assertInSync()
+        self.assertEqual(compute_leaderboard(self.tournament)[-1]['team_name'], "Late Entry")
+
+    def test_deleting_a_team_closes_the_rank_gap(self):
+        leader = compute_leaderboard(self.tournament)[0]['team_id']
+        Team.objects.get(pk=leader).delete()
+        self.assertInSync()
+        self.assertEqual(list(TeamStanding.objects.filter(tournament=self.tournament)
+                              .order_by('rank').values_list('rank', flat=True)), [1, 2, 3, 4, 5])
+
+    def test_standings_writes_lock_the_tournament(self):
+        # Ranks depend on every team's totals, so writers of one tournament are serialised
+        score = Score.objects.filter(match__tournament=self.tournament).first()
+        score.kills += 5
+        with mock.patch('tournaments.leaderboard.lock_tournament', wraps=lock_tournament) as lock:
+            score.save()
+        lock.assert_called_once_with(self.tournament.id)
+
+    def test_rebuild_command_repairs_drift(self):
+        TeamStanding.objects.filter(tournament=self.tournament).update(total_points=0, rank=0)
+        with self.assertRaises(CommandError):
+            call_command('rebuild_standings', '--check', stdout=StringIO(), stderr=StringIO())
+
+        call_command('rebuild_standings', stdout=StringIO(), stderr=StringIO())
+        self.assertInSync()
+
+
+@override_settings(LEADERBOARD_BROADCAST_DELAY=0)
+class LeaderboardCacheTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.organiser = User.objects.create_user(username="org", password="pw", role=User.Role.ORGANISER)
+        self.tournament = make_tournament(self.organiser, num_teams=5, num_matches=2)
+        self.url = f'/api/tournaments/{self.tournament.id}/leaderboard/'
+
+    def test_etag_round_trip(self):
+        first = self.client.get(self.url)
+        self.assertEqual(first.status_code, 200)
+        etag = first['ETag']
+
+        with self.assertNumQueries(1):
+            not_modified = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(not_modified.content, b'')
+        self.assertEqual(not_modified['ETag'], etag)
+
+    def test_repeat_polls_hit_the_cache(self):
+        first = self.client.get(self.url)
+        with self.assertNumQueries(1):
+            second = self.client.get(self.url)
+        self.assertEqual(second.json(), first.json())
+
+    def test_score_write_changes_version(self):
+        etag = self.client.get(self.url)['ETag']
+
+        self.client.force_authenticate(self.organiser)
+        score = Score.objects.filter(match__tournament=self.tournament).first()
+        response = self.client.patch(f'/api/scores/{score.id}/', {'kills': score.kills + 7})
+        self.assertEqual(response.status_code, 200)
+
+        fresh = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(fresh.status_code, 200)
+        self.assertNotEqual(fresh['ETag'], etag)
+        row = next(r for r in fresh.json() if r['team_id'] == score.team_id)
+        self.assertEqual(row['total_kills'], sum(s.kills for s in Score.objects.filter(team_id=score.team_id)))
+
+    def test_saving_a_stale_tournament_keeps_the_version(self):
+        stale = Tournament.objects.get(pk=self.tournament.pk)
+        etag = self.client.get(self.url)['ETag']
+
+        self.client.force_authenticate(self.organiser)
+        score = Score.objects.filter(match__tournament=self.tournament).first()
+        self.client.patch(f'/api/scores/{score.id}/', {'kills': score.kills + 7})
+        version = Tournament.objects.get(pk=self.tournament.pk).leaderboard_version
+
+        # e.g. a rename loaded before the score write
+        stale.name = "Renamed"
+        stale.save()
+        self.client.patch(f'/api/tournaments/{self.tournament.id}/', {'description': "Finals"})
+
+        tournament = Tournament.objects.get(pk=self.tournament.pk)
+        self.assertEqual((tournament.name, tournament.description), ("Renamed", "Finals"))
+        self.assertEqual(tournament.leaderboard_version, version)
+        self.assertNotEqual(self.client.get(self.url)['ETag'], etag)
+
+    def test_admin_score_edits_change_version(self):
+        admin_user = User.objects.create_superuser(username="root", password="pw")
+        self.client.force_login(admin_user)
+        version = self.tournament.leaderboard_version
+        score = Score.objects.filter(match__tournament=self.tournament, placement=2).first()
+
+        response = self.client.post(f'/admin/tournaments/score/{score.id}/change/', {
+            'match': score.match_id, 'team': score.team_id, 'kills': score.kills + 3, 'placement': score.placement,
+        })
+        self.assertEqual(response.status_code, 302)
+        self.assertGreater(Tournament.objects.get(pk=self.tournament.pk).leaderboard_version, version)
+        self.assertEqual(verify_standings(self.tournament), [])
+
+        version = Tournament.objects.get(pk=self.tournament.pk).leaderboard_version
+        response = self.client.post('/admin/tournaments/score/', {
+            'action': 'delete_selected', '_selected_action': [score.id], 'post': 'yes',
+        })
+        self.assertEqual(response.status_code, 302)
+        self.assertGreater(Tournament.objects.get(pk=self.tournament.pk).leaderboard_version, version)
+        self.assertEqual(verify_standings(self.tournament), [])
+
+    def test_admin_bulk_deletes_keep_standings(self):
+        admin_user = User.objects.create_superuser(username="root", password="pw")
+        self.client.force_login(admin_user)
+        match_ids = list(self.tournament.matches.values_list('id', flat=True)[:2])
+        team_id = self.tournament.teams.order_by('standing__rank').values_list('id', flat=True).first()
+
+        for url, ids in (('/admin/tournaments/match/', match_ids), ('/admin/tournaments/team/', [team_id])):
+            version = Tournament.objects.get(pk=self.tournament.pk).leaderboard_version
+            with mock.patch('tournaments.admin.leaderboard_changed', wraps=broadcast.leaderboard_changed) as changed:
+                response = self.client.post(url, {'action': 'delete_selected', '_selected_action': ids, 'post': 'yes'})
+            self.assertEqual(response.status_code, 302)
+            changed.assert_called_once_with(self.tournament.id)
+            self.assertGreater(Tournament.objects.get(pk=self.tournament.pk).leaderboard_version, version)
+            self.assertEqual(verify_standings(self.tournament), [], url)
+
+    def test_admin_cannot_move_teams_or_matches(self):
+        admin_user = User.objects.create_superuser(username="root", password="pw")
+        self.client.force_login(admin_user)
+        team = self.tournament.teams.first()
+        response = self.client.get(f'/admin/tournaments/team/{team.id}/change/')
+        self.assertNotIn('tournament', response.context['adminform'].form.fields)
+        self.assertIn('tournament', self.client.get('/admin/tournaments/team/add/').context['adminform'].form.fields)
+
+    def test_admin_points_config_edit_pushes_to_viewers(self):
+        tournament = Tournament.objects.get(pk=self.tournament.pk)
+        tournament.points_config = {**POINTS_CONFIG, "1": 15}
+        form = mock.Mock(changed_data=['points_config'])
+        with mock.patch('tournaments.admin.leaderboard_changed') as changed:
+            admin.site._registry[Tournament].save_model(None, tournament, form, change=True)
+        changed.assert_called_once_with(tournament.id)
+        self.assertEqual(verify_standings(self.tournament), [])
+
+    def test_team_and_points_config_changes_change_version(self):
+        self.client.force_authenticate(self.organiser)
+        etag = self.client.get(self.url)['ETag']
+        self.client.post('/api/teams/', {'name': 'Newcomers', 'tournament': self.tournament.id})
+        team_etag = self.client.get(self.url)['ETag']
+        self.assertNotEqual(team_etag, etag)
+
+        self.client.patch(f'/api/tournaments/{self.tournament.id}/', {'points_config': {"1": 15}}, format='json')
+        self.assertNotEqual(self.client.get(self.url)['ETag'], team_etag)
+
+
+class TimelineTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.organiser = User.objects.create_user(username="org", password="pw", role=User.Role.ORGANISER)
+
+    def test_cumulative_ranks_per_match(self):
+        tournament = Tournament.objects.create(name="T", creator=self.organiser, points_config=POINTS_CONFIG)
+        alpha = Team.objects.create(name="Alpha", tournament=tournament)
+        bravo = Team.objects.create(name="Bravo", tournament=tournament)
+        # Created out of order: the timeline follows match_number
+        m2 = Match.objects.create(tournament=tournament, match_number=2)
+        m1 = Match.objects.create(tournament=tournament, match_number=1)
+        Score.objects.create(match=m1, team=alpha, kills=0, placement=1)  # 10
+        Score.objects.create(match=m1, team=bravo, kills=0, placement=2)  # 6
+        Score.objects.create(match=m2, team=bravo, kills=8, placement=1)  # 18
+
+        data = self.client.get(f'/api/tournaments/{tournament.id}/timeline/').data
+
+        self.assertEqual([m['match_number'] for m in data['matches']], [1, 2])
+        self.assertEqual([t['team_name'] for t in data['teams']], ["Bravo", "Alpha"])
+        bravo_line = data['teams'][0]['timeline']
+        self.assertEqual([(e['rank'], e['total_points'], e['rank_change']) for e in bravo_line], [(2, 6, 0), (1, 24, 1)])
+        alpha_line = data['teams'][1]['timeline']
+        self.assertEqual([(e['rank'], e['match_points'], e['rank_change']) for e in alpha_line], [(1, 10, 0), (2, 0, -1)])
+
+    def test_final_entry_matches_leaderboard(self):
+        tournament = make_tournament(self.organiser, num_teams=7, num_matches=4)
+        data = self.client.get(f'/api/tournaments/{tournament.id}/timeline/').data
+        leaderboard = self.client.get(f'/api/tournaments/{tournament.id}/leaderboard/').json()
+        self.assertEqual([t['team_id'] for t in data['teams']], [row['team_id'] for row in leaderboard])
+        self.assertEqual(
+            [t['timeline'][-1]['total_points'] for t in data['teams']],
+            [row['total_points'] for row in leaderboard],
+        )
+
+    def test_query_count_independent_of_size_and_cached(self):
+        small = make_tournament(self.organiser, num_teams=3, num_matches=2, name="Small")
+        large = make_tournament(self.organiser, num_teams=20, num_matches=6, name="Large")
+        counts = []
+        for tournament in (small, large):
+            with CaptureQueriesContext(connection) as ctx:
+                self.client.get(f'/api/tournaments/{tournament.id}/timeline/')
+            counts.append(len(ctx.captured_queries))
+        self.assertEqual(counts[0], counts[1])
+
+        with self.assertNumQueries(1):
+            response = self.client.get(f'/api/tournaments/{large.id}/timeline/')
+        self.assertEqual(response.status_code, 200)
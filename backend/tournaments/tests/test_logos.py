@@ -0,0 +1,111 @@
+import os
+import shutil
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.test import override_settings
+from PIL import Image
+from rest_framework.test import APITestCase
+
+from ..leaderboard import image_row, compute_leaderboard
+from ..models import User, Team, Tournament, TournamentTheme
+from ..rendering import logo_source
+from .factories import png_upload
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, TEAM_LOGO_SIZES=(40, 96))
+class LogoVariantTests(APITestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        self.organiser = User.objects.create_user(username="org", password="pw", role=User.Role.ORGANISER)
+        self.tournament = Tournament.objects.create(name="Logo Cup", creator=self.organiser)
+        TournamentTheme.objects.create(tournament=self.tournament, theme_image=png_upload('theme.png'),
+                                       layout_config={'logo_size': 60})
+
+    def test_upload_generates_square_rgba_variants(self):
+        team = Team.objects.create(name="Alpha", tournament=self.tournament, logo=png_upload('alpha.png'))
+
+        self.assertEqual(sorted(team.logo_variants, key=int), ['40', '60', '96'])
+        self.assertEqual(Team.objects.get(pk=team.pk).logo_variants, team.logo_variants)
+        for px, name in team.logo_variants.items():
+            with default_storage.open(name) as variant:
+                image = Image.open(variant)
+                self.assertEqual(image.size, (int(px), int(px)))
+                self.assertEqual(image.mode, 'RGBA')
+
+    def test_changing_the_logo_replaces_variants(self):
+        team = Team.objects.create(name="Alpha", tournament=self.tournament, logo=png_upload('alpha.png'))
+        old = list(team.logo_variants.values())
+
+        team = Team.objects.get(pk=team.pk)
+        team.name = "Alpha Esports"
+        team.save()
+        self.assertEqual(list(team.logo_variants.values()), old)  # untouched without a new logo
+
+        team.logo = png_upload('alpha_v2.png', color=(0, 0, 200))
+        team.save()
+        self.assertTrue(all('alpha_v2' in name for name in team.logo_variants.values()))
+        self.assertFalse(any(default_storage.exists(name) for name in old))
+
+        team.logo = None
+        team.save()
+        self.assertEqual(Team.objects.get(pk=team.pk).logo_variants, {})
+
+    def test_api_and_renderer_use_variants(self):
+        team = Team.objects.create(name="Alpha", tournament=self.tournament, logo=png_upload('alpha.png'))
+
+        response = self.client.get(f'/api/teams/{team.id}/')
+        self.assertEqual(set(response.data['logo_variants']), {'40', '60', '96'})
+
+        response = self.client.get(f'/api/tournaments/{self.tournament.id}/leaderboard/')
+        self.assertEqual(response.json()[0]['team_logo_thumb'], default_storage.url(team.logo_variants['96']))
+
+        row = image_row(compute_leaderboard(self.tournament)[0])
+        self.assertEqual(logo_source(row, 60), default_storage.path(team.logo_variants['60']))
+        self.assertEqual(logo_source(row, 50), default_storage.path(team.logo_variants['60']))
+        self.assertEqual(logo_source(row, 200), team.logo.path)
+
+    def test_theme_logo_size_change_adds_variants(self):
+        team = Team.objects.create(name="Alpha", tournament=self.tournament, logo=png_upload('alpha.png'))
+        Team.objects.create(name="No Logo", tournament=self.tournament)
+        theme = self.tournament.themes.get()
+
+        theme.layout_config = {'logo_size': 120}
+        theme.save()
+        team = Team.objects.get(pk=team.pk)
+        self.assertEqual(sorted(team.logo_variants, key=int), ['40', '60', '96', '120'])
+        row = image_row(compute_leaderboard(self.tournament)[0])
+        self.assertEqual(logo_source(row, 120), default_storage.path(team.logo_variants['120']))
+
+        # Nothing left to generate on a later save
+        with mock.patch('tournaments.logos.generate_logo_variants') as generate:
+            theme.name = "Finals"
+            theme.save()
+        generate.assert_not_called()
+
+    def test_backfill_command(self):
+        team = Team.objects.create(name="Alpha", tournament=self.tournament, logo=png_upload('alpha.png'))
+        Team.objects.filter(pk=team.pk).update(logo_variants={})
+        Team.objects.create(name="No Logo", tournament=self.tournament)
+
+        out = StringIO()
+        call_command('generate_logo_variants', stdout=out)
+        self.assertIn("Generated variants for 1 team(s), 0 already up to date", out.getvalue())
+        variants = Team.objects.get(pk=team.pk).logo_variants
+        self.assertEqual(set(variants), {'40', '60', '96'})
+        self.assertTrue(all(os.path.exists(default_storage.path(name)) for name in variants.values()))
+
+        out = StringIO()
+        call_command('generate_logo_variants', stdout=out)
+        self.assertIn("0 team(s), 1 already up to date", out.getvalue())
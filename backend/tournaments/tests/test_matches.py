@@ -0,0 +1,44 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+
+from ..models import User, Match, Score
+from .factories import make_tournament
+
+
+class MatchListTests(APITestCase):
+    def setUp(self):
+        self.organiser = User.objects.create_user(username="org", password="pw", role=User.Role.ORGANISER)
+
+    def test_winners_without_per_match_queries(self):
+        small = make_tournament(self.organiser, num_teams=3, num_matches=2, name="Small")
+        large = make_tournament(self.organiser, num_teams=3, num_matches=12, name="Large")
+        counts = []
+        for tournament in (small, large):
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.client.get('/api/matches/', {'tournament': tournament.id})
+            counts.append(len(ctx.captured_queries))
+            self.assertEqual(response.json()['count'], tournament.matches.count())
+        self.assertEqual(counts[0], counts[1])
+
+        first = response.json()['results'][0]
+        winner = Score.objects.get(match_id=first['id'], placement=1)
+        self.assertEqual(first['winner']['team_name'], winner.team.name)
+        self.assertEqual(first['winner']['total_points'], winner.total_points)
+        self.assertEqual(first['tournament_name'], "Large")
+
+    def test_filter_and_pagination(self):
+        make_tournament(self.organiser, num_teams=2, num_matches=3, name="A")
+        other = make_tournament(self.organiser, num_teams=2, num_matches=4, name="B")
+
+        response = self.client.get('/api/matches/', {'tournament': other.id, 'page_size': 3})
+        self.assertEqual(response.json()['count'], 4)
+        self.assertEqual([m['match_number'] for m in response.json()['results']], [1, 2, 3])
+        self.assertIsNotNone(response.json()['next'])
+        self.assertTrue(all(m['tournament'] == other.id for m in response.json()['results']))
+
+    def test_match_without_winner(self):
+        tournament = make_tournament(self.organiser, num_teams=2, num_matches=0)
+        match = Match.objects.create(tournament=tournament, match_number=1)
+        response = self.client.get(f'/api/matches/{match.id}/')
+        self.assertIsNone(response.data['winner'])
@@ -0,0 +1,118 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory, APITestCase
+
+from ..models import User, Match, Score, Team
+from ..permissions import can_manage, tournament_owner_id
+from .factories import make_tournament
+
+
+class OwnershipResolverTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.organiser = User.objects.create_user(username="org", password="pw", role=User.Role.ORGANISER)
+        cls.tournament = make_tournament(cls.organiser, num_teams=2, num_matches=1)
+
+    def request(self, user):
+        request = APIRequestFactory().post('/')
+        request.user = user
+        return request
+
+    def test_ids_only_and_memoized(self):
+        request = self.request(self.organiser)
+        score = Score.objects.filter(match__tournament=self.tournament).first()
+        team = Team.objects.get(pk=score.team_id)
+
+        with self.assertNumQueries(1):
+            self.assertTrue(can_manage(request, score))
+            self.assertTrue(can_manage(request, score))
+        with self.assertNumQueries(1):
+            self.assertTrue(can_manage(request, team))
+            self.assertTrue(can_manage(request, team))
+
+        # Loaded relations are used as they are
+        match = Match.objects.select_related('tournament').get(tournament=self.tournament)
+        with self.assertNumQueries(0):
+            self.assertEqual(tournament_owner_id(request, self.tournament), self.organiser.id)
+            self.assertTrue(can_manage(self.request(self.organiser), match))
+
+    def test_other_users(self):
+        other = User.objects.create_user(username="org2", password="pw", role=User.Role.ORGANISER)
+        admin = User.objects.create_user(username="boss", password="pw", role=User.Role.ADMIN)
+        score = Score.objects.first()
+        self.assertFalse(can_manage(self.request(other), score))
+        with self.assertNumQueries(0):
+            self.assertTrue(can_manage(self.request(admin), score))
+
+
+class WriteQueryCountTests(APITestCase):
+    """The ownership check must not add queries to writes: the owner costs what an admin (no check) costs."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.organiser = User.objects.create_user(username="org", password="pw", role=User.Role.ORGANISER)
+        cls.admin = User.objects.create_user(username="boss", password="pw", role=User.Role.ADMIN)
+        cls.intruder = User.objects.create_user(username="org2", password="pw", role=User.Role.ORGANISER)
+        cls.tournament = make_tournament(cls.organiser, num_teams=3, num_matches=2)
+
+    def count(self, user, method, url, data):
+        self.client.force_authenticate(user)
+        with CaptureQueriesContext(connection) as ctx:
+            response = getattr(self.client, method)(url, data, format='json')
+        self.assertLess(response.status_code, 300, response.content)
+        return len(ctx.captured_queries)
+
+    def test_writes(self):
+        match = self.tournament.matches.get(match_number=1)
+        team = self.tournament.teams.first()
+        score = Score.objects.get(match=match, team=team)
+
+        # Each pair of payloads makes the same kind of change, once as the owner and once as an admin
+        for method, url, owner_data, admin_data in [
+            ('patch', f'/api/scores/{score.id}/', {'kills': 4}, {'kills': 5}),
+            ('patch', f'/api/teams/{team.id}/', {'name': 'Renamed'}, {'name': 'Renamed again'}),
+            ('patch', f'/api/matches/{match.id}/', {'map_name': 'Miramar'}, {'map_name': 'Sanhok'}),
+            ('patch', f'/api/tournaments/{self.tournament.id}/', {'description': 'Day 2'}, {'description': 'Day 3'}),
+            ('post', f'/api/matches/{match.id}/submit_results/',
+             {'results': [{'team': team.id, 'kills': 2, 'placement': 1}]},
+             {'results': [{'team': team.id, 'kills': 3, 'placement': 1}]}),
+        ]:
+            self.assertEqual(self.count(self.organiser, method, url, owner_data),
+                             self.count(self.admin, method, url, admin_data), url)
+
+        new_match = Match.objects.create(tournament=self.tournament, match_number=3)
+        owner = self.count(self.organiser, 'post', '/api/scores/',
+                           {'match': new_match.id, 'team': team.id, 'kills': 1, 'placement': 1})
+        other_team = self.tournament.teams.exclude(pk=team.pk).first()
+        admin = self.count(self.admin, 'post', '/api/scores/',
+                           {'match': new_match.id, 'team': other_team.id, 'kills': 1, 'placement': 2})
+        self.assertEqual(owner, admin)
+
+        owner = self.count(self.organiser, 'post', '/api/teams/', {'name': 'New A', 'tournament': self.tournament.id})
+        admin = self.count(self.admin, 'post', '/api/teams/', {'name': 'New B', 'tournament': self.tournament.id})
+        self.assertEqual(owner, admin)
+
+    def test_non_owner_is_refused(self):
+        match = self.tournament.matches.get(match_number=1)
+        score = Score.objects.filter(match=match).first()
+        self.client.force_authenticate(self.intruder)
+        self.assertEqual(self.client.patch(f'/api/scores/{score.id}/', {'kills': 9}, format='json').status_code, 403)
+        self.assertEqual(self.client.post('/api/teams/', {'name': 'Sneaky', 'tournament': self.tournament.id},
+                                          format='json').status_code, 403)
+        self.assertEqual(self.client.post('/api/matches/', {'tournament': self.tournament.id, 'match_number': 7},
+                                          format='json').status_code, 403)
+
+    def test_teams_and_matches_stay_in_their_tournament(self):
+        other = make_tournament(self.intruder, num_teams=1, num_matches=0, name="Other")
+        team = self.tournament.teams.first()
+        match = self.tournament.matches.first()
+        self.client.force_authenticate(self.organiser)
+        for url in (f'/api/teams/{team.id}/', f'/api/matches/{match.id}/'):
+            response = self.client.patch(url, {'tournament': other.id}, format='json')
+            self.assertEqual(response.status_code, 400)
+            self.assertIn('tournament', response.data)
+            # Naming the current tournament is fine
+            self.assertEqual(self.client.patch(url, {'tournament': self.tournament.id}, format='json').status_code, 200)
+        self.assertFalse(other.teams.filter(pk=team.pk).exists())
+        self.assertFalse(other.matches.filter(pk=match.pk).exists())
@@ -0,0 +1,100 @@
+import os
+import shutil
+import tempfile
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+
+from ..leaderboard import verify_standings
+from ..models import User, TournamentTheme
+from ..synthetic import make_synthetic_tournament
+from .factories import theme_image
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+# Maximum queries per request for the hot endpoints, whatever the tournament size
+BUDGETS = {
+    'leaderboard': 2,          # tournament + standings
+    'leaderboard_match': 2,    # tournament + grouped aggregate
+    'timeline': 4,             # tournament + matches + teams + scores
+    'matches': 3,              # count + page + winners prefetch
+    'teams': 2,                # one cursor page + members prefetch
+    'scores': 1,               # one cursor page joined to team
+    'tournaments': 1,          # one cursor page joined to creator
+    'tournament_detail': 2,
+    'generate_image': 3,       # tournament + theme + leaderboard
+}
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, RENDER_CACHE_DIR=os.path.join(MEDIA_ROOT, 'render_cache'))
+class QueryBudgetTests(APITestCase):
+    """Hot endpoints must cost the same number of queries for a 25-team and a 500-team tournament."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.organiser = User.objects.create_user(username="org", password="pw", role=User.Role.ORGANISER)
+        cls.small = make_synthetic_tournament(cls.organiser, num_teams=25, num_matches=6, name="Small Cup")
+        cls.large = make_synthetic_tournament(cls.organiser, num_teams=500, num_matches=30, name="Large Open")
+        for tournament in (cls.small, cls.large):
+            TournamentTheme.objects.create(
+                tournament=tournament, theme_image=theme_image(),
+                layout_config={'start_y': 10, 'row_height': 8, 'font_size': 8}, teams_per_page=20,
+            )
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+
+    def count_queries(self, url, params=None):
+        cache.clear()
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url, params or {})
+        self.assertEqual(response.status_code, 200, url)
+        return len(ctx.captured_queries)
+
+    def assertBudget(self, name, url_for, params_for=lambda tournament: None):
+        counts = [self.count_queries(url_for(t), params_for(t)) for t in (self.small, self.large)]
+        self.assertEqual(counts[0], counts[1], f"{name}: query count grows with tournament size {counts}")
+        self.assertLessEqual(counts[1], BUDGETS[name], f"{name}: {counts[1]} queries, budget {BUDGETS[name]}")
+
+    def test_factory_builds_consistent_standings(self):
+        self.assertEqual(self.large.teams.count(), 500)
+        self.assertEqual(verify_standings(self.large), [])
+
+    def test_leaderboard(self):
+        self.assertBudget('leaderboard', lambda t: f'/api/tournaments/{t.id}/leaderboard/')
+
+    def test_leaderboard_for_one_match(self):
+        self.assertBudget(
+            'leaderboard_match', lambda t: f'/api/tournaments/{t.id}/leaderboard/',
+            lambda t: {'match_id': t.matches.get(match_number=3).id},
+        )
+
+    def test_timeline(self):
+        self.assertBudget('timeline', lambda t: f'/api/tournaments/{t.id}/timeline/')
+
+    def test_matches(self):
+        self.assertBudget('matches', lambda t: '/api/matches/', lambda t: {'tournament': t.id})
+
+    def test_teams(self):
+        self.assertBudget('teams', lambda t: '/api/teams/', lambda t: {'tournament': t.id})
+
+    def test_scores(self):
+        self.assertBudget('scores', lambda t: '/api/scores/', lambda t: {'tournament': t.id})
+        self.assertBudget('scores', lambda t: '/api/scores/', lambda t: {'match': t.matches.first().id})
+
+    def test_tournaments(self):
+        self.assertLessEqual(self.count_queries('/api/tournaments/'), BUDGETS['tournaments'])
+
+    def test_tournament_detail(self):
+        self.assertBudget('tournament_detail', lambda t: f'/api/tournaments/{t.id}/')
+
+    def test_generate_image_data_fetch(self):
+        self.assertBudget('generate_image', lambda t: f'/api/tournaments/{t.id}/generate_image/')
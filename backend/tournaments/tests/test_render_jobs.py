@@ -0,0 +1,171 @@
+import os
+import shutil
+import tempfile
+import zipfile
+from datetime import timedelta
+from io import BytesIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import override_settings
+from django.utils import timezone
+from PIL import Image
+from rest_framework.test import APITestCase
+
+from ..jobs import claim_next_job, fail_stale_jobs, purge_finished_jobs, run_job, run_pending_jobs
+from ..models import User, RenderJob, TournamentTheme
+from .factories import make_tournament, theme_image
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(
+    MEDIA_ROOT=MEDIA_ROOT,
+    RENDER_CACHE_DIR=f'{MEDIA_ROOT}/render_cache',
+    RENDER_JOB_WORKERS=0,  # jobs are run explicitly below
+    RENDER_JOB_CONCURRENCY_PER_USER=1,
+    RENDER_JOB_MAX_QUEUED_PER_USER=3,
+)
+class RenderJobTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.organiser = User.objects.create_user(username="org", password="pw", role=User.Role.ORGANISER)
+        cls.other = User.objects.create_user(username="org2", password="pw", role=User.Role.ORGANISER)
+        cls.tournament = make_tournament(cls.organiser, num_teams=5, num_matches=1)
+        cls.other_tournament = make_tournament(cls.other, num_teams=3, num_matches=1, name="Other Cup")
+        for tournament in (cls.tournament, cls.other_tournament):
+            TournamentTheme.objects.create(
+                tournament=tournament, theme_image=theme_image(),
+                layout_config={'start_y': 10, 'row_height': 8, 'font_size': 8}, teams_per_page=2,
+            )
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+
+    def submit(self, user, tournament, **data):
+        self.client.force_authenticate(user)
+        return self.client.post(f'/api/tournaments/{tournament.id}/render_jobs/', data, format='json')
+
+    def test_image_job_lifecycle(self):
+        response = self.submit(self.organiser, self.tournament, kind='IMAGE', page=2)
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.data['status'], 'QUEUED')
+        self.assertIsNone(response.data['result_url'])
+        job_id = response.data['id']
+
+        self.assertEqual(self.client.get(f'/api/render_jobs/{job_id}/result/').status_code, 409)
+        self.assertEqual(run_pending_jobs(), 1)
+
+        response = self.client.get(f'/api/render_jobs/{job_id}/')
+        self.assertEqual(response.data['status'], 'DONE')
+        self.assertIsNotNone(response.data['wait_ms'])
+        self.assertIsNotNone(response.data['run_ms'])
+        self.assertTrue(response.data['result_url'].endswith(f'/api/render_jobs/{job_id}/result/'))
+
+        response = self.client.get(f'/api/render_jobs/{job_id}/result/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Image.open(BytesIO(b''.join(response.streaming_content))).size, (320, 180))
+
+    def test_zip_job(self):
+        theme = self.tournament.themes.get()
+        job_id = self.submit(self.organiser, self.tournament, kind='ZIP', theme_id=theme.id, compression='deflate').data['id']
+        run_pending_jobs()
+
+        response = self.client.get(f'/api/render_jobs/{job_id}/result/')
+        with zipfile.ZipFile(BytesIO(b''.join(response.streaming_content))) as zf:
+            self.assertEqual(len(zf.namelist()), 3)
+            self.assertIsNone(zf.testzip())
+
+    def test_job_output_encoding(self):
+        response = self.submit(self.organiser, self.tournament, kind='IMAGE', image_format='webp', scale=0.5)
+        self.assertEqual(response.data['params']['image_format'], 'webp')
+        run_pending_jobs()
+
+        response = self.client.get(f"/api/render_jobs/{response.data['id']}/result/")
+        self.assertIn('.webp', response['Content-Disposition'])
+        image = Image.open(BytesIO(b''.join(response.streaming_content)))
+        self.assertEqual((image.format, image.size), ('WEBP', (160, 90)))
+
+        self.assertEqual(self.submit(self.organiser, self.tournament, kind='IMAGE', image_format='bmp').status_code, 400)
+
+    def test_failed_job_records_error(self):
+        job_id = self.submit(self.organiser, self.tournament, kind='IMAGE', page=9).data['id']
+        run_pending_jobs()
+        job = RenderJob.objects.get(pk=job_id)
+        self.assertEqual(job.status, RenderJob.Status.FAILED)
+        self.assertIn("out of range", job.error)
+
+    def test_one_running_job_per_organiser(self):
+        first = self.submit(self.organiser, self.tournament, kind='IMAGE').data['id']
+        self.submit(self.organiser, self.tournament, kind='IMAGE', page=2)
+        other = self.submit(self.other, self.other_tournament, kind='IMAGE').data['id']
+
+        self.assertEqual(claim_next_job().id, first)
+        # The organiser's second job waits, the other organiser's job goes first
+        self.assertEqual(claim_next_job().id, other)
+        self.assertIsNone(claim_next_job())
+
+    def test_queue_limit_per_organiser(self):
+        for page in (1, 2, 3):
+            self.assertEqual(self.submit(self.organiser, self.tournament, kind='IMAGE', page=page).status_code, 202)
+        response = self.submit(self.organiser, self.tournament, kind='IMAGE', page=1)
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response.data['code'], 'render_job_limit')
+
+    def test_jobs_are_private_and_owner_only(self):
+        response = self.submit(self.other, self.tournament, kind='IMAGE')
+        self.assertEqual(response.status_code, 403)
+
+        job_id = self.submit(self.organiser, self.tournament, kind='IMAGE').data['id']
+        self.client.force_authenticate(self.other)
+        self.assertEqual(self.client.get(f'/api/render_jobs/{job_id}/').status_code, 404)
+        self.assertEqual(self.client.get('/api/render_jobs/').data, [])
+
+    def test_stale_running_jobs_are_failed(self):
+        job_id = self.submit(self.organiser, self.tournament, kind='IMAGE').data['id']
+        RenderJob.objects.filter(pk=job_id).update(
+            status=RenderJob.Status.RUNNING, started_at=timezone.now() - timedelta(hours=1),
+        )
+        run_pending_jobs()
+        self.assertEqual(RenderJob.objects.get(pk=job_id).status, RenderJob.Status.FAILED)
+
+    def test_stale_job_is_not_revived_by_its_worker(self):
+        self.submit(self.organiser, self.tournament, kind='IMAGE')
+        job = claim_next_job()
+        # The worker is slow: the job is given up on before it finishes
+        RenderJob.objects.filter(pk=job.pk).update(started_at=timezone.now() - timedelta(hours=1))
+        fail_stale_jobs()
+
+        job = run_job(job)
+        self.assertEqual(job.status, RenderJob.Status.FAILED)
+        self.assertEqual(RenderJob.objects.get(pk=job.pk).status, RenderJob.Status.FAILED)
+        self.assertFalse(job.result)
+
+    def test_claim_skips_an_organiser_being_claimed_for(self):
+        self.submit(self.organiser, self.tournament, kind='IMAGE')
+        other = self.submit(self.other, self.other_tournament, kind='IMAGE').data['id']
+        # Another worker holds the organiser's row lock: this one moves on
+        with mock.patch('tournaments.jobs.User.objects.select_for_update') as lock:
+            lock.return_value.filter.side_effect = lambda pk: User.objects.filter(pk=pk).exclude(pk=self.organiser.pk)
+            self.assertEqual(claim_next_job().id, other)
+        lock.assert_called_with(skip_locked=True)
+
+    def test_finished_jobs_expire(self):
+        job_id = self.submit(self.organiser, self.tournament, kind='IMAGE').data['id']
+        run_pending_jobs()
+        job = RenderJob.objects.get(pk=job_id)
+        path = job.result.path
+        self.assertTrue(os.path.exists(path))
+
+        with override_settings(RENDER_JOB_RETENTION=3600):
+            purge_finished_jobs()
+            self.assertTrue(RenderJob.objects.filter(pk=job_id).exists())
+            RenderJob.objects.filter(pk=job_id).update(finished_at=timezone.now() - timedelta(hours=2))
+            purge_finished_jobs()
+        self.assertFalse(RenderJob.objects.filter(pk=job_id).exists())
+        self.assertFalse(os.path.exists(path))
@@ -0,0 +1,312 @@
+import asyncio
+import os
+import shutil
+import tempfile
+import zipfile
+from io import BytesIO
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.core.asgi import get_asgi_application
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+from PIL import Image
+from rest_framework.test import APITestCase
+
+from ..models import User, Team, TournamentTheme
+from ..leaderboard import bump_leaderboard_version
+from ..rendering import (
+    AssetCache, RenderCache, asset_cache, leaderboard_zip, load_base_image, prepared_base, render_page_bytes, render_pages,
+    render_spec,
+)
+from .factories import make_tournament, png_upload, synthetic_assets
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+LAYOUT = {'start_y': 10, 'row_height': 8, 'font_size': 8, 'logo_size': 6, 'columns': {'logo': 0, 'team': 10, 'total': 100}}
+
+
+# Inline rendering, so the asset cache counted here is the one doing the work
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, RENDER_CACHE_DIR=os.path.join(MEDIA_ROOT, 'render_cache'), RENDER_WORKERS=1)
+class AssetCacheRenderTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.organiser = User.objects.create_user(username="org", password="pw", role=User.Role.ORGANISER)
+        cls.tournament = make_tournament(cls.organiser, num_teams=6, num_matches=1)
+        for team in Team.objects.filter(tournament=cls.tournament):
+            team.logo = png_upload(f'logo{team.id}.png', (32, 32), (200, 0, 0))
+            team.save()
+        cls.theme = TournamentTheme.objects.create(
+            tournament=cls.tournament, theme_image=png_upload('theme.png', (320, 180), (20, 20, 40)),
+            layout_config=LAYOUT, teams_per_page=2,
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        asset_cache.clear()
+        shutil.rmtree(os.path.join(MEDIA_ROOT, 'render_cache'), ignore_errors=True)
+
+    def download(self, **params):
+        response = self.client.get(f'/api/tournaments/{self.tournament.id}/generate_image/', {'theme_id': self.theme.id, **params})
+        self.assertEqual(response.status_code, 200)
+        return b''.join(response.streaming_content)
+
+    def rendered_pages(self):
+        return len(os.listdir(os.path.join(MEDIA_ROOT, 'render_cache')))
+
+    def test_zip_decodes_each_asset_once(self):
+        response = self.client.get(f'/api/tournaments/{self.tournament.id}/generate_zip/', {'theme_id': self.theme.id})
+        self.assertEqual(response.status_code, 200)
+        with zipfile.ZipFile(BytesIO(b''.join(response.streaming_content))) as zf:
+            self.assertEqual(len(zf.namelist()), 3)
+
+        # prepared base + theme image + fallback font + 6 logos; the other two pages reuse prepared base and font
+        stats = asset_cache.stats()
+        self.assertEqual(stats['misses'], 9)
+        self.assertEqual(stats['hits'], 4)
+
+        # A second render is served entirely from the cache
+        response = self.client.get(f'/api/tournaments/{self.tournament.id}/generate_image/', {'theme_id': self.theme.id})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(asset_cache.stats()['misses'], 9)
+
+    def test_zip_is_streamed_entry_by_entry(self):
+        response = self.client.get(f'/api/tournaments/{self.tournament.id}/generate_zip/', {'theme_id': self.theme.id})
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'application/zip')
+
+        chunks = iter(response.streaming_content)
+        first = next(chunks)
+        self.assertTrue(first.startswith(b'PK\x03\x04'))
+        self.assertIn(b'leaderboard_p1.png', first)
+        self.assertEqual(self.rendered_pages(), 1)  # later pages not rendered yet
+
+        archive = first + b''.join(chunks)
+        with zipfile.ZipFile(BytesIO(archive)) as zf:
+            self.assertIsNone(zf.testzip())
+            self.assertEqual([info.compress_type for info in zf.infolist()], [zipfile.ZIP_STORED] * 3)
+
+    def test_zip_is_streamed_over_asgi(self):
+        # Daphne path: the first bytes must go out before the last page is rendered
+        path = f'/api/tournaments/{self.tournament.id}/generate_zip/'
+        scope = {
+            'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET', 'scheme': 'http',
+            'path': path, 'raw_path': path.encode(), 'query_string': f'theme_id={self.theme.id}'.encode(),
+            'root_path': '', 'headers': [(b'host', b'testserver')],
+            'client': ('127.0.0.1', 50000), 'server': ('testserver', 80),
+        }
+        body_sent = False
+        chunks, rendered_at_first_chunk = [], []
+
+        async def receive():
+            nonlocal body_sent
+            if not body_sent:
+                body_sent = True
+                return {'type': 'http.request', 'body': b'', 'more_body': False}
+            await asyncio.Event().wait()
+
+        async def send(message):
+            if message['type'] == 'http.response.start':
+                self.assertEqual(message['status'], 200)
+            elif message['type'] == 'http.response.body' and message.get('body'):
+                if not chunks:
+                    rendered_at_first_chunk.append(self.rendered_pages())
+                chunks.append(message['body'])
+
+        # async_to_sync runs the view's thread-sensitive code on this thread, inside the test transaction
+        async_to_sync(get_asgi_application())(scope, receive, send)
+
+        self.assertEqual(rendered_at_first_chunk, [1])
+        with zipfile.ZipFile(BytesIO(b''.join(chunks))) as zf:
+            self.assertIsNone(zf.testzip())
+            self.assertEqual(len(zf.namelist()), 3)
+
+    def test_zip_pages_rendered_by_the_pool(self):
+        serial = self.client.get(f'/api/tournaments/{self.tournament.id}/generate_zip/', {'theme_id': self.theme.id})
+        serial = zipfile.ZipFile(BytesIO(b''.join(serial.streaming_content)))
+        shutil.rmtree(os.path.join(MEDIA_ROOT, 'render_cache'), ignore_errors=True)
+
+        # Requests render inline whatever RENDER_WORKERS says; render jobs pass their pool size
+        with override_settings(RENDER_WORKERS=2), mock.patch('tournaments.rendering._get_pool') as get_pool:
+            self.client.get(f'/api/tournaments/{self.tournament.id}/generate_zip/', {'theme_id': self.theme.id})
+        get_pool.assert_not_called()
+        shutil.rmtree(os.path.join(MEDIA_ROOT, 'render_cache'), ignore_errors=True)
+
+        with zipfile.ZipFile(BytesIO(b''.join(leaderboard_zip(self.tournament, self.theme, workers=2)))) as zf:
+            self.assertEqual(zf.namelist(), serial.namelist())
+            self.assertEqual([zf.read(name) for name in zf.namelist()],
+                             [serial.read(name) for name in serial.namelist()])
+        self.assertEqual(self.rendered_pages(), 3)
+
+    def test_zip_deflate(self):
+        response = self.client.get(f'/api/tournaments/{self.tournament.id}/generate_zip/',
+                                   {'theme_id': self.theme.id, 'compression': 'deflate'})
+        with zipfile.ZipFile(BytesIO(b''.join(response.streaming_content))) as zf:
+            self.assertIsNone(zf.testzip())
+            self.assertEqual({info.compress_type for info in zf.infolist()}, {zipfile.ZIP_DEFLATED})
+
+        response = self.client.get(f'/api/tournaments/{self.tournament.id}/generate_zip/', {'compression': 'lzma'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_repeat_download_is_served_from_disk(self):
+        first = self.download(page=2)
+        misses = asset_cache.stats()['misses']
+        with self.assertNumQueries(2):  # tournament + theme, no leaderboard, no render
+            self.assertEqual(self.download(page=2), first)
+        self.assertEqual(asset_cache.stats()['misses'], misses)
+        self.assertEqual(self.rendered_pages(), 1)
+
+    def test_standings_or_theme_change_renders_again(self):
+        self.download()
+        bump_leaderboard_version(self.tournament.id)
+        self.download()
+        self.assertEqual(self.rendered_pages(), 2)
+
+        self.theme.layout_config = {**LAYOUT, 'font_size': 9}
+        self.theme.save()
+        self.download()
+        self.assertEqual(self.rendered_pages(), 3)
+
+    def test_static_labels_are_pre_drawn_once(self):
+        self.theme.layout_config = {**LAYOUT, 'headers': {'team': 'TEAM'}, 'labels': [{'text': 'DAY 1', 'x': 200, 'y': 150}]}
+        self.theme.save()
+        spec = render_spec(self.tournament, self.theme)
+
+        plain = load_base_image(spec['image_path'])
+        base = prepared_base(spec)
+        self.assertNotEqual(base.crop((200, 150, 320, 180)).tobytes(), plain.crop((200, 150, 320, 180)).tobytes())
+
+        # built on save, so rendering pages only reuses it
+        misses = asset_cache.stats()['misses']
+        self.download()
+        self.download(page=2)
+        self.assertIs(prepared_base(spec), base)
+        self.assertEqual(asset_cache.stats()['misses'] - misses, 4)  # just the two pages' logos
+
+    def test_theme_save_replaces_only_its_prepared_base(self):
+        other = TournamentTheme.objects.create(
+            tournament=self.tournament, theme_image=png_upload('other.png', (320, 180), (0, 40, 0)), layout_config=LAYOUT,
+        )
+        self.theme.save()
+        prepared = lambda theme_id: [key for key in asset_cache._entries if key[0] == 'prepared' and key[1] == theme_id]
+        self.assertEqual(len(prepared(self.theme.id)), 1)
+        old_key = prepared(self.theme.id)[0]
+
+        self.theme.layout_config = {**LAYOUT, 'labels': [{'text': 'FINALS', 'x': 10, 'y': 10}]}
+        self.theme.save()
+        self.assertEqual(len(prepared(self.theme.id)), 1)
+        self.assertNotEqual(prepared(self.theme.id)[0], old_key)
+        self.assertEqual(len(prepared(other.id)), 1)
+
+    def test_output_formats(self):
+        for params, image_format in [
+            ({}, 'PNG'),
+            ({'image_format': 'jpeg', 'quality': 70}, 'JPEG'),
+            ({'image_format': 'webp'}, 'WEBP'),
+            ({'image_format': 'webp_lossless'}, 'WEBP'),
+        ]:
+            image = Image.open(BytesIO(self.download(**params)))
+            self.assertEqual((image.format, image.size), (image_format, (320, 180)), params)
+
+        image = Image.open(BytesIO(self.download(scale=0.5)))
+        self.assertEqual(image.size, (160, 90))
+        # each encoding is cached separately
+        self.assertEqual(self.rendered_pages(), 5)
+
+        url = f'/api/tournaments/{self.tournament.id}/generate_image/'
+        for params in [{'image_format': 'gif'}, {'quality': 0}, {'compress_level': 10}, {'scale': 'big'}]:
+            self.assertEqual(self.client.get(url, {'theme_id': self.theme.id, **params}).status_code, 400, params)
+
+    def test_theme_encoding_defaults(self):
+        self.theme.output_format = TournamentTheme.OutputFormat.JPEG
+        self.theme.output_scale = 0.5
+        self.theme.save()
+
+        response = self.client.get(f'/api/tournaments/{self.tournament.id}/generate_image/', {'theme_id': self.theme.id})
+        self.assertIn('leaderboard_', response['Content-Disposition'])
+        self.assertIn('.jpg', response['Content-Disposition'])
+        image = Image.open(BytesIO(b''.join(response.streaming_content)))
+        self.assertEqual((image.format, image.size), ('JPEG', (160, 90)))
+
+        # request params win over the theme
+        image = Image.open(BytesIO(self.download(image_format='png', scale=1)))
+        self.assertEqual((image.format, image.size), ('PNG', (320, 180)))
+
+        response = self.client.get(f'/api/tournaments/{self.tournament.id}/generate_zip/', {'theme_id': self.theme.id})
+        with zipfile.ZipFile(BytesIO(b''.join(response.streaming_content))) as zf:
+            self.assertEqual(zf.namelist(), [f'leaderboard_p{page}.jpg' for page in (1, 2, 3)])
+
+    def test_replacing_the_file_invalidates(self):
+        path = os.path.join(MEDIA_ROOT, 'replaced.png')
+        shutil.copy(self.theme.theme_image.path, path)
+        self.assertEqual(load_base_image(path).size, (320, 180))
+
+        Image.new('RGB', (64, 64)).save(path, format='PNG')
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        self.assertEqual(load_base_image(path).size, (64, 64))
+
+
+class RenderCacheTests(SimpleTestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+
+    def test_evicts_oldest_pages_over_budget(self):
+        pages = RenderCache(self.directory, max_bytes=25)
+        for i, key in enumerate(['a', 'b', 'c']):
+            pages.put(key, b'x' * 10)
+            # distinct, increasing last-used times
+            os.utime(pages._path(key), ns=(i * 10**9, i * 10**9))
+
+        self.assertIsNone(pages.open('a'))
+        for key in ('b', 'c'):
+            with pages.open(key) as handle:
+                self.assertEqual(handle.read(), b'x' * 10)
+
+
+class ParallelRenderTests(SimpleTestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+
+    @override_settings(RENDER_WORKERS=2)
+    def test_pool_output_matches_serial_in_page_order(self):
+        spec, rows = synthetic_assets(self.directory, 9)
+        pages = [(rows[start:start + 3], start) for start in range(0, 9, 3)]
+
+        expected = [render_page_bytes(spec, page_data, start) for page_data, start in pages]
+        self.assertEqual(render_pages(spec, pages), expected)
+
+    @override_settings(RENDER_WORKERS=2)
+    def test_failed_page_is_none(self):
+        spec, rows = synthetic_assets(self.directory, 4)
+        broken = [{'team_name': 'No stats', 'team_logo': None}]
+
+        results = render_pages(spec, [(rows[:2], 0), (broken, 2), (rows[2:], 3)])
+        self.assertIsNotNone(results[0])
+        self.assertIsNone(results[1])
+        self.assertIsNotNone(results[2])
+
+
+class AssetCacheTests(SimpleTestCase):
+    def test_evicts_least_recently_used_over_budget(self):
+        assets = AssetCache(max_bytes=10)
+        assets.get_or_load('a', lambda: 'A', lambda value: 4)
+        assets.get_or_load('b', lambda: 'B', lambda value: 4)
+        assets.get_or_load('a', lambda: 'A', lambda value: 4)
+        assets.get_or_load('c', lambda: 'C', lambda value: 4)
+
+        self.assertEqual(assets.stats(), {'hits': 1, 'misses': 3, 'entries': 2, 'bytes': 8})
+        assets.get_or_load('a', lambda: 'A', lambda value: 4)
+        self.assertEqual(assets.stats()['hits'], 2)  # 'b' was evicted, not 'a'
+
+    def test_oversized_values_are_not_kept(self):
+        assets = AssetCache(max_bytes=10)
+        self.assertEqual(assets.get_or_load('big', lambda: 'X', lambda value: 11), 'X')
+        self.assertEqual(assets.stats()['entries'], 0)
@@ -0,0 +1,223 @@
+from django.core.cache import cache
+from django.db import IntegrityError, connection, transaction
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+
+from ..models import User, Match, Score
+from ..leaderboard import verify_standings
+from ..scoring import calculate_points, compile_points_config
+from .factories import make_tournament
+
+
+@override_settings(LEADERBOARD_BROADCAST_DELAY=0)
+class SubmitResultsTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.organiser = User.objects.create_user(username="org", password="pw", role=User.Role.ORGANISER)
+        self.tournament = make_tournament(self.organiser, num_teams=25, num_matches=1)
+        self.teams = list(self.tournament.teams.order_by('id'))
+        self.match = Match.objects.create(tournament=self.tournament, match_number=2)
+        self.url = f'/api/matches/{self.match.id}/submit_results/'
+        self.client.force_authenticate(self.organiser)
+
+    def results(self, teams, kills=2):
+        return [{'team': team.id, 'kills': kills, 'placement': i} for i, team in enumerate(teams, start=1)]
+
+    def test_full_match_in_a_handful_of_queries(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post(self.url, {'results': self.results(self.teams)}, format='json')
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(response.data['created'], 25)
+        self.assertLessEqual(len(ctx.captured_queries), 16)
+
+        self.assertEqual(self.match.scores.count(), 25)
+        winner = self.match.scores.get(placement=1)
+        self.assertEqual(winner.total_points, 10 + 2)
+        self.assertEqual(verify_standings(self.tournament), [])
+
+    def test_resubmission_updates_in_place(self):
+        self.client.post(self.url, {'results': self.results(self.teams)}, format='json')
+        ids = dict(self.match.scores.values_list('team_id', 'id'))
+        response = self.client.post(self.url, {'results': self.results(reversed(self.teams), kills=0)}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.data['created'], response.data['updated']), (0, 25))
+        # swapped rows keep their ids
+        self.assertEqual(dict(self.match.scores.values_list('team_id', 'id')), ids)
+        self.assertEqual(self.match.scores.get(placement=1).team_id, self.teams[-1].id)
+        self.assertEqual(verify_standings(self.tournament), [])
+
+    def test_duplicate_placements_rejected_without_writes(self):
+        results = self.results(self.teams[:3])
+        results[2]['placement'] = 1
+        response = self.client.post(self.url, {'results': results}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(self.match.scores.exists())
+
+    def test_conflict_with_existing_score_needs_force_update(self):
+        Score.objects.create(match=self.match, team=self.teams[0], kills=1, placement=1)
+        results = [{'team': self.teams[1].id, 'kills': 0, 'placement': 1}]
+
+        response = self.client.post(self.url, {'results': results}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['code'], 'placement_conflict')
+
+        response = self.client.post(self.url, {'results': results, 'force_update': True}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['removed'], 1)
+        self.assertEqual(self.match.scores.get(placement=1).team_id, self.teams[1].id)
+        self.assertEqual(verify_standings(self.tournament), [])
+
+    def test_teams_from_other_tournaments_rejected(self):
+        other = make_tournament(self.organiser, num_teams=1, num_matches=0, name="Other")
+        results = [{'team': other.teams.get().id, 'kills': 0, 'placement': 1}]
+        response = self.client.post(self.url, {'results': results}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+
+@override_settings(LEADERBOARD_BROADCAST_DELAY=0)
+class ScoreUpsertTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.organiser = User.objects.create_user(username="org", password="pw", role=User.Role.ORGANISER)
+        self.tournament = make_tournament(self.organiser, num_teams=4, num_matches=1)
+        self.teams = list(self.tournament.teams.order_by('id'))
+        self.match = Match.objects.create(tournament=self.tournament, match_number=2)
+        self.client.force_authenticate(self.organiser)
+
+    def post(self, team, placement, kills=1, **extra):
+        return self.client.post('/api/scores/', {'match': self.match.id, 'team': team.id, 'kills': kills,
+                                                 'placement': placement, **extra}, format='json')
+
+    def test_reentering_a_result_replaces_it(self):
+        response = self.post(self.teams[0], placement=2)
+        self.assertEqual(response.status_code, 201)
+        score_id = response.data['id']
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.post(self.teams[0], placement=1, kills=4)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['id'], score_id)
+        self.assertEqual(response.data['total_points'], 10 + 4)
+        # the score itself is one statement
+        writes = [q['sql'] for q in ctx.captured_queries
+                  if q['sql'].startswith(('INSERT', 'UPDATE', 'DELETE')) and '"tournaments_score"' in q['sql'].split('(')[0]]
+        self.assertEqual(len(writes), 1, writes)
+
+        self.assertEqual(self.match.scores.count(), 1)
+        self.assertEqual(verify_standings(self.tournament), [])
+
+    def test_placement_conflict_and_force_update(self):
+        self.post(self.teams[0], placement=1)
+        response = self.post(self.teams[1], placement=1)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['code'], 'placement_conflict')
+        self.assertIn('already taken by Team 000', response.data['placement'][0])
+
+        response = self.post(self.teams[1], placement=1, force_update=True)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(list(self.match.scores.values_list('team_id', flat=True)), [self.teams[1].id])
+        self.assertEqual(verify_standings(self.tournament), [])
+
+    def test_edit_into_a_taken_placement(self):
+        self.post(self.teams[0], placement=1)
+        score_id = self.post(self.teams[1], placement=2).data['id']
+
+        response = self.client.patch(f'/api/scores/{score_id}/', {'placement': 1}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['code'], 'placement_conflict')
+
+        response = self.client.patch(f'/api/scores/{score_id}/', {'placement': 1, 'force_update': True}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['placement'], 1)
+        self.assertEqual(self.match.scores.count(), 1)
+        self.assertEqual(verify_standings(self.tournament), [])
+
+    def test_team_must_belong_to_the_tournament(self):
+        other = make_tournament(self.organiser, num_teams=1, num_matches=0, name="Other")
+        self.assertEqual(self.post(other.teams.get(), placement=1).status_code, 400)
+
+    def test_placement_must_be_positive(self):
+        response = self.post(self.teams[1], placement=0)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('placement', response.data)
+        self.assertEqual(self.post(self.teams[1], placement=-3).status_code, 400)
+
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Score.objects.create(match=self.match, team=self.teams[2], placement=-5)
+
+    def test_stale_instances_apply_the_stored_row(self):
+        score_id = self.post(self.teams[0], placement=3).data['id']
+        stale = Score.objects.get(pk=score_id)
+        self.client.patch(f'/api/scores/{score_id}/', {'placement': 1, 'kills': 6}, format='json')
+
+        # Saves and deletes through an instance loaded before the PATCH (admin, shell)
+        stale.kills = 2
+        stale.save()
+        self.assertEqual(verify_standings(self.tournament), [])
+
+        self.client.patch(f'/api/scores/{score_id}/', {'placement': 2}, format='json')
+        stale.delete()
+        self.assertFalse(Score.objects.filter(pk=score_id).exists())
+        self.assertEqual(verify_standings(self.tournament), [])
+
+    def test_delete_applies_the_stored_row(self):
+        score_id = self.post(self.teams[0], placement=3).data['id']
+        self.client.patch(f'/api/scores/{score_id}/', {'placement': 1, 'kills': 6}, format='json')
+        self.assertEqual(self.client.delete(f'/api/scores/{score_id}/').status_code, 204)
+        self.assertEqual(verify_standings(self.tournament), [])
+
+    def test_database_rejects_duplicate_placements(self):
+        Score.objects.create(match=self.match, team=self.teams[0], placement=1)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Score.objects.create(match=self.match, team=self.teams[1], placement=1)
+
+
+class PointsTableTests(APITestCase):
+    def test_compiled_table_matches_config(self):
+        table = compile_points_config({"1": 15, "2": "12", "3-4": 8, "4": 9, "5-8": 2, "x-y": 7, "kill": "2"})
+        self.assertEqual(table.kill_multiplier, 2)
+        self.assertEqual([table.placement_value(p) for p in range(1, 10)], [15, 12, 8, 9, 2, 2, 2, 2, 0])
+        self.assertEqual(table.points(kills=3, placement=3), 14)
+        self.assertEqual(table.points(kills=3, placement=250), 6)
+
+    def test_bad_values_fall_back_like_before(self):
+        self.assertEqual(calculate_points({"1": "ten", "kill": None}, kills=4, placement=1), 4)
+        self.assertEqual(calculate_points([], kills=4, placement=1), 4)
+
+    def test_table_is_compiled_once_per_config(self):
+        config = {"1": 10, "2-3": 5}
+        self.assertIs(compile_points_config(config), compile_points_config(dict(config)))
+        self.assertIsNot(compile_points_config(config), compile_points_config({**config, "1": 11}))
+
+
+@override_settings(LEADERBOARD_BROADCAST_DELAY=0)
+class RescoreTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.organiser = User.objects.create_user(username="org", password="pw", role=User.Role.ORGANISER)
+        self.client.force_authenticate(self.organiser)
+
+    def change_config(self, tournament, config):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.patch(f'/api/tournaments/{tournament.id}/', {'points_config': config}, format='json')
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries)
+
+    def test_points_config_edit_rescores_every_score(self):
+        tournament = make_tournament(self.organiser, num_teams=6, num_matches=3)
+        new_config = {"1": 20, "2-6": 3, "kill": 2}
+
+        self.change_config(tournament, new_config)
+
+        for score in Score.objects.filter(match__tournament=tournament):
+            self.assertEqual(score.total_points, calculate_points(new_config, score.kills, score.placement))
+        self.assertEqual(verify_standings(tournament), [])
+
+    def test_rescore_query_count_does_not_grow_with_scores(self):
+        small = make_tournament(self.organiser, num_teams=3, num_matches=2, name="Small")
+        large = make_tournament(self.organiser, num_teams=12, num_matches=6, name="Large")
+        self.assertEqual(
+            self.change_config(small, {"1": 5}),
+            self.change_config(large, {"1": 5}),
+        )
@@ -0,0 +1,104 @@
+from urllib.parse import parse_qs, urlparse
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+
+from ..models import User, Tournament, TournamentTheme
+from .factories import make_tournament
+
+
+class TournamentListTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.organiser = User.objects.create_user(username="org", password="pw", role=User.Role.ORGANISER)
+        cls.other = User.objects.create_user(username="org2", password="pw", role=User.Role.ORGANISER)
+        for i in range(5):
+            tournament = Tournament.objects.create(name=f"Daily {i}", creator=cls.organiser,
+                                                   status='COMPLETED' if i % 2 else 'ACTIVE')
+            TournamentTheme.objects.create(tournament=tournament, theme_image='tournament_themes/t.png')
+        Tournament.objects.create(name="Other Cup", creator=cls.other)
+
+    def names(self, response):
+        return [t['name'] for t in response.json()['results']]
+
+    def test_cursor_pages_newest_first(self):
+        response = self.client.get('/api/tournaments/', {'page_size': 4})
+        self.assertEqual(self.names(response), ["Other Cup", "Daily 4", "Daily 3", "Daily 2"])
+        self.assertIsNone(response.json()['previous'])
+
+        cursor = parse_qs(urlparse(response.json()['next']).query)['cursor'][0]
+        response = self.client.get('/api/tournaments/', {'page_size': 4, 'cursor': cursor})
+        self.assertEqual(self.names(response), ["Daily 1", "Daily 0"])
+        self.assertIsNone(response.json()['next'])
+
+    def test_slim_list_and_full_detail(self):
+        row = self.client.get('/api/tournaments/').json()['results'][1]
+        self.assertEqual(set(row), {'id', 'name', 'creator', 'creator_username', 'created_at', 'status', 'logo', 'cover_image'})
+        self.assertEqual(row['creator_username'], "org")
+
+        detail = self.client.get(f"/api/tournaments/{row['id']}/").json()
+        self.assertEqual(len(detail['themes']), 1)
+        self.assertIn('points_config', detail)
+
+    def test_filters(self):
+        response = self.client.get('/api/tournaments/', {'status': 'active'})
+        self.assertEqual(self.names(response), ["Other Cup", "Daily 4", "Daily 2", "Daily 0"])
+
+        response = self.client.get('/api/tournaments/', {'creator': self.other.id})
+        self.assertEqual(self.names(response), ["Other Cup"])
+
+        self.client.force_authenticate(self.organiser)
+        response = self.client.get('/api/tournaments/', {'creator': 'me', 'status': 'COMPLETED'})
+        self.assertEqual(self.names(response), ["Daily 3", "Daily 1"])
+
+        self.assertEqual(self.client.get('/api/tournaments/', {'creator': 'x'}).status_code, 400)
+
+    def test_queries_do_not_grow_with_tournaments(self):
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get('/api/tournaments/')
+        before = len(ctx.captured_queries)
+
+        for i in range(10):
+            Tournament.objects.create(name=f"Extra {i}", creator=self.other)
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get('/api/tournaments/')
+        self.assertEqual(len(ctx.captured_queries), before)
+
+
+class TournamentScopedListTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.organiser = User.objects.create_user(username="org", password="pw", role=User.Role.ORGANISER)
+        cls.tournament = make_tournament(cls.organiser, num_teams=5, num_matches=2)
+        cls.other = make_tournament(cls.organiser, num_teams=3, num_matches=1, name="Other Cup")
+
+    def test_teams_by_tournament(self):
+        response = self.client.get('/api/teams/', {'tournament': self.tournament.id, 'page_size': 3})
+        teams = response.json()['results']
+        self.assertEqual(len(teams), 3)
+        self.assertTrue(all(team['tournament'] == self.tournament.id for team in teams))
+
+        response = self.client.get(response.json()['next'])
+        self.assertEqual(len(response.json()['results']), 2)
+        self.assertIsNone(response.json()['next'])
+
+        self.assertEqual(self.client.get('/api/teams/', {'tournament': 'abc'}).status_code, 400)
+
+    def test_scores_by_tournament_and_match(self):
+        response = self.client.get('/api/scores/', {'tournament': self.other.id})
+        self.assertEqual(len(response.json()['results']), 3)
+
+        match = self.tournament.matches.get(match_number=2)
+        response = self.client.get('/api/scores/', {'match': match.id})
+        scores = response.json()['results']
+        self.assertEqual(len(scores), 5)
+        self.assertTrue(all(score['match'] == match.id and score['team_name'] for score in scores))
+
+        response = self.client.get('/api/scores/', {'tournament': self.other.id, 'match': match.id})
+        self.assertEqual(response.json()['results'], [])
+
+    def test_bad_match_filter(self):
+        self.assertEqual(self.client.get('/api/matches/', {'tournament': 'x'}).status_code, 400)
+        with self.settings(ASYNC_READ_VIEWS=False):
+            self.assertEqual(self.client.get('/api/matches/', {'tournament': 'x'}).status_code, 400)
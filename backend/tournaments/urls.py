@@ -1,7 +1,8 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import TournamentViewSet, TeamViewSet, MatchViewSet, ScoreViewSet, FeaturedContentViewSet, TournamentThemeViewSet
-from .auth_views import RegisterView, CustomAuthToken, SetProStatusView, UserProfileView
+from .views import TournamentViewSet, TeamViewSet, MatchViewSet, ScoreViewSet, FeaturedContentViewSet, TournamentThemeViewSet, RenderJobViewSet
+from . import async_views
+from .auth_views import RegisterView, CustomAuthToken, LogoutView, SetProStatusView, UserProfileView, AuthCacheStatsView
 
 router = DefaultRouter()
 router.register(r'tournaments', TournamentViewSet)
@@ -10,11 +11,19 @@ router.register(r'teams', TeamViewSet)
 router.register(r'matches', MatchViewSet)
 router.register(r'scores', ScoreViewSet)
 router.register(r'featured', FeaturedContentViewSet)
+router.register(r'render_jobs', RenderJobViewSet, basename='renderjob')
 
 urlpatterns = [
+    # Hot read endpoints served by async views (writes fall through to the viewsets)
+    path('tournaments/<int:pk>/', async_views.tournament_detail),
+    path('tournaments/<int:pk>/leaderboard/', async_views.tournament_leaderboard),
+    path('matches/', async_views.match_list),
+    path('featured/', async_views.featured_list),
     path('', include(router.urls)),
     path('register/', RegisterView.as_view()),
     path('login/', CustomAuthToken.as_view()),
+    path('logout/', LogoutView.as_view()),
     path('set-pro-status/', SetProStatusView.as_view()),
     path('user/profile/', UserProfileView.as_view()),
+    path('auth-cache-stats/', AuthCacheStatsView.as_view()),
 ]
@@ -1,55 +1,115 @@
-from django.http import FileResponse
+import os
+
+from asgiref.sync import sync_to_async
+from django.db import IntegrityError
+from django.db.models import Prefetch
+from django.http import FileResponse, StreamingHttpResponse
+from django.utils.http import parse_etags
 from rest_framework import viewsets, permissions, status, exceptions
 from rest_framework.response import Response
 from rest_framework.decorators import action
 from rest_framework.parsers import MultiPartParser, FormParser
-from .models import Tournament, Match, Score, Team, FeaturedContent, TournamentTheme
+from .models import Tournament, Match, Score, Team, FeaturedContent, TournamentTheme, RenderJob
 from .serializers import (
-    TournamentSerializer, MatchSerializer, ScoreSerializer, TeamSerializer, 
-    FeaturedContentSerializer, TournamentThemeSerializer
+    TournamentSerializer, TournamentListSerializer, MatchSerializer, ScoreSerializer, TeamSerializer, 
+    FeaturedContentSerializer, TournamentThemeSerializer, MatchResultsSerializer,
+    RenderJobRequestSerializer, RenderJobSerializer
+)
+from .permissions import IsOrganiserOrReadOnly, ensure_can_manage
+from .pagination import MatchPagination, ScorePagination, TeamPagination, TournamentPagination
+from .rendering import (
+    ENCODING_PARAMS, ZIP_COMPRESSION, image_extension, leaderboard_page, leaderboard_zip, output_encoding,
+)
+from .leaderboard import (
+    cached_leaderboard, leaderboard_etag, bump_leaderboard_version,
+    cached_timeline, timeline_etag
 )
-from .permissions import IsOrganiserOrReadOnly
-from asgiref.sync import async_to_sync
-from channels.layers import get_channel_layer
+from .broadcast import leaderboard_changed
+from .scoring import save_score, delete_score, submit_match_results, rescore_tournament, PlacementConflict
+from .jobs import submit_render_job, JobLimitReached
+
+class IncrementalStreamingHttpResponse(StreamingHttpResponse):
+    """Streams a sync iterator under ASGI one chunk at a time.
+
+    StreamingHttpResponse would collect a sync iterator into a list before sending
+    anything when served over ASGI; here each chunk is pulled in a worker thread and
+    sent as soon as it exists. WSGI iteration is unchanged.
+    """
+
+    async def __aiter__(self):
+        chunks = iter(self.streaming_content)
+        end = object()
+        while (chunk := await sync_to_async(next)(chunks, end)) is not end:
+            yield chunk
 
 class TournamentViewSet(viewsets.ModelViewSet):
     queryset = Tournament.objects.all()
     serializer_class = TournamentSerializer
     permission_classes = [IsOrganiserOrReadOnly]
+    pagination_class = TournamentPagination
+
+    def get_queryset(self):
+        # creator_username and nested themes without per-tournament queries
+        queryset = Tournament.objects.select_related('creator')
+        if self.action == 'retrieve':
+            queryset = queryset.prefetch_related('themes')
+        if self.action == 'list':
+            # ?status=ACTIVE, ?creator=<user id> or ?creator=me
+            status_filter = self.request.query_params.get('status')
+            if status_filter:
+                queryset = queryset.filter(status=status_filter.upper())
+            creator = self.request.query_params.get('creator')
+            if creator == 'me':
+                queryset = queryset.filter(creator_id=self.request.user.id)
+            elif creator:
+                if not creator.isdigit():
+                    raise exceptions.ValidationError({'creator': "Expected a user id or 'me'."})
+                queryset = queryset.filter(creator_id=int(creator))
+        return queryset
+
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return TournamentListSerializer
+        return TournamentSerializer
 
     def perform_create(self, serializer):
         serializer.save(creator=self.request.user)
 
+    def perform_update(self, serializer):
+        old_points_config = serializer.instance.points_config
+        tournament = serializer.save()
+        if tournament.points_config != old_points_config:
+            # Existing scores were computed with the old config
+            rescore_tournament(tournament)
+            leaderboard_changed(tournament.id)
+
     @action(detail=True, methods=['get'])
     def leaderboard(self, request, pk=None):
         tournament = self.get_object()
         match_id = request.query_params.get('match_id')
 
-        teams = tournament.teams.all()
-        leaderboard = []
-        for team in teams:
-            scores = Score.objects.filter(team=team, match__tournament=tournament)
-            if match_id:
-                scores = scores.filter(match_id=match_id)
-            
-            total_points = sum(s.total_points for s in scores)
-            total_kills = sum(s.kills for s in scores)
-            total_wwcd = scores.filter(placement=1).count()
-            total_position_points = total_points - total_kills
-
-            leaderboard.append({
-                "team_id": team.id,
-                "team_name": team.name,
-                "team_logo": team.logo.url if team.logo else None,
-                "total_points": total_points,
-                "total_kills": total_kills,
-                "total_wwcd": total_wwcd,
-                "total_position_points": total_position_points
-            })
-        
-        # Sort by Total Points (desc), then WWCD (desc), then Position Points (desc)
-        leaderboard.sort(key=lambda x: (x['total_points'], x['total_wwcd'], x['total_position_points']), reverse=True)
-        return Response(leaderboard)
+        # Unchanged polls only cost the tournament lookup
+        etag = leaderboard_etag(tournament, match_id)
+        headers = {'ETag': etag, 'Cache-Control': 'no-cache'}
+        if self.not_modified(request, etag):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+        return Response(cached_leaderboard(tournament, match_id), headers=headers)
+
+    @action(detail=True, methods=['get'])
+    def timeline(self, request, pk=None):
+        # Rank / points of every team after each match, for broadcast overlays
+        tournament = self.get_object()
+        etag = timeline_etag(tournament)
+        headers = {'ETag': etag, 'Cache-Control': 'no-cache'}
+        if self.not_modified(request, etag):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+        return Response(cached_timeline(tournament), headers=headers)
+
+    def not_modified(self, request, etag):
+        if_none_match = parse_etags(request.headers.get('If-None-Match', ''))
+        return etag in if_none_match or '*' in if_none_match
 
     @action(detail=True, methods=['get'])
     @action(detail=True, methods=['get'])
@@ -88,55 +148,22 @@ class TournamentViewSet(viewsets.ModelViewSet):
         else:
              return Response({"error": "No theme image found."}, status=400)
 
-        # 1. Fetch Leaderboard Data
         match_id = request.query_params.get('match_id')
-        teams = tournament.teams.all()
-        leaderboard_data = []
-        for team in teams:
-            scores = Score.objects.filter(team=team, match__tournament=tournament)
-            if match_id:
-                scores = scores.filter(match_id=match_id)
-            
-            total_points = sum(s.total_points for s in scores)
-            total_kills = sum(s.kills for s in scores)
-            total_wwcd = scores.filter(placement=1).count()
-            total_position_points = total_points - total_kills
-            
-            leaderboard_data.append({
-                "team_name": team.name,
-                "team_logo": team.logo, # Pass the ImageField file object
-                "wwcd": total_wwcd,
-                "matches": scores.values('match').distinct().count(),
-                "pos_pts": total_position_points,
-                "fin_pts": total_kills,
-                "total": total_points
-            })
-        
-        leaderboard_data.sort(key=lambda x: (x['total'], x['wwcd'], x['pos_pts']), reverse=True)
-
-        # 2. Pagination Logic
         page = int(request.query_params.get('page', 1))
-        start_index = (page - 1) * teams_per_page
-        end_index = start_index + teams_per_page
-        page_data = leaderboard_data[start_index:end_index] # Slice data
-
-        if not page_data and page > 1:
-             return Response({"error": "Page out of range"}, status=400)
+        try:
+            # ?image_format=&quality=&compress_level=&scale= override the theme's defaults
+            encoding = output_encoding(theme, request.query_params)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=400)
 
         try:
-            # Generate Image using Helper
-            from PIL import Image, ImageDraw, ImageFont, ImageOps
-            import io
-
-            image_buffer = self.create_leaderboard_image(
-                tournament, 
-                theme, 
-                page_data,
-                start_index
-            )
-            
-            filename = f"leaderboard_{tournament.id}_p{page}.png"
-            return FileResponse(image_buffer, as_attachment=True, filename=filename)
+            # Rendered once per standings version, theme and encoding (see rendering.render_cache)
+            image = leaderboard_page(tournament, theme, match_id, page, teams_per_page, encoding)
+            if image is None:
+                return Response({"error": "Page out of range"}, status=400)
+
+            filename = f"leaderboard_{tournament.id}_p{page}.{image_extension(encoding)}"
+            return FileResponse(image, as_attachment=True, filename=filename)
 
         except Exception as e:
             print(f"Image Gen Error: {e}")
@@ -148,33 +175,6 @@ class TournamentViewSet(viewsets.ModelViewSet):
     def generate_zip(self, request, pk=None):
         tournament = self.get_object()
         
-        # 1. Gather Data (Similar to generate_image)
-        scores = Score.objects.filter(match__tournament=tournament)
-        teams = {}
-        
-        # Aggregate logic (copied from generate_image - ideally should be helper)
-        for score in scores:
-            tid = score.team.id
-            if tid not in teams:
-                teams[tid] = {
-                    'team_name': score.team.name,
-                    'team_logo': score.team.logo,
-                    'matches': 0,
-                    'fin_pts': 0,
-                    'pos_pts': 0,
-                    'wwcd': 0,
-                    'total': 0
-                }
-            
-            teams[tid]['matches'] += 1
-            teams[tid]['fin_pts'] += score.kills
-            teams[tid]['pos_pts'] += (score.total_points - score.kills)
-            if score.placement == 1:
-                teams[tid]['wwcd'] += 1
-            teams[tid]['total'] += score.total_points
-            
-        leaderboard_data = sorted(teams.values(), key=lambda x: x['total'], reverse=True)
-        
         # Resolve Theme
         theme_id = request.query_params.get('theme_id')
         theme = None
@@ -184,167 +184,76 @@ class TournamentViewSet(viewsets.ModelViewSet):
             except TournamentTheme.DoesNotExist:
                 return Response({'error': 'Theme not found'}, status=404)
         
-        # Resolve Config & Pagination
-        if theme:
-            teams_per_page = theme.teams_per_page or 20
-        else:
-            teams_per_page = 20
-
-        import math
-        total_pages = math.ceil(len(leaderboard_data) / teams_per_page)
-        if total_pages == 0: total_pages = 1
-
-        import zipfile
-        import io
-        zip_buffer = io.BytesIO()
-
-        with zipfile.ZipFile(zip_buffer, 'w') as zf:
-            for page in range(1, total_pages + 1):
-                start_index = (page - 1) * teams_per_page
-                end_index = start_index + teams_per_page
-                page_data = leaderboard_data[start_index:end_index]
-                
-                try:
-                     image_buffer = self.create_leaderboard_image(
-                        tournament, 
-                        theme, 
-                        page_data, 
-                        start_index
-                     )
-                     zf.writestr(f"leaderboard_p{page}.png", image_buffer.getvalue())
-                except Exception as e:
-                     print(f"Error generating page {page} for zip: {e}")
-                     # Continue to next page rather than failing entire zip? 
-                     pass
-
-        zip_buffer.seek(0)
+        compression = ZIP_COMPRESSION.get(request.query_params.get('compression', 'stored'))
+        if compression is None:
+            return Response({'error': f"compression must be one of: {', '.join(ZIP_COMPRESSION)}"}, status=400)
+        try:
+            encoding = output_encoding(theme, request.query_params)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=400)
+
+        # Pages not rendered yet are fanned out over the render pool and each entry is sent
+        # as soon as it is ready instead of building the archive in memory
         filename = f"leaderboard_{tournament.id}_all.zip"
-        return FileResponse(zip_buffer, as_attachment=True, filename=filename)
+        return IncrementalStreamingHttpResponse(
+            leaderboard_zip(tournament, theme, compression, encoding),
+            content_type='application/zip',
+            headers={'Content-Disposition': f'attachment; filename="{filename}"'},
+        )
 
+    @action(detail=True, methods=['post'])
+    def render_jobs(self, request, pk=None):
+        # Queue generate_image / generate_zip off the request path; poll /api/render_jobs/<id>/
+        tournament = self.get_object()
+        serializer = RenderJobRequestSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        kind = data['kind']
 
-    def create_leaderboard_image(self, tournament, theme, page_data, start_index):
-        from PIL import Image, ImageDraw, ImageFont, ImageOps
-        import io
-        import os
-        from django.conf import settings
+        theme = None
+        if data.get('theme_id'):
+            theme = tournament.themes.filter(id=data['theme_id']).first()
+            if theme is None:
+                return Response({'error': 'Theme not found'}, status=404)
+        elif kind == RenderJob.Kind.IMAGE:
+            theme = tournament.themes.first()
+        if kind == RenderJob.Kind.IMAGE and not (theme and theme.theme_image) and not tournament.theme_image:
+            return Response({"error": "No theme image found."}, status=400)
 
-        # Config Logic (from generate_image)
-        if theme:
-            config = theme.layout_config or {}
-            
-            # Handle Image Path
-            image_field = theme.theme_image
-            if image_field:
-                 image_path = image_field.path
-            elif tournament.theme_image:
-                 image_path = tournament.theme_image.path
-            else:
-                 # Fallback
-                 from django.contrib.staticfiles import finders
-                 image_path = finders.find('default_leaderboard.jpg')
-                 if not image_path:
-                     # Create blank image
-                    pass 
+        if kind == RenderJob.Kind.IMAGE:
+            params = {'page': data['page'], 'match_id': data.get('match_id')}
         else:
-            config = tournament.layout_config or {}
-            if tournament.theme_image:
-                image_path = tournament.theme_image.path
-            else:
-                 # Fallback
-                 image_path = "default_leaderboard.jpg" # Dummy
-
-        # Custom Font Logic
-        custom_font_path = None
-        if theme and theme.custom_font:
-             custom_font_path = theme.custom_font.path
-
-        # If image path not found/valid, create blank
+            params = {'compression': data['compression']}
+        params.update({key: data[key] for key in ENCODING_PARAMS if key in data})
         try:
-             base_image = Image.open(image_path).convert("RGBA")
-        except:
-             base_image = Image.new('RGBA', (1920, 1080), (0,0,0,0))
+            output_encoding(theme, params)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=400)
 
-        draw = ImageDraw.Draw(base_image)
-        
-        # Defaults
-        start_x = int(config.get('start_x', 100))
-        start_y = int(config.get('start_y', 300))
-        row_height = int(config.get('row_height', 50))
-        font_size = int(config.get('font_size', 40))
-        font_color = config.get('font_color', '#FFFFFF')
         try:
-            stroke_width = int(config.get('font_weight', 0))
-        except (ValueError, TypeError):
-            stroke_width = 0
-
-        logo_size = int(config.get('logo_size', 40))
-        logo_y_offset = int(config.get('logo_y_offset', 0))
-        cols = config.get('columns', {})
+            job = submit_render_job(request.user, tournament, kind, theme, params)
+        except JobLimitReached as e:
+            return Response({"error": str(e), "code": "render_job_limit"}, status=status.HTTP_429_TOO_MANY_REQUESTS)
+        return Response(RenderJobSerializer(job, context={'request': request}).data, status=status.HTTP_202_ACCEPTED)
+
+class RenderJobViewSet(viewsets.ReadOnlyModelViewSet):
+    serializer_class = RenderJobSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        # Organisers only see their own exports
+        queryset = RenderJob.objects.order_by('-created_at', '-id')
+        user = self.request.user
+        if not (user.is_superuser or getattr(user, 'role', None) == 'ADMIN'):
+            queryset = queryset.filter(requested_by=user)
+        return queryset
 
-        # Font Loading
-        font = None
-        if custom_font_path:
-            try:
-                font = ImageFont.truetype(custom_font_path, font_size)
-            except Exception as e:
-                print(f"Font Load Error: {e}")
-        
-        if not font:
-            try:
-                font = ImageFont.truetype("arial.ttf", font_size)
-            except IOError:
-                font = ImageFont.load_default()
-
-        # Drawing Loop
-        current_y = start_y
-        for index, team in enumerate(page_data):
-            rank = start_index + index + 1
-            
-            # Draw Rank
-            if 'rank' in cols or not cols: 
-                col_rank = int(cols.get('rank', 0 if not cols else -9999))
-                if col_rank != -9999:
-                        draw.text((start_x + col_rank, current_y), str(rank), font=font, fill=font_color, stroke_width=stroke_width, stroke_fill=font_color)
-
-            # Draw Logo
-            if 'logo' in cols:
-                    col_logo = int(cols.get('logo'))
-                    if team['team_logo']:
-                        try:
-                            logo_img = Image.open(team['team_logo'].path).convert("RGBA")
-                            logo_img = logo_img.resize((logo_size, logo_size), Image.Resampling.LANCZOS)
-                            base_logo_y = current_y + (row_height - logo_size) // 2
-                            logo_y = base_logo_y + logo_y_offset
-                            base_image.paste(logo_img, (start_x + col_logo, logo_y), logo_img)
-                        except Exception as e:
-                            print(f"Error drawing logo for team {team['team_name']}: {e}")
-
-            # Draw Team Name
-            if 'team' in cols or not cols:
-                draw.text((start_x + int(cols.get('team', 100)), current_y), str(team['team_name']), font=font, fill=font_color, stroke_width=stroke_width, stroke_fill=font_color)
-            
-            # Draw Stats
-            if 'wwcd' in cols or not cols:
-                draw.text((start_x + int(cols.get('wwcd', 500)), current_y), str(team['wwcd']), font=font, fill=font_color, stroke_width=stroke_width, stroke_fill=font_color)
-
-            if 'matches' in cols or not cols:
-                draw.text((start_x + int(cols.get('matches', 650)), current_y), str(team.get('matches', 0)), font=font, fill=font_color, stroke_width=stroke_width, stroke_fill=font_color)
-            
-            if 'pos_pts' in cols or not cols:
-                draw.text((start_x + int(cols.get('pos_pts', 800)), current_y), str(team['pos_pts']), font=font, fill=font_color, stroke_width=stroke_width, stroke_fill=font_color)
-            
-            if 'fin_pts' in cols or not cols:
-                draw.text((start_x + int(cols.get('fin_pts', 950)), current_y), str(team['fin_pts']), font=font, fill=font_color, stroke_width=stroke_width, stroke_fill=font_color)
-            
-            if 'total' in cols or not cols:
-                draw.text((start_x + int(cols.get('total', 1100)), current_y), str(team['total']), font=font, fill=font_color, stroke_width=stroke_width, stroke_fill=font_color)
-
-            current_y += row_height
-
-        buffer = io.BytesIO()
-        base_image.save(buffer, format="PNG")
-        buffer.seek(0)
-        return buffer
+    @action(detail=True, methods=['get'])
+    def result(self, request, pk=None):
+        job = self.get_object()
+        if job.status != RenderJob.Status.DONE or not job.result:
+            return Response({"error": "Render job is not finished.", "status": job.status}, status=409)
+        return FileResponse(job.result.open('rb'), as_attachment=True, filename=os.path.basename(job.result.name))
 
 class TournamentThemeViewSet(viewsets.ModelViewSet):
     queryset = TournamentTheme.objects.all()
@@ -357,81 +266,171 @@ class TournamentThemeViewSet(viewsets.ModelViewSet):
         # For now, MVP: assume authenticated user can create theme for any tournament they have access to
         serializer.save()
 
+def placement_conflict_error(conflict):
+    # The shape SubmitScore looks for to offer "force update"
+    return exceptions.ValidationError({
+        "placement": [
+            f"Placement {score.placement} is already taken by {score.team.name}."
+            for score in conflict.scores
+        ],
+        "code": "placement_conflict",
+    })
+
+def id_param(request, name):
+    """Integer query param `name` (None when absent); 400 if it is not a number."""
+    value = request.query_params.get(name)
+    if not value:
+        return None
+    if not value.isdigit():
+        raise exceptions.ValidationError({name: "Expected an id."})
+    return int(value)
+
 class TeamViewSet(viewsets.ModelViewSet):
     queryset = Team.objects.all()
     serializer_class = TeamSerializer
     permission_classes = [IsOrganiserOrReadOnly]
+    pagination_class = TeamPagination
+
+    def get_queryset(self):
+        # ?tournament=<id>; tournament for the ownership check, members for the serializer
+        queryset = Team.objects.select_related('tournament').prefetch_related('members')
+        tournament_id = id_param(self.request, 'tournament')
+        if tournament_id is not None:
+            queryset = queryset.filter(tournament_id=tournament_id)
+        return queryset
 
     def perform_create(self, serializer):
-        tournament = serializer.validated_data['tournament']
-        if tournament.creator != self.request.user and not self.request.user.role == 'ADMIN' and not self.request.user.is_superuser:
-             raise exceptions.PermissionDenied("You are not the creator of this tournament.")
+        ensure_can_manage(self.request, serializer.validated_data['tournament'])
         team = serializer.save()
         team.members.add(self.request.user)
+        bump_leaderboard_version(team.tournament_id)
+
+    def perform_update(self, serializer):
+        team = serializer.save()
+        bump_leaderboard_version(team.tournament_id)
+
+    def perform_destroy(self, instance):
+        instance.delete()
+        bump_leaderboard_version(instance.tournament_id)
+
+def match_queryset(tournament_id=None, with_winners=True):
+    queryset = Match.objects.select_related('tournament').order_by('tournament_id', 'match_number')
+    if tournament_id:
+        queryset = queryset.filter(tournament_id=tournament_id)
+    if with_winners:
+        # Winner (placement 1) with its team in one extra query for the whole page
+        queryset = queryset.prefetch_related(Prefetch(
+            'scores',
+            queryset=Score.objects.filter(placement=1).select_related('team'),
+            to_attr='winning_scores',
+        ))
+    return queryset
 
 class MatchViewSet(viewsets.ModelViewSet):
     queryset = Match.objects.all()
     serializer_class = MatchSerializer
     permission_classes = [IsOrganiserOrReadOnly]
+    pagination_class = MatchPagination
+
+    def get_queryset(self):
+        return match_queryset(
+            id_param(self.request, 'tournament'),
+            with_winners=self.action in ('list', 'retrieve'),
+        )
 
     def perform_create(self, serializer):
-        tournament = serializer.validated_data['tournament']
-        if tournament.creator != self.request.user and not self.request.user.role == 'ADMIN' and not self.request.user.is_superuser:
-             raise exceptions.PermissionDenied("You are not the creator of this tournament.")
-        serializer.save()
+        ensure_can_manage(self.request, serializer.validated_data['tournament'])
+        match = serializer.save()
+        bump_leaderboard_version(match.tournament_id)
+
+    def perform_update(self, serializer):
+        match = serializer.save()
+        bump_leaderboard_version(match.tournament_id)
+
+    def perform_destroy(self, instance):
+        instance.delete()
+        bump_leaderboard_version(instance.tournament_id)
+
+    @action(detail=True, methods=['post'])
+    def submit_results(self, request, pk=None):
+        # Whole match in one request: {"results": [{"team", "kills", "placement"}, ...], "force_update": bool}
+        match = self.get_object()
+        serializer = MatchResultsSerializer(data=request.data, context={'match': match})
+        serializer.is_valid(raise_exception=True)
+
+        try:
+            summary = submit_match_results(
+                match,
+                serializer.validated_data['results'],
+                force_update=serializer.validated_data['force_update'],
+            )
+        except PlacementConflict as conflict:
+            raise placement_conflict_error(conflict)
+
+        leaderboard_changed(match.tournament_id)
+        return Response({"match": match.id, **summary})
 
 class ScoreViewSet(viewsets.ModelViewSet):
-    queryset = Score.objects.all()
+    queryset = Score.objects.select_related('team')
     serializer_class = ScoreSerializer
     permission_classes = [IsOrganiserOrReadOnly]
+    pagination_class = ScorePagination
+
+    def get_queryset(self):
+        # ?tournament=<id> and / or ?match=<id>; team_name and the ownership check in the same query
+        queryset = Score.objects.select_related('team', 'match__tournament')
+        tournament_id = id_param(self.request, 'tournament')
+        if tournament_id is not None:
+            queryset = queryset.filter(match__tournament_id=tournament_id)
+        match_id = id_param(self.request, 'match')
+        if match_id is not None:
+            queryset = queryset.filter(match_id=match_id)
+        return queryset
 
     def create(self, request, *args, **kwargs):
-        try:
-            # Custom logic to handle "Update if exists"
-            match_id = request.data.get('match')
-            team_id = request.data.get('team')
-            
-            # Check if score already exists
-            try:
-                instance = Score.objects.get(match_id=match_id, team_id=team_id)
-                # If exists, update it
-                serializer = self.get_serializer(instance, data=request.data)
-                serializer.is_valid(raise_exception=True)
-                self.perform_update(serializer) # Reuse perform_update logic
-                return Response(serializer.data)
-            except Score.DoesNotExist:
-                # If not, create standard
-                return super().create(request, *args, **kwargs)
-        except Exception as e:
-            import traceback
-            traceback.print_exc()
-            return Response({"error": str(e), "detail": traceback.format_exc()}, status=400)
+        # Upsert on (match, team): entering a team's result again replaces it
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        ensure_can_manage(request, data['match'])
 
-    def perform_create(self, serializer):
-        match = serializer.validated_data['match']
-        if match.tournament.creator != self.request.user and not self.request.user.role == 'ADMIN' and not self.request.user.is_superuser:
-             raise exceptions.PermissionDenied("You are not the creator of this tournament.")
-        score = serializer.save()
-        self.trigger_update(score)
+        score, created = self.save_score(data['match'], data['team'].id, data['kills'], data['placement'],
+                                         force_update=data['force_update'])
+        return Response(self.get_serializer(score).data,
+                        status=status.HTTP_201_CREATED if created else status.HTTP_200_OK)
 
     def perform_update(self, serializer):
-        score = serializer.save()
-        self.trigger_update(score)
-    
+        data = serializer.validated_data
+        score = serializer.instance
+        match = data.get('match', score.match)
+        if match.id != score.match_id:
+            ensure_can_manage(self.request, match)
+        team_id = data['team'].id if 'team' in data else score.team_id
+        serializer.instance, _ = self.save_score(
+            match, team_id, data.get('kills', score.kills), data.get('placement', score.placement),
+            force_update=data.get('force_update', False), score=score,
+        )
+
+    def save_score(self, match, team_id, kills, placement, force_update=False, score=None):
+        try:
+            result = save_score(match, team_id, kills, placement, force_update=force_update, score=score)
+        except PlacementConflict as conflict:
+            raise placement_conflict_error(conflict)
+        except Score.DoesNotExist:
+            raise exceptions.NotFound()
+        except IntegrityError:
+            # Only reachable past the match lock, e.g. moving a score onto a team that already has one
+            raise exceptions.ValidationError({"non_field_errors": ["This score conflicts with an existing one."]})
+        leaderboard_changed(match.tournament_id)
+        return result
+
     def perform_destroy(self, instance):
+        delete_score(instance)
         self.trigger_update(instance)
-        instance.delete()
 
     def trigger_update(self, score_instance):
-        channel_layer = get_channel_layer()
-        tournament_id = score_instance.match.tournament.id
-        async_to_sync(channel_layer.group_send)(
-            f"tournament_{tournament_id}_leaderboard",
-            {
-                "type": "leaderboard_update",
-                "message": "Leaderboard updated"
-            }
-        )
+        # Viewers receive the new standings directly instead of refetching them
+        leaderboard_changed(score_instance.match.tournament_id)
 
 class FeaturedContentViewSet(viewsets.ModelViewSet):
     queryset = FeaturedContent.objects.filter(active=True).order_by('-priority', '-id')
@@ -12,4 +12,20 @@ api.interceptors.request.use((config) => {
     return config;
 });
 
+// Follow a cursor-paginated list endpoint to the end and return every row
+export const fetchAllPages = async (path, params = {}) => {
+    const rows = [];
+    let cursor = null;
+    do {
+        const res = await api.get(path, { params: { ...params, page_size: 100, ...(cursor ? { cursor } : {}) } });
+        rows.push(...res.data.results);
+        cursor = res.data.next ? new URL(res.data.next).searchParams.get('cursor') : null;
+    } while (cursor);
+    return rows;
+};
+
+// Tournaments the current user manages: their own, or every tournament for admins
+export const fetchManagedTournaments = (isAdmin = localStorage.getItem('role') === 'ADMIN') =>
+    fetchAllPages('tournaments/', isAdmin ? {} : { creator: 'me' });
+
 export default api;
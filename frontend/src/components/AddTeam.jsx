@@ -1,6 +1,6 @@
 import React, { useState, useEffect } from 'react';
 import { useNavigate } from 'react-router-dom';
-import api from '../api';
+import api, { fetchManagedTournaments } from '../api';
 
 const AddTeam = () => {
     const [name, setName] = useState('');
@@ -9,7 +9,7 @@ const AddTeam = () => {
     const navigate = useNavigate();
 
     useEffect(() => {
-        api.get('tournaments/').then(res => setTournaments(res.data));
+        fetchManagedTournaments().then(setTournaments);
     }, []);
 
     const handleSubmit = async (e) => {
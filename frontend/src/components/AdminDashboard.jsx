@@ -1,6 +1,6 @@
 import React, { useState, useEffect } from 'react';
 import { Link, useNavigate } from 'react-router-dom';
-import api from '../api';
+import api, { fetchManagedTournaments } from '../api';
 import ThemeEditor from './ThemeEditor';
 
 const AdminDashboard = () => {
@@ -22,7 +22,7 @@ const AdminDashboard = () => {
         // Fetch latest status from API
         api.get('user/profile/')
             .then(res => {
-                const { is_approved, role } = res.data;
+                const { is_approved, role, is_superuser } = res.data;
                 const freshApproved = is_approved || (role === 'ADMIN');
 
                 console.log("Dashboard - Fresh Profile:", res.data);
@@ -35,7 +35,7 @@ const AdminDashboard = () => {
                 setIsApproved(freshApproved);
 
                 if (freshApproved) {
-                    api.get('tournaments/').then(res => setTournaments(res.data));
+                    fetchManagedTournaments(role === 'ADMIN' || is_superuser).then(setTournaments);
                 }
             })
             .catch(err => {
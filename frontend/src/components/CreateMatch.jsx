@@ -1,5 +1,5 @@
 import React, { useState, useEffect } from 'react';
-import api from '../api';
+import api, { fetchManagedTournaments } from '../api';
 
 const CreateMatch = () => {
     const [matchNumber, setMatchNumber] = useState('');
@@ -8,7 +8,7 @@ const CreateMatch = () => {
     const [tournamentId, setTournamentId] = useState('');
 
     useEffect(() => {
-        api.get('tournaments/').then(res => setTournaments(res.data));
+        fetchManagedTournaments().then(setTournaments);
     }, []);
 
     const handleSubmit = async (e) => {
@@ -10,6 +10,7 @@ const Leaderboard = () => {
     const [matches, setMatches] = useState([]);
     const [selectedMatch, setSelectedMatch] = useState('');
     const ws = useRef(null);
+    const seq = useRef(null);
 
     const fetchLeaderboard = () => {
         let url = `tournaments/${id}/leaderboard/`;
@@ -24,10 +25,8 @@ const Leaderboard = () => {
         api.get(`tournaments/${id}/`).then(res => setTournament(res.data));
 
         // Fetch matches for filtering
-        api.get('matches/').then(res => {
-            const tourneyMatches = res.data.filter(m => m.tournament === parseInt(id));
-            setMatches(tourneyMatches);
-        });
+        api.get('matches/', { params: { tournament: id, page_size: 200 } })
+            .then(res => setMatches(res.data.results));
 
         // Initial Fetch
         fetchLeaderboard();
@@ -39,13 +38,6 @@ const Leaderboard = () => {
             console.log('Connected to Leaderboard Stream');
         };
 
-        ws.current.onmessage = (event) => {
-            const data = JSON.parse(event.data);
-            if (data.type === 'leaderboard_update') {
-                console.log('Update received, refreshing...');
-            }
-        };
-
         ws.current.onclose = () => console.log('Disconnected');
 
         return () => {
@@ -58,12 +50,43 @@ const Leaderboard = () => {
         fetchLeaderboard();
     }, [selectedMatch]);
 
+    // Server pushes the overall standings (snapshot or delta) with a sequence number
+    const applyUpdate = (data) => {
+        const stripRank = ({ rank, ...row }) => row;
+
+        if (data.kind === 'snapshot') {
+            seq.current = data.seq;
+            setLeaderboard(data.rows.map(stripRank));
+            return;
+        }
+        if (data.kind === 'delta') {
+            if (seq.current !== data.base_seq) {
+                // Missed an update: ask for the full table over the same socket
+                ws.current.send(JSON.stringify({ action: 'snapshot' }));
+                return;
+            }
+            seq.current = data.seq;
+            setLeaderboard(prev => {
+                const rows = new Map(prev.map((row, index) => [row.team_id, { ...row, rank: index + 1 }]));
+                data.changes.forEach(row => rows.set(row.team_id, row));
+                data.removed.forEach(teamId => rows.delete(teamId));
+                return [...rows.values()].sort((a, b) => a.rank - b.rank).map(stripRank);
+            });
+            return;
+        }
+        fetchLeaderboard();
+    };
+
     useEffect(() => {
         if (!ws.current) return;
         ws.current.onmessage = (event) => {
             const data = JSON.parse(event.data);
-            if (data.type === 'leaderboard_update') {
+            if (data.type !== 'leaderboard_update') return;
+            if (selectedMatch) {
+                // Pushed payloads carry overall standings; per-match views still refetch
                 fetchLeaderboard();
+            } else {
+                applyUpdate(data);
             }
         };
     }, [selectedMatch]);
@@ -205,7 +228,7 @@ const Leaderboard = () => {
                                             {/* 2) Team Logo with Fallback */}
                                             <div className="w-8 h-8 md:w-12 md:h-12 flex-shrink-0 bg-gaming-900 rounded-lg overflow-hidden border border-white/10 flex items-center justify-center">
                                                 {team.team_logo ? (
-                                                    <img src={team.team_logo} alt={team.team_name} className="w-full h-full object-cover" />
+                                                    <img src={team.team_logo_thumb || team.team_logo} alt={team.team_name} className="w-full h-full object-cover" />
                                                 ) : (
                                                     <span className="font-display font-bold text-gaming-accent text-[10px] md:text-sm tracking-wider">
                                                         {getInitials(team.team_name)}
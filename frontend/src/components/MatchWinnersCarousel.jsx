@@ -87,7 +87,7 @@ const MatchWinnersCarousel = ({ matches }) => {
                             <div className="flex items-center space-x-4 mt-2">
                                 <div className="flex-shrink-0 w-16 h-16 bg-gradient-to-br from-gaming-700 to-gaming-900 rounded-xl overflow-hidden flex items-center justify-center border border-white/10 shadow-lg group-hover/card:scale-105 transition-transform duration-300">
                                     {match.winner.team_logo ? (
-                                        <img src={match.winner.team_logo} alt={match.winner.team_name} className="w-full h-full object-cover" />
+                                        <img src={match.winner.team_logo_thumb || match.winner.team_logo} alt={match.winner.team_name} className="w-full h-full object-cover" />
                                     ) : (
                                         <span className="text-gaming-accent font-display font-bold text-lg">{getInitials(match.winner.team_name)}</span>
                                     )}
@@ -1,5 +1,6 @@
 import React, { useEffect, useState } from 'react';
 import { Link, useNavigate } from 'react-router-dom';
+import api from '../api';
 
 const Navbar = () => {
     const [isAuthenticated, setIsAuthenticated] = useState(!!localStorage.getItem('token'));
@@ -15,7 +16,13 @@ const Navbar = () => {
         };
     }, []);
 
-    const handleLogout = () => {
+    const handleLogout = async () => {
+        // Revoke the token server-side; log out locally even if that fails
+        try {
+            await api.post('logout/');
+        } catch (err) {
+            console.error("Logout failed", err);
+        }
         localStorage.removeItem('token');
         localStorage.removeItem('role');
         localStorage.removeItem('user_id');
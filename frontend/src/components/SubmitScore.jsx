@@ -1,5 +1,5 @@
 import React, { useState, useEffect } from 'react';
-import api from '../api';
+import api, { fetchAllPages, fetchManagedTournaments } from '../api';
 
 const SubmitScore = () => {
     const [matches, setMatches] = useState([]);
@@ -16,11 +16,20 @@ const SubmitScore = () => {
     const [isEliminated, setIsEliminated] = useState(true); // Default to eliminated/final score
 
     useEffect(() => {
-        api.get('tournaments/').then(res => setTournaments(res.data));
-        api.get('matches/').then(res => setMatches(res.data));
-        api.get('teams/').then(res => setTeams(res.data));
+        fetchManagedTournaments().then(setTournaments);
     }, []);
 
+    useEffect(() => {
+        if (!selectedScoreTournament) {
+            setMatches([]);
+            setTeams([]);
+            return;
+        }
+        fetchAllPages('teams/', { tournament: selectedScoreTournament }).then(setTeams);
+        api.get('matches/', { params: { tournament: selectedScoreTournament, page_size: 200 } })
+            .then(res => setMatches(res.data.results));
+    }, [selectedScoreTournament]);
+
     const fetchLeaderboard = () => {
         if (selectedScoreTournament) {
             api.get(`tournaments/${selectedScoreTournament}/leaderboard/`)
@@ -158,11 +167,9 @@ const SubmitScore = () => {
                                         disabled={!selectedScoreTournament}
                                     >
                                         <option value="">Select Team...</option>
-                                        {teams
-                                            .filter(t => !selectedScoreTournament || t.tournament === parseInt(selectedScoreTournament))
-                                            .map(t => (
-                                                <option key={t.id} value={t.id}>{t.name}</option>
-                                            ))}
+                                        {teams.map(t => (
+                                            <option key={t.id} value={t.id}>{t.name}</option>
+                                        ))}
                                     </select>
                                 </div>
                             </div>
@@ -9,6 +9,8 @@ const ThemeEditor = ({ tournamentId, onClose }) => {
     const [themeImage, setThemeImage] = useState(null);
     const [customFont, setCustomFont] = useState(null);
     const [teamsPerPage, setTeamsPerPage] = useState(20);
+    const [outputFormat, setOutputFormat] = useState('png');
+    const [outputQuality, setOutputQuality] = useState(85);
     const [previewUrl, setPreviewUrl] = useState(null);
 
     // Config State
@@ -60,6 +62,8 @@ const ThemeEditor = ({ tournamentId, onClose }) => {
         setSelectedThemeId(theme.id);
         setThemeName(theme.name);
         setTeamsPerPage(theme.teams_per_page || 20);
+        setOutputFormat(theme.output_format || 'png');
+        setOutputQuality(theme.output_quality || 85);
         setConfig(theme.layout_config || {});
 
         // Handle URL logic
@@ -86,6 +90,8 @@ const ThemeEditor = ({ tournamentId, onClose }) => {
         setSelectedThemeId('new');
         setThemeName('New Theme');
         setTeamsPerPage(20);
+        setOutputFormat('png');
+        setOutputQuality(85);
         setPreviewUrl(null);
         setThemeImage(null);
         setCustomFont(null);
@@ -153,6 +159,8 @@ const ThemeEditor = ({ tournamentId, onClose }) => {
             const formData = new FormData();
             formData.append('name', themeName);
             formData.append('teams_per_page', teamsPerPage);
+            formData.append('output_format', outputFormat);
+            formData.append('output_quality', outputQuality);
             formData.append('layout_config', JSON.stringify(config));
 
             if (themeImage) formData.append('theme_image', themeImage);
@@ -243,6 +251,22 @@ const ThemeEditor = ({ tournamentId, onClose }) => {
                                 <label className="block text-xs uppercase font-bold text-gray-500 mb-2">Teams Per Page</label>
                                 <input type="number" value={teamsPerPage} onChange={e => setTeamsPerPage(parseInt(e.target.value))} className="w-full bg-black/30 border border-white/10 rounded-lg p-3 text-white font-mono text-sm focus:border-gaming-accent focus:ring-1 focus:ring-gaming-accent transition-all" />
                             </div>
+
+                            <div className="grid grid-cols-2 gap-4">
+                                <div>
+                                    <label className="block text-[10px] uppercase font-bold text-gray-500 mb-1">Image Format</label>
+                                    <select value={outputFormat} onChange={e => setOutputFormat(e.target.value)} className="w-full bg-black/30 border border-white/10 rounded p-2 text-white font-mono text-sm">
+                                        <option value="png">PNG</option>
+                                        <option value="jpeg">JPEG</option>
+                                        <option value="webp">WebP</option>
+                                        <option value="webp_lossless">WebP (lossless)</option>
+                                    </select>
+                                </div>
+                                <div>
+                                    <label className="block text-[10px] uppercase font-bold text-gray-500 mb-1">Quality</label>
+                                    <input type="number" min="1" max="100" value={outputQuality} disabled={outputFormat === 'png' || outputFormat === 'webp_lossless'} onChange={e => setOutputQuality(parseInt(e.target.value))} className="w-full bg-black/30 border border-white/10 rounded p-2 text-white font-mono text-sm disabled:opacity-40" />
+                                </div>
+                            </div>
                         </div>
 
                         {/* Measurements */}
@@ -6,24 +6,27 @@ import FeaturedGrid from './FeaturedGrid';
 
 const TournamentList = () => {
     const [tournaments, setTournaments] = useState([]);
+    const [nextCursor, setNextCursor] = useState(null);
 
-    useEffect(() => {
-        api.get('tournaments/')
+    const loadTournaments = (cursor = null) => {
+        api.get('tournaments/', { params: cursor ? { cursor } : {} })
             .then(res => {
-                if (Array.isArray(res.data)) {
-                    setTournaments(res.data);
-                } else if (res.data && Array.isArray(res.data.results)) {
-                    // Handle paginated response
-                    setTournaments(res.data.results);
+                if (res.data && Array.isArray(res.data.results)) {
+                    setTournaments(prev => cursor ? [...prev, ...res.data.results] : res.data.results);
+                    setNextCursor(res.data.next ? new URL(res.data.next).searchParams.get('cursor') : null);
                 } else {
                     console.error("Unexpected API response for tournaments:", res.data);
-                    setTournaments([]);
+                    if (!cursor) setTournaments([]);
                 }
             })
             .catch(err => {
                 console.error("Failed to fetch tournaments", err);
-                setTournaments([]);
+                if (!cursor) setTournaments([]);
             });
+    };
+
+    useEffect(() => {
+        loadTournaments();
     }, []);
 
     return (
@@ -99,6 +102,14 @@ const TournamentList = () => {
                     </div>
                 )}
             </div>
+
+            {nextCursor && (
+                <div className="flex justify-center">
+                    <button onClick={() => loadTournaments(nextCursor)} className="px-6 py-3 rounded-lg border border-white/10 text-sm font-bold uppercase tracking-widest text-gray-300 hover:border-gaming-accent hover:text-gaming-accent transition-colors">
+                        Load More
+                    </button>
+                </div>
+            )}
         </div>
     );
 };